@@ -1,5 +1,14 @@
 import turtle
 import math
+import os
+import sys
+
+# Agar paket SimulationCore bisa diimpor saat file dijalankan langsung
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from SimulationCore.CanvasRenderer import CanvasRenderer
+from SimulationCore.Diagnostics import ConservationMonitor, print_alert
+from SimulationCore.Profiler import ProfileOverlay, Profiler
+from SimulationCore.Trails import TrailLayer
 
 # Konstanta
 G = 6.67430e-11    # Konstanta gravitasi (m^3 kg^-1 s^-2)
@@ -7,6 +16,9 @@ SM = 1.989e30      # Massa matahari (kg)
 AU = 1.496e11      # Jarak rata-rata matahari ke bumi (m)
 dt = 60 * 60       # Interval waktu (1 jam dalam detik)
 skala = 250 / AU   # Skala visualisasi (AU -> piksel)
+panjang_jejak = 1000 # Jumlah titik jejak orbit yang disimpan (sekitar satu putaran)
+PROFILE_OVERLAY = False # Tampilkan laju frame serta waktu fisika dan gambar di kanvas
+PROFILE_PATH = None # Misalnya "profile.json" atau "profile.csv": histogram tiap fase frame saat keluar
 
 # Inisialisasi posisi dan kecepatan bumi
 x = AU
@@ -35,24 +47,54 @@ earth.shape("circle")
 earth.color("blue")
 earth.penup()
 earth.goto(x * skala, y * skala)
-earth.pendown()
+
+# Jejak orbit bumi: buffer cincin berukuran tetap yang digambar sebagai satu
+# garis, jadi jumlah item kanvas tidak terus bertambah selama simulasi
+renderer = CanvasRenderer.for_turtle_screen(screen)
+jejak = TrailLayer(renderer, capacity=panjang_jejak)
+jejak.add_trail("bumi", color="blue")
+renderer.lower_item("bumi") # Jejak di bawah gambar matahari dan bumi
+
+# Diagnostik hukum kekekalan (opsional, isi None untuk mematikan)
+# Energi dan momentum sudut dicatat setiap 100 langkah. Matahari diam,
+# jadi momentum linear tidak diperiksa.
+diagnostik = ConservationMonitor(sample_every=100, momentum_tolerance=None, on_alert=print_alert)
+langkah = 0
+
+# Pengukur waktu tiap fase frame (lihat SimulationCore/Profiler.py)
+profiler = Profiler(enabled=PROFILE_OVERLAY or bool(PROFILE_PATH), dump_path=PROFILE_PATH)
+overlay = (ProfileOverlay(renderer.canvas, profiler, renderer.bounds[0] + 10, renderer.bounds[1] + 10)
+           if PROFILE_OVERLAY else None)
 
 # Simulasi orbit bumi
 while True:
-    # Hitung jarak dan percepatan
-    r = math.sqrt(x**2 + y**2)
-    a = -G * SM / r**3
-    ax = a * x
-    ay = a * y
-
-    # Update kecepatan
-    vx += ax * dt
-    vy += ay * dt
-
-    # Update posisi
-    x += vx * dt
-    y += vy * dt
-
-    # Update tampilan turtle
-    earth.goto(x * skala, y * skala)
-    screen.update()
+    with profiler.frame():
+        if diagnostik is not None and diagnostik.due(langkah):
+            with profiler.span("diagnostics"):
+                # Energi potensial bumi di medan gravitasi matahari: -G*M*m/r (massa bumi = 1)
+                energi_potensial = -G * SM / math.sqrt(x**2 + y**2)
+                diagnostik.record(langkah, langkah * dt, [1.0], [(x, y)], [(vx, vy)], energi_potensial)
+        langkah += 1
+
+        with profiler.span("physics"):
+            # Hitung jarak dan percepatan
+            r = math.sqrt(x**2 + y**2)
+            a = -G * SM / r**3
+            ax = a * x
+            ay = a * y
+
+            # Update kecepatan
+            vx += ax * dt
+            vy += ay * dt
+
+            # Update posisi
+            x += vx * dt
+            y += vy * dt
+
+        with profiler.span("render"):
+            # Update tampilan turtle
+            earth.goto(x * skala, y * skala)
+            jejak.update("bumi", x * skala, y * skala)
+            screen.update()
+        if overlay is not None:
+            overlay.update()
@@ -1,11 +1,33 @@
 import turtle
 import math
-import random
+import os
+import sys
+
+# Make the shared SimulationCore package importable when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from SimulationCore.Diagnostics import ConservationMonitor, gravitational_potential, print_alert
+from SimulationCore.BlockTimestep import BlockTimestepIntegrator
+from SimulationCore.Checkpoint import load_checkpoint, save_checkpoint
+from SimulationCore.Background import BackgroundLayer
+from SimulationCore.CanvasRenderer import CanvasRenderer
+from SimulationCore.Profiler import ProfileOverlay, Profiler
+from SimulationCore.StateStream import StateStreamServer
+from SimulationCore.Trails import TrailLayer
 
 # --- Simulation Constants ---
 G = 6.67430e-11  # Gravitational constant (m^3 kg^-1 s^-2)
 TIME_STEP = 3600 * 24  # Time step for calculation (1 day in seconds)
 SCALE = 200 / (1.496e11)  # Scale for visualization (pixels per meter)
+# When True, the Sun, Earth and Moon all move under mutual gravity and each body
+# uses its own power-of-two fraction of TIME_STEP (see SimulationCore/BlockTimestep.py)
+USE_BLOCK_TIMESTEPS = False
+TRAIL_LENGTH = 500 # Points kept in each orbital trail (a bit more than one Earth orbit)
+STAR_SEED = 1 # Same seed, same starfield (None for a new one every run)
+BACKGROUND_CACHE_DIR = None # Set to a folder path to keep the rendered starfield on disk
+STREAM_ADDRESS = None # e.g. "tcp://127.0.0.1:9872" streams the bodies to external viewers
+CHECKPOINT_PATH = "orbit.ckpt" # Press "s" to save the bodies here and "l" to continue from them
+PROFILE_OVERLAY = False # Show the frame rate and the physics and render times on the canvas
+PROFILE_PATH = None # e.g. "profile.json" or "profile.csv": histograms of the frame phases on exit
 
 # --- Celestial Body Class ---
 # A general class for any object in space, like a planet or a star.
@@ -15,13 +37,8 @@ class CelestialBody:
         self.px, self.py = px, py  # Position in meters
         self.vx, self.vy = vx, vy  # Velocity in m/s
 
-        # Setup the turtle for drawing this body
-        self.turtle = turtle.Turtle()
-        self.turtle.shape("circle")
-        self.turtle.color(color)
-        self.turtle.shapesize(stretch_wid=size, stretch_len=size)
-        self.turtle.penup()
-        self.turtle.speed(0)
+        # Create the canvas item for this body (size is in turtle shape units of 10 px)
+        renderer.add_body(self, 10 * size, color, px * SCALE, py * SCALE)
 
     def calculate_gravity(self, other_body):
         """Calculates the gravitational force exerted by another body."""
@@ -54,21 +71,18 @@ class CelestialBody:
 
     def draw(self):
         """Draws the body on the screen at its scaled position."""
-        self.turtle.goto(self.px * SCALE, self.py * SCALE)
+        x, y = self.px * SCALE, self.py * SCALE
+        if self in trails.buffers:
+            trails.update(self, x, y)
+        renderer.move_body(self, x, y)
 
 # --- Helper Functions ---
 def draw_stars():
-    """Draws a random starfield in the background."""
-    star_drawer = turtle.Turtle()
-    star_drawer.hideturtle()
-    star_drawer.speed(0)
-    star_drawer.color("white")
-    for _ in range(100):
-        x = random.randint(-400, 400)
-        y = random.randint(-300, 300)
-        star_drawer.penup()
-        star_drawer.goto(x, y)
-        star_drawer.dot(random.randint(1, 2))
+    """Draws a random starfield as a cached background image."""
+    background = BackgroundLayer(cache_dir=BACKGROUND_CACHE_DIR)
+    background.add_stars(100, (-400, 400), (-300, 300), sizes=(1, 2), seed=STAR_SEED)
+    background.show(renderer)
+    background.follow_resize(renderer) # Covers the window again after it is enlarged
 
 # --- Main Simulation Setup ---
 # Screen setup
@@ -78,8 +92,16 @@ screen.bgcolor("black")
 screen.title("Newtonian Orbit Simulation")
 screen.tracer(0)  # Turn off automatic updates
 
+# Bodies and trails are canvas items that are moved instead of redrawn by turtles
+renderer = CanvasRenderer.for_turtle_screen(screen)
+
 draw_stars()
 
+# Times the phases of every frame (see SimulationCore/Profiler.py)
+profiler = Profiler(enabled=PROFILE_OVERLAY or bool(PROFILE_PATH), dump_path=PROFILE_PATH)
+overlay = (ProfileOverlay(renderer.canvas, profiler, renderer.bounds[0] + 10, renderer.bounds[1] + 10,
+                          label="bodies") if PROFILE_OVERLAY else None)
+
 # Create celestial bodies with real-world data
 sun = CelestialBody(
     mass=1.989e30,      # Mass of the Sun in kg
@@ -96,28 +118,135 @@ earth = CelestialBody(
     color="blue",
     size=0.8
 )
-earth.turtle.pendown() # Let Earth draw its orbital path
+
+# Let Earth draw its orbital path: a fixed-size ring buffer of points drawn
+# as one polyline, so long runs do not pile up canvas items
+trails = TrailLayer(renderer, capacity=TRAIL_LENGTH)
+trails.add_trail(earth, color="blue")
+renderer.raise_item(earth) # Keep the Earth above its trail
+bodies = [sun, earth]
+
+# --- Block Time-Stepping (optional) ---
+# The Moon needs steps of about an hour, the Sun about a day. With block
+# timesteps only the bodies whose step ends are re-evaluated each substep.
+integrator = None
+if USE_BLOCK_TIMESTEPS:
+    moon = CelestialBody(
+        mass=7.342e22,                  # Mass of the Moon in kg
+        px=-1.496e11 - 384.4e6, py=0,   # 384,400 km beyond the Earth
+        vx=0, vy=29780 + 1022,          # Earth's velocity plus the lunar orbital speed
+        color="lightgray",
+        size=0.3
+    )
+    bodies.append(moon)
+    integrator = BlockTimestepIntegrator(
+        [body.mass for body in bodies],
+        [(body.px, body.py) for body in bodies],
+        [(body.vx, body.vy) for body in bodies],
+        dt_max=TIME_STEP
+    )
+
+# --- Diagnostics (optional) ---
+# Samples energy and angular momentum every 10 steps; set to None to disable.
+# Unless block time-stepping is on, the Sun is pinned, so linear momentum is not checked.
+diagnostics = ConservationMonitor(sample_every=10, momentum_tolerance=1e-6 if integrator else None,
+                                  on_alert=print_alert)
+step = 0
+
+# --- State Stream (optional) ---
+# Positions and velocities (meters, m/s) of every step for external viewers,
+# see SimulationCore/StateStream.py
+stream = StateStreamServer(STREAM_ADDRESS) if STREAM_ADDRESS else None
+
+def record_diagnostics():
+    """Feeds the current state of all bodies to the conservation monitor."""
+    masses = [body.mass for body in bodies]
+    positions = [(body.px, body.py) for body in bodies]
+    velocities = [(body.vx, body.vy) for body in bodies]
+    potential = gravitational_potential(masses, positions, G)
+    diagnostics.record(step, step * TIME_STEP, masses, positions, velocities, potential)
 
 # --- Animation Loop ---
 def animate():
     """The main loop that drives the simulation."""
-    # Calculate forces
-    gravity_on_earth_fx, gravity_on_earth_fy = earth.calculate_gravity(sun)
-
-    # Update positions
-    earth.update_position(gravity_on_earth_fx, gravity_on_earth_fy)
-    # Note: In a multi-body simulation, you would also update the sun's position.
-
-    # Draw bodies on screen
-    sun.draw()
-    earth.draw()
-
-    # Update the screen
-    screen.update()
+    global step
+    with profiler.frame():
+        if diagnostics is not None and diagnostics.due(step):
+            with profiler.span("diagnostics"):
+                record_diagnostics()
+        step += 1
+
+        with profiler.span("physics"):
+            if integrator is not None:
+                # Advance every body by one TIME_STEP using individual block timesteps
+                integrator.advance(TIME_STEP)
+                positions, velocities = integrator.state()
+                for body, (px, py), (vx, vy) in zip(bodies, positions, velocities):
+                    body.px, body.py, body.vx, body.vy = px, py, vx, vy
+            else:
+                # Calculate forces
+                gravity_on_earth_fx, gravity_on_earth_fy = earth.calculate_gravity(sun)
+
+                # Update positions
+                earth.update_position(gravity_on_earth_fx, gravity_on_earth_fy)
+                # Note: In a multi-body simulation, you would also update the sun's position.
+
+        with profiler.span("render"):
+            # Draw bodies on screen
+            for body in bodies:
+                body.draw()
+
+            # Update the screen
+            screen.update()
+        if stream is not None:
+            with profiler.span("stream"):
+                stream.publish(step, step * TIME_STEP, {
+                    "positions": [(body.px, body.py) for body in bodies],
+                    "velocities": [(body.vx, body.vy) for body in bodies],
+                    "masses": [body.mass for body in bodies],
+                })
+        if overlay is not None:
+            overlay.update(len(bodies))
 
     # Schedule the next frame
     screen.ontimer(animate, 20) # Run again after 20 milliseconds
 
+# --- Checkpoints ---
+# The bodies, the step count and the block-timestep integrator; the trails
+# start over after loading.
+def save_orbit():
+    state = {
+        "step": step,
+        "bodies": {name: [getattr(body, name) for body in bodies] for name in ("px", "py", "vx", "vy")},
+        "integrator": None if integrator is None else integrator.checkpoint_state(),
+    }
+    save_checkpoint(CHECKPOINT_PATH, "Example1Enhance", state)
+    print(f"Saved day {step * TIME_STEP / 86400:.0f} to {CHECKPOINT_PATH}")
+
+def load_orbit():
+    """Continues exactly from the saved checkpoint."""
+    global step, integrator
+    if not os.path.exists(CHECKPOINT_PATH):
+        print(f"No checkpoint at {CHECKPOINT_PATH}")
+        return
+    state = load_checkpoint(CHECKPOINT_PATH, "Example1Enhance")
+    if len(state["bodies"]["px"]) != len(bodies):
+        print("The checkpoint was saved with USE_BLOCK_TIMESTEPS set differently")
+        return
+    step = state["step"]
+    for k, body in enumerate(bodies):
+        body.px, body.py, body.vx, body.vy = (state["bodies"][name][k] for name in ("px", "py", "vx", "vy"))
+        if body in trails.buffers:
+            trails.clear(body)
+    if state["integrator"] is not None:
+        integrator = BlockTimestepIntegrator.from_state(state["integrator"])
+    if diagnostics is not None:
+        diagnostics.reset()
+
+screen.onkey(save_orbit, "s")
+screen.onkey(load_orbit, "l")
+screen.listen()
+
 # --- Start the Simulation ---
 animate()
 screen.mainloop()
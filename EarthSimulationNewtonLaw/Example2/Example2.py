@@ -1,6 +1,13 @@
+import os
+import sys
+
 import numpy as np
 import matplotlib.pyplot as plt
 
+# Agar paket SimulationCore bisa diimpor saat file dijalankan langsung
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from SimulationCore.Diagnostics import ConservationMonitor, print_alert
+
 # Konstanta Fisika
 G = 6.67430e-11             # Gravitasi Newton (m^3 kg^-1 s^-2)
 M_matahari = 1.989e30       # Massa Matahari dalam kg
@@ -18,8 +25,15 @@ vy = 29_780     # Kecepatan awal bumi (29.78 m/s)
 x_posisi = []
 y_posisi = []
 
+# Diagnostik hukum kekekalan: energi dan momentum sudut dicatat tiap 24 langkah
+diagnostik = ConservationMonitor(sample_every=24, momentum_tolerance=None, on_alert=print_alert)
+
 # Simulasi gerak
-for _ in range(jumlah_langkah):
+for langkah in range(jumlah_langkah):
+    if diagnostik.due(langkah):
+        energi_potensial = -G * M_matahari / np.sqrt(x**2 + y**2)
+        diagnostik.record(langkah, langkah * dt, [1.0], [(x, y)], [(vx, vy)], energi_potensial)
+
     r = np.sqrt(x**2 + y**2)
     a = -G * M_matahari / r**3
     ax = a * x
@@ -33,6 +47,9 @@ for _ in range(jumlah_langkah):
     x_posisi.append(x)
     y_posisi.append(y)
 
+# Laporan diagnostik
+print(diagnostik.summary())
+
 # Visualisasi
 plt.figure(figsize=(8, 8))
 plt.plot(0, 0, 'yo', markersize=12, label='Matahari')  # Titik pusat
@@ -1,12 +1,20 @@
+import os
+import sys
+
 import numpy as np
 import matplotlib.pyplot as plt
 
+# Make the shared SimulationCore package importable when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from SimulationCore.Diagnostics import ConservationMonitor, print_alert
+
 # --- Physical Constants ---
 G = 6.67430e-11                 # Newtonian gravitational constant (m^3 kg^-1 s^-2)
 SUN_MASS = 1.989e30             # Mass of the Sun in kg
 AU = 1.496e11                   # 1 Astronomical Unit (AU) in meters
 TIME_STEP = 60 * 60             # Time step: 1 hour (in seconds)
 SIMULATION_STEPS = 24 * 365     # Number of simulation steps: 1 year (in hours)
+DIAGNOSTICS_CSV = None          # Set to a file path to export the conservation samples
 
 # --- Initialize Earth's position and velocity ---
 # Start at 1 AU on the x-axis
@@ -20,8 +28,17 @@ vel_y = 29780  # Initial velocity of Earth (29.78 km/s)
 x_history = []
 y_history = []
 
+# --- Conservation Diagnostics ---
+# Energy and angular momentum (per unit Earth mass) are sampled every 24 steps.
+# The Sun is fixed at the origin, so linear momentum is not checked.
+diagnostics = ConservationMonitor(sample_every=24, momentum_tolerance=None, on_alert=print_alert)
+
 # --- Motion Simulation Loop ---
-for _ in range(SIMULATION_STEPS):
+for step in range(SIMULATION_STEPS):
+    if diagnostics.due(step):
+        potential = -G * SUN_MASS / np.sqrt(pos_x**2 + pos_y**2)
+        diagnostics.record(step, step * TIME_STEP, [1.0], [(pos_x, pos_y)], [(vel_x, vel_y)], potential)
+
     # Calculate distance from the sun
     distance_to_sun = np.sqrt(pos_x**2 + pos_y**2)
 
@@ -43,6 +60,11 @@ for _ in range(SIMULATION_STEPS):
     x_history.append(pos_x)
     y_history.append(pos_y)
 
+# --- Report Diagnostics ---
+print(diagnostics.summary())
+if DIAGNOSTICS_CSV:
+    diagnostics.export_csv(DIAGNOSTICS_CSV)
+
 # --- Visualization using Matplotlib ---
 plt.figure(figsize=(8, 8))
 # Plot the Sun at the origin
@@ -0,0 +1,167 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+# Make the shared SimulationCore package importable when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from SimulationCore.Checkpoint import load_checkpoint, save_checkpoint
+from SimulationCore.Gravity import G, rk4_step
+from SimulationCore.StateStream import StateStreamServer
+
+# --- Configuration (chaotic three stars) ---
+# The layout and velocities of Example 4, but with stellar masses: the
+# notebook's Earth-mass planets are ~1e11 m apart and move far faster than
+# their escape speed (~3 m/s), so they barely attract each other and the
+# copies never separate. Sun-mass bodies stay bound and keep approaching
+# each other, which is what makes the motion chaotic.
+M = 2e30  # Mass of all three stars (same)
+MASSES = np.array([M, M, M])
+POSITIONS = np.array([[0.0, 0.0], [1.0e11, 0.0], [0.5e11, 0.87e11]])
+VELOCITIES = np.array([[0.0, 12000], [0.0, -11000], [12000, 0.0]])
+SOFTENING = 1e10  # Smooths the closest encounters so the fixed step resolves them (energy error ~1e-7)
+
+# --- Ensemble Parameters ---
+ENSEMBLE_SIZE = 2000       # Number of perturbed copies
+PERTURBATION = 1.0e7       # Initial position perturbation (m), 1e-4 of the distances between the stars
+DIVERGENCE_DISTANCE = 1e10 # Separation at which copies count as diverged (m)
+TIME_STEP = 3000           # 50 minutes, as in the notebook
+STEPS = 7000               # ~240 days, about 9 e-folding times: most copies diverge
+SAMPLE_EVERY = 10
+STREAM_ADDRESS = None # e.g. "tcp://127.0.0.1:9873" streams every sample to external viewers
+# With a path, a run killed part-way continues from its last checkpoint when
+# started again (e.g. "ensemble.ckpt"; delete the file to start over)
+CHECKPOINT_PATH = None # None: no checkpoints
+CHECKPOINT_EVERY = 500 # Steps between checkpoints
+
+# --- Ensemble Functions ---
+
+def make_ensemble(positions, velocities, size, perturbation, seed=0):
+    """
+    Returns (positions, velocities) of shape (size, bodies, dim).
+
+    Member 0 is the unperturbed reference; every other member has its
+    positions displaced by a random vector of length `perturbation`.
+    """
+    rng = np.random.default_rng(seed)
+    ens_pos = np.repeat(np.asarray(positions, dtype=float)[None], size, axis=0)
+    ens_vel = np.repeat(np.asarray(velocities, dtype=float)[None], size, axis=0)
+    offsets = rng.normal(size=(size - 1,) + ens_pos.shape[1:])
+    offsets *= perturbation / np.sqrt(np.sum(offsets**2, axis=(1, 2), keepdims=True))
+    ens_pos[1:] += offsets
+    return ens_pos, ens_vel
+
+
+def separation_from_reference(positions):
+    """RMS position distance of every member from member 0, shape (size - 1,)."""
+    delta = positions[1:] - positions[0]
+    return np.sqrt(np.mean(np.sum(delta**2, axis=-1), axis=-1))
+
+
+def run_ensemble(positions, velocities, masses, dt, steps, sample_every=10, softening=SOFTENING, stream=None,
+                 checkpoint=None, checkpoint_every=500):
+    """
+    Integrates every member in one batched RK4 loop.
+
+    Returns the sample times, the separation history of shape
+    (samples, size - 1) and the final positions and velocities. With a
+    StateStreamServer every sample's positions, flattened to
+    (size * bodies, dim), are published to its viewers.
+
+    With a checkpoint path the state is saved there every checkpoint_every
+    steps and at the end, and a run finds an earlier checkpoint of the same
+    setup there and continues from it; the result is bit-identical to an
+    uninterrupted run.
+    """
+    setup = {"size": len(positions), "dt": dt, "sample_every": sample_every, "softening": softening,
+             "initial_positions": np.asarray(positions, dtype=float)}
+    start = 0
+    times = [0.0]
+    separation = [separation_from_reference(positions)]
+    if checkpoint is not None and os.path.exists(checkpoint):
+        state = load_checkpoint(checkpoint, "ThreeBodyEnsemble")
+        if any(not np.array_equal(state["setup"][key], value) for key, value in setup.items()):
+            raise ValueError(f"{checkpoint} was saved by a run with different settings; delete it to start over")
+        start = state["step"]
+        if start > steps:
+            raise ValueError(f"{checkpoint} is already at step {start}, beyond the {steps} steps asked for")
+        # Copies, so the mapped file is released before it is overwritten
+        positions, velocities = np.array(state["positions"]), np.array(state["velocities"])
+        times = state["times"].tolist()
+        separation = list(np.array(state["separation"]))
+        del state
+        if start == steps:
+            print(f"{checkpoint} already holds the finished run of {steps} steps; nothing left to integrate")
+        else:
+            print(f"Continuing from step {start} of {checkpoint}")
+
+    def save(step):
+        save_checkpoint(checkpoint, "ThreeBodyEnsemble", {
+            "setup": setup, "step": step, "positions": positions, "velocities": velocities,
+            "times": np.array(times), "separation": np.array(separation),
+        })
+
+    for step in range(start + 1, steps + 1):
+        positions, velocities = rk4_step(positions, velocities, masses, dt, G, softening)
+        if step % sample_every == 0:
+            times.append(step * dt)
+            separation.append(separation_from_reference(positions))
+            if stream is not None:
+                stream.publish(step, step * dt, {"positions": positions.reshape(-1, positions.shape[-1])})
+        if checkpoint is not None and (step % checkpoint_every == 0 or step == steps):
+            save(step)
+    return np.array(times), np.array(separation), positions, velocities
+
+
+def divergence_times(times, separation, threshold):
+    """First time each member's separation exceeds `threshold` (inf if never)."""
+    diverged = separation > threshold
+    first = np.argmax(diverged, axis=0)
+    return np.where(diverged.any(axis=0), times[first], np.inf)
+
+
+def finite_time_lyapunov(times, separation, threshold):
+    """
+    Finite-time Lyapunov exponent per member, lambda = ln(d(t) / d(0)) / t.
+
+    t is the last sample before the separation saturates at `threshold`
+    (or the final sample), so the estimate stays in the exponential regime.
+    """
+    below = separation <= threshold
+    # Index of the last sample before the first crossing, for each member
+    last = np.where(below.all(axis=0), len(times) - 1, np.argmin(below, axis=0) - 1)
+    last = np.maximum(last, 1)
+    members = np.arange(separation.shape[1])
+    return np.log(separation[last, members] / separation[0]) / times[last]
+
+# --- Main Program ---
+if __name__ == "__main__":
+    stream = StateStreamServer(STREAM_ADDRESS) if STREAM_ADDRESS else None
+    resumed = CHECKPOINT_PATH is not None and os.path.exists(CHECKPOINT_PATH)
+    start = time.perf_counter()
+    ens_pos, ens_vel = make_ensemble(POSITIONS, VELOCITIES, ENSEMBLE_SIZE, PERTURBATION)
+    times, separation, _, _ = run_ensemble(ens_pos, ens_vel, MASSES, TIME_STEP, STEPS, SAMPLE_EVERY, stream=stream,
+                                           checkpoint=CHECKPOINT_PATH, checkpoint_every=CHECKPOINT_EVERY)
+    elapsed = time.perf_counter() - start
+    if stream is not None:
+        stream.close()
+
+    t_div = divergence_times(times, separation, DIVERGENCE_DISTANCE)
+    lyapunov = finite_time_lyapunov(times, separation, DIVERGENCE_DISTANCE)
+    diverged = np.isfinite(t_div)
+
+    if resumed:
+        print(f"Finished {ENSEMBLE_SIZE} copies x {STEPS} steps from the checkpoint in {elapsed:.2f} s "
+              f"(only the steps after it were integrated)")
+    else:
+        print(f"Integrated {ENSEMBLE_SIZE} copies x {STEPS} steps in {elapsed:.2f} s")
+    print(f"Total simulated time: {STEPS * TIME_STEP / 86400:.1f} days")
+    print(f"Finite-time Lyapunov exponent: median {np.median(lyapunov):.3e} 1/s "
+          f"(e-folding time {1 / np.median(lyapunov) / 86400:.1f} days)")
+    if diverged.any():
+        print(f"Diverged copies: {diverged.sum()} / {len(t_div)}, "
+              f"median divergence time {np.median(t_div[diverged]) / 86400:.1f} days")
+    else:
+        print("No divergence detected within the simulated time, so the exponent above is not a growth rate; "
+              "increase STEPS or PERTURBATION")
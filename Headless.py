@@ -0,0 +1,588 @@
+import argparse
+import csv
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# --- Headless Runner ---
+# Runs any of the simulations without a window, for batch jobs and machines
+# without a display:
+#
+#   python Headless.py list
+#   python Headless.py run particles --steps 5000 --engine wca --count 2000 --diagnostics gas.csv
+#
+# The scripts with a window build it when they are started, so they cannot
+# be driven from here. Every simulation is instead rebuilt from the same
+# UI-free engines the scripts use (ElasticGas, MolecularDynamics,
+# LorentzEngine, EphemerisCache, JacobiMoonModel, BlockTimestepIntegrator,
+# the ensemble and atmosphere models), with the scripts' settings. Nothing
+# here imports tkinter or turtle.
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SIMULATION_FOLDERS = ("ParticleSimulation", "LorentzForce", "PlanetaryOrbits", "MoonOrbits",
+                      "EarthSimulationNewtonLaw/Example3and4", "SimpleWeatherSimulation")
+sys.path.insert(0, ROOT)
+for folder in SIMULATION_FOLDERS:
+    sys.path.insert(0, os.path.join(ROOT, folder))
+
+from SimulationCore.BlockTimestep import BlockTimestepIntegrator
+from SimulationCore.Diagnostics import conserved_totals, gravitational_potential
+from SimulationCore.EphemerisCache import EphemerisCache
+from SimulationCore.Gravity import G, rk4_step
+from SimulationCore.MolecularDynamics import MolecularDynamics, WCA_CUTOFF
+from SimulationCore.Profiler import Profiler
+from AtmosphereModel import AtmosphereModel
+from BodyCatalogue import generate_belt, load_catalogue
+from ElasticGas import ElasticGas, random_particles
+from JacobiOrbit import JacobiMoonModel, MOON_DISTANCE, SIDEREAL_MONTH
+from LorentzEngine import INTEGRATORS as LORENTZ_INTEGRATORS, LorentzEngine
+from ParallelAtmosphere import ParallelAtmosphere
+from ThreeBodyEnsemble import (DIVERGENCE_DISTANCE, ENSEMBLE_SIZE, MASSES, PERTURBATION, POSITIONS, SOFTENING,
+                               TIME_STEP as ENSEMBLE_TIME_STEP, VELOCITIES, make_ensemble,
+                               separation_from_reference)
+
+# --- Settings ---
+# The values the scripts use, so a headless run continues what the window shows
+PARTICLE_BOX = (1000, 700) # ParticleSimulation.py canvas
+MD_CUTOFFS = {"lennard-jones": 2.5, "wca": WCA_CUTOFF} # Cutoff in σ
+MD_EPSILON = 40.0
+MD_TEMPERATURE = 20.0
+MD_TAU = 50.0
+MD_SUBSTEPS = 10
+LORENTZ_BOX = (800, 600)
+LORENTZ_FIELD = 0.1 # Initial slider value of LorentzForceSimulation.py
+LORENTZ_TIME_STEP = 0.5
+CATALOGUE_PATH = os.path.join(ROOT, "PlanetaryOrbits", "planets.json")
+EPHEMERIS_SEGMENT = 120
+BELT_RANGE = (170, 200) # Orbits of the extra bodies that --count adds to the catalogue (px)
+MOON_SECONDS_PER_STEP = SIDEREAL_MONTH / 360 # One degree of the circular orbit per step
+ORBIT_TIME_STEP = 3600 * 24 # Example1Enhance.py
+WEATHER_NZ = 96
+WEATHER_DT = 10.0
+
+# --- Simulations ---
+# Each class builds one simulation from the command-line choices and offers
+#   advance(steps)  moves it on by `steps` steps
+#   snapshot()      dict of arrays saved per recorded step in the trajectory
+#   measure()       dict of numbers written per recorded step as diagnostics
+#   constants       dict of arrays saved once with the trajectory
+# engines and integrators list the choices, the first being the default; an
+# empty tuple means the simulation has a single one. count is None when
+# --count does not apply.
+
+class HeadlessRun(ABC):
+    name = ""
+    description = ""
+    engines = ()
+    integrators = ()
+    count = None       # What --count sets, e.g. "particles"
+    default_count = None
+    minimum_count = 1
+    parallel = False   # Whether --workers applies
+    element = "bodies" # What `elements` counts, for the benchmark
+
+    def __init__(self, engine, integrator, count, seed, workers, profiler):
+        self.engine = engine
+        self.integrator = integrator
+        self.seed = seed
+        self.profiler = profiler
+        self.time = 0.0
+        self.constants = {}
+
+    @property
+    def elements(self):
+        """Particles, bodies, members or grid cells moved per step, for the benchmark."""
+        return 1
+
+    @abstractmethod
+    def advance(self, steps):
+        """Moves the simulation on by `steps` steps and updates self.time."""
+
+    def snapshot(self):
+        return {}
+
+    def measure(self):
+        return {}
+
+    def close(self):
+        pass
+
+
+class ParticlesRun(HeadlessRun):
+    name = "particles"
+    description = "Gas of colliding disks (ParticleSimulation.py); one step is one frame"
+    engines = ("elastic", "lennard-jones", "wca")
+    count = "particles"
+    default_count = 70
+    element = "particles"
+
+    def __init__(self, engine, integrator, count, seed, workers, profiler):
+        super().__init__(engine, integrator, count, seed, workers, profiler)
+        rng = random.Random(seed)
+        radii, masses, positions, velocities = random_particles(count, *PARTICLE_BOX, rng)
+        self.masses = masses
+        self.constants = {"radii": radii, "masses": masses}
+        if engine == "elastic":
+            self.gas = ElasticGas(positions, velocities, radii, masses, PARTICLE_BOX, profiler=profiler)
+            self.md = None
+        else:
+            self.gas = None
+            self.md = MolecularDynamics(positions, velocities, masses, 2.0 * radii / WCA_CUTOFF,
+                                        epsilon=MD_EPSILON, cutoff=MD_CUTOFFS[engine], box=PARTICLE_BOX,
+                                        dt=1.0 / MD_SUBSTEPS, temperature=MD_TEMPERATURE, tau=MD_TAU,
+                                        seed=rng.getrandbits(64))
+            self.md.minimize() # Randomly placed particles may overlap
+
+    @property
+    def elements(self):
+        return len(self.masses)
+
+    def state(self):
+        engine = self.gas if self.md is None else self.md
+        return engine.positions, engine.velocities
+
+    def advance(self, steps):
+        if self.md is None:
+            self.gas.advance(steps)
+        else:
+            self.md.advance(steps * MD_SUBSTEPS)
+        self.time += steps
+
+    def snapshot(self):
+        positions, velocities = self.state()
+        return {"positions": positions, "velocities": velocities}
+
+    def measure(self):
+        positions, velocities = self.state()
+        kinetic = conserved_totals(self.masses, positions, velocities)[0]
+        potential = 0.0 if self.md is None else self.md.potential_energy
+        wall_impulse = self.gas.wall_impulse if self.md is None else self.md.wall_impulse
+        return {"kinetic": kinetic, "potential": potential, "energy": kinetic + potential,
+                "temperature": kinetic / len(self.masses), "wall_impulse": wall_impulse}
+
+
+class LorentzRun(HeadlessRun):
+    name = "lorentz"
+    description = "Charged particles in a magnetic field (LorentzForceSimulation.py); one step is one frame"
+    integrators = LORENTZ_INTEGRATORS
+    count = "particles"
+    default_count = 50
+    element = "particles"
+
+    def __init__(self, engine, integrator, count, seed, workers, profiler):
+        super().__init__(engine, integrator, count, seed, workers, profiler)
+        # Same draws as Particle.__init__ of the script
+        rng = random.Random(seed)
+        width, height = LORENTZ_BOX
+        positions, velocities, charges = [], [], []
+        for _ in range(count):
+            positions.append((rng.uniform(4, width - 4), rng.uniform(4, height - 4)))
+            velocities.append((rng.uniform(-2, 2), rng.uniform(-2, 2)))
+            charges.append(rng.choice([-1, 1]))
+        self.lorentz = LorentzEngine(positions, velocities, charges, LORENTZ_FIELD, width, height,
+                                     time_step=LORENTZ_TIME_STEP, integrator=integrator)
+        self.constants = {"charges": self.lorentz.charges}
+
+    @property
+    def elements(self):
+        return len(self.lorentz.charges)
+
+    def advance(self, steps):
+        for _ in range(steps):
+            self.lorentz.step()
+        self.time += steps * LORENTZ_TIME_STEP
+
+    def snapshot(self):
+        return self.lorentz.snapshot()
+
+    def measure(self):
+        speeds = np.hypot(*self.lorentz.velocities.T)
+        return {"kinetic": 0.5 * float(np.sum(speeds**2)), "mean_speed": float(speeds.mean()),
+                "max_speed": float(speeds.max())}
+
+
+class PlanetsRun(HeadlessRun):
+    name = "planets"
+    description = "Solar system catalogue (PlanetaryOrbits.py); one step is one frame"
+    engines = ("ephemeris", "closed-form")
+    count = "extra belt bodies"
+    default_count = 0
+    minimum_count = 0
+
+    def __init__(self, engine, integrator, count, seed, workers, profiler):
+        super().__init__(engine, integrator, count, seed, workers, profiler)
+        self.catalogue = load_catalogue(CATALOGUE_PATH)
+        if count:
+            self.catalogue.extend(generate_belt(count, *BELT_RANGE, seed=seed, name="Extra"))
+        self.ephemeris = EphemerisCache(self.catalogue.positions_at, EPHEMERIS_SEGMENT, max_segments=8)
+        self.positions = self.catalogue.positions_at([0.0])[0]
+        self.constants = {"distance": self.catalogue.distance, "speed": self.catalogue.speed}
+
+    @property
+    def elements(self):
+        return len(self.catalogue)
+
+    def advance(self, steps):
+        # The positions of the frames in between are looked up as the window would
+        for _ in range(steps):
+            self.time += 1
+            if self.engine == "ephemeris":
+                self.positions = self.ephemeris.positions(self.time)
+            else:
+                self.positions = self.catalogue.positions_at([self.time])[0]
+
+    def snapshot(self):
+        return {"positions": self.positions}
+
+    def measure(self):
+        exact = self.catalogue.positions_at([self.time])[0]
+        return {"max_error_px": float(np.max(np.hypot(*(self.positions - exact).T)))}
+
+
+class MoonRun(HeadlessRun):
+    name = "moon"
+    description = "Moon around the Earth (MoonOrbits.py), in metres; one step is 1/360 sidereal month"
+    engines = ("circular", "jacobi")
+    element = "moon"
+
+    def __init__(self, engine, integrator, count, seed, workers, profiler):
+        super().__init__(engine, integrator, count, seed, workers, profiler)
+        self.model = JacobiMoonModel(dt=MOON_SECONDS_PER_STEP) if engine == "jacobi" else None
+        self.initial_energy = self.model.energy() if self.model is not None else None
+
+    def offset(self):
+        if self.model is not None:
+            return self.model.r
+        theta = 2 * np.pi * self.time / SIDEREAL_MONTH
+        return MOON_DISTANCE * np.array([np.cos(theta), np.sin(theta)])
+
+    def advance(self, steps):
+        for _ in range(steps):
+            if self.model is not None:
+                self.model.step()
+            self.time += MOON_SECONDS_PER_STEP
+
+    def snapshot(self):
+        return {"moon": self.offset()}
+
+    def measure(self):
+        row = {"distance": float(np.linalg.norm(self.offset()))}
+        if self.model is not None:
+            energy = self.model.energy()
+            row.update(energy=energy, energy_drift=abs(energy / self.initial_energy - 1))
+        return row
+
+
+class OrbitRun(HeadlessRun):
+    name = "orbit"
+    description = "Sun and Earth, plus the Moon for block and rk4 (Example1Enhance.py); one step is one day"
+    integrators = ("euler", "block", "rk4")
+
+    def __init__(self, engine, integrator, count, seed, workers, profiler):
+        super().__init__(engine, integrator, count, seed, workers, profiler)
+        masses = [1.989e30, 5.972e24]
+        positions = [(0.0, 0.0), (-1.496e11, 0.0)]
+        velocities = [(0.0, 0.0), (0.0, 29780.0)]
+        if integrator != "euler":
+            masses.append(7.342e22)
+            positions.append((-1.496e11 - 384.4e6, 0.0))
+            velocities.append((0.0, 29780.0 + 1022))
+        self.masses = np.array(masses)
+        self.positions = np.array(positions)
+        self.velocities = np.array(velocities)
+        self.block = (BlockTimestepIntegrator(self.masses, self.positions, self.velocities, dt_max=ORBIT_TIME_STEP)
+                      if integrator == "block" else None)
+        self.constants = {"masses": self.masses}
+
+    @property
+    def elements(self):
+        return len(self.masses)
+
+    def euler_step(self):
+        """The script's step: the Sun stays pinned and pulls the Earth, velocity first."""
+        sun_mass, earth_mass = self.masses
+        (px, py), (vx, vy) = self.positions[1], self.velocities[1]
+        dist_x, dist_y = -px, -py
+        force = G * sun_mass * earth_mass / (dist_x**2 + dist_y**2)
+        theta = math.atan2(dist_y, dist_x)
+        vx += math.cos(theta) * force / earth_mass * ORBIT_TIME_STEP
+        vy += math.sin(theta) * force / earth_mass * ORBIT_TIME_STEP
+        self.positions[1] = (px + vx * ORBIT_TIME_STEP, py + vy * ORBIT_TIME_STEP)
+        self.velocities[1] = (vx, vy)
+
+    def advance(self, steps):
+        for _ in range(steps):
+            if self.integrator == "block":
+                self.block.advance(ORBIT_TIME_STEP)
+            elif self.integrator == "rk4":
+                self.positions, self.velocities = rk4_step(self.positions, self.velocities, self.masses,
+                                                           ORBIT_TIME_STEP)
+            else:
+                self.euler_step()
+        if self.block is not None:
+            self.positions, self.velocities = self.block.state()
+        self.time += steps * ORBIT_TIME_STEP
+
+    def snapshot(self):
+        return {"positions": self.positions, "velocities": self.velocities}
+
+    def measure(self):
+        kinetic, px, py, angular = conserved_totals(self.masses, self.positions, self.velocities)
+        potential = gravitational_potential(self.masses, self.positions, G)
+        return {"kinetic": kinetic, "potential": potential, "energy": kinetic + potential,
+                "px": px, "py": py, "angular": angular}
+
+
+def advance_members(positions, velocities, steps):
+    """Integrates a slice of the ensemble; runs in the worker processes."""
+    for _ in range(steps):
+        positions, velocities = rk4_step(positions, velocities, MASSES, ENSEMBLE_TIME_STEP, G, SOFTENING)
+    return positions, velocities
+
+
+class EnsembleRun(HeadlessRun):
+    name = "ensemble"
+    description = "Perturbed copies of the chaotic three-body system (ThreeBodyEnsemble.py); one step is 50 minutes"
+    integrators = ("rk4",)
+    count = "members"
+    default_count = ENSEMBLE_SIZE
+    minimum_count = 2 # The reference and one perturbed copy
+    parallel = True
+    element = "members"
+
+    def __init__(self, engine, integrator, count, seed, workers, profiler):
+        super().__init__(engine, integrator, count, seed, workers, profiler)
+        self.positions, self.velocities = make_ensemble(POSITIONS, VELOCITIES, count, PERTURBATION, seed)
+        # Members are independent, so each worker integrates a contiguous slice
+        self.slices = np.array_split(np.arange(count), min(workers, count)) if workers > 1 else None
+        self.pool = ProcessPoolExecutor(len(self.slices)) if self.slices else None
+        self.constants = {"masses": MASSES}
+
+    @property
+    def elements(self):
+        return len(self.positions)
+
+    def advance(self, steps):
+        if self.pool is None:
+            self.positions, self.velocities = advance_members(self.positions, self.velocities, steps)
+        else:
+            futures = [self.pool.submit(advance_members, self.positions[part], self.velocities[part], steps)
+                       for part in self.slices]
+            for part, future in zip(self.slices, futures):
+                self.positions[part], self.velocities[part] = future.result()
+        self.time += steps * ENSEMBLE_TIME_STEP
+
+    def snapshot(self):
+        return {"positions": self.positions}
+
+    def measure(self):
+        separation = separation_from_reference(self.positions)
+        return {"median_separation": float(np.median(separation)), "max_separation": float(separation.max()),
+                "diverged": float(np.mean(separation > DIVERGENCE_DISTANCE))}
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+
+class WeatherRun(HeadlessRun):
+    name = "weather"
+    description = "Atmosphere grid model (SimpleWeatherSimulation.py); one step is 10 s"
+    count = "grid columns"
+    default_count = 256
+    parallel = True
+    element = "cells"
+
+    def __init__(self, engine, integrator, count, seed, workers, profiler):
+        super().__init__(engine, integrator, count, seed, workers, profiler)
+        self.model = AtmosphereModel(nx=count, nz=WEATHER_NZ, dt=WEATHER_DT, seed=seed)
+        self.parallel_model = ParallelAtmosphere(self.model, workers) if workers > 1 else None
+
+    @property
+    def elements(self):
+        return self.model.nx * self.model.nz
+
+    def advance(self, steps):
+        (self.parallel_model or self.model).advance(steps)
+        self.time = self.model.time
+
+    def snapshot(self):
+        return {"cloud": self.model.cloud, "precipitation": self.model.precipitation}
+
+    def measure(self):
+        row = self.model.diagnostics()
+        del row["time"]
+        return row
+
+    def close(self):
+        if self.parallel_model is not None:
+            self.parallel_model.close()
+
+
+SIMULATIONS = {run.name: run for run in (ParticlesRun, LorentzRun, PlanetsRun, MoonRun, OrbitRun, EnsembleRun,
+                                         WeatherRun)}
+
+# --- Outputs ---
+
+def write_trajectory(path, steps, times, frames, constants):
+    """Saves the recorded snapshots stacked along a first axis, with their steps and times."""
+    arrays = {name: np.stack([frame[name] for frame in frames]) for name in frames[0]}
+    np.savez_compressed(path, step=np.array(steps), time=np.array(times), **arrays, **constants)
+    print(f"Wrote {len(steps)} snapshots to {path}")
+
+
+def write_diagnostics(path, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Wrote {len(rows)} diagnostic rows to {path}")
+
+
+def write_benchmark(path, report):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote the benchmark to {path}")
+
+# --- Commands ---
+
+def list_simulations():
+    for run in SIMULATIONS.values():
+        print(f"{run.name}: {run.description}")
+        if run.engines:
+            print(f"    engines:     {', '.join(run.engines)} (default {run.engines[0]})")
+        if run.integrators:
+            print(f"    integrators: {', '.join(run.integrators)} (default {run.integrators[0]})")
+        if run.count:
+            print(f"    --count:     {run.count} (default {run.default_count})")
+        if run.parallel:
+            print(f"    --workers:   processes sharing the work")
+
+
+def choose(parser, run, option, value, choices):
+    """The chosen engine or integrator, or the default; exits with a usage error if it does not apply."""
+    if value is None:
+        return choices[0] if choices else None
+    if value not in choices:
+        available = ", ".join(choices) if choices else "none"
+        parser.error(f"{run.name} has no {option} {value!r} (available: {available})")
+    return value
+
+
+def run_simulation(parser, args):
+    run = SIMULATIONS[args.name]
+    engine = choose(parser, run, "engine", args.engine, run.engines)
+    integrator = choose(parser, run, "integrator", args.integrator, run.integrators)
+    if args.count is not None and run.count is None:
+        parser.error(f"{run.name} has a fixed number of bodies; --count does not apply")
+    if args.workers > 1 and not run.parallel:
+        parser.error(f"{run.name} runs in one process; --workers applies to "
+                     f"{', '.join(name for name, other in SIMULATIONS.items() if other.parallel)}")
+    if args.steps < 0 or args.every < 1 or args.workers < 1:
+        parser.error("--steps must not be negative, --every and --workers must be at least 1")
+    count = args.count if args.count is not None else run.default_count
+    if count is not None and count < run.minimum_count:
+        parser.error(f"{run.name} needs --count {run.minimum_count} or more")
+
+    profiler = Profiler(enabled=bool(args.profile))
+    start = time.perf_counter()
+    with profiler.span("setup"):
+        simulation = run(engine, integrator, count, args.seed, args.workers, profiler)
+    setup_seconds = time.perf_counter() - start
+
+    # Steps 0, every, 2 * every, ... and the last one are recorded
+    steps, times, frames, rows = [], [], [], []
+
+    def record(step):
+        if args.trajectory:
+            with profiler.span("output"):
+                steps.append(step)
+                times.append(simulation.time)
+                frames.append({name: np.array(value) for name, value in simulation.snapshot().items()})
+        if args.diagnostics:
+            with profiler.span("measure"):
+                rows.append({"step": step, "time": simulation.time, **simulation.measure()})
+
+    try:
+        record(0)
+        done = 0
+        start = time.perf_counter()
+        physics_seconds = 0.0
+        while done < args.steps:
+            chunk = min(args.every, args.steps - done)
+            began = time.perf_counter()
+            with profiler.span("physics"):
+                simulation.advance(chunk)
+            physics_seconds += time.perf_counter() - began
+            done += chunk
+            record(done)
+        run_seconds = time.perf_counter() - start
+    finally:
+        simulation.close()
+
+    steps_per_second = args.steps / physics_seconds if physics_seconds else None
+    print(f"{run.name}: {args.steps} steps of {simulation.elements} {run.element} in {run_seconds:.3f} s "
+          f"(physics {physics_seconds:.3f} s"
+          + (f", {steps_per_second:,.1f} steps/s, {steps_per_second * simulation.elements:,.0f} element-steps/s)"
+             if steps_per_second else ")"))
+
+    if args.trajectory:
+        write_trajectory(args.trajectory, steps, times, frames, simulation.constants)
+    if args.diagnostics:
+        write_diagnostics(args.diagnostics, rows)
+    if args.benchmark:
+        write_benchmark(args.benchmark, {
+            "simulation": run.name, "engine": engine, "integrator": integrator, "count": count,
+            "elements": simulation.elements, "steps": args.steps, "every": args.every, "seed": args.seed,
+            "workers": args.workers, "setup_seconds": setup_seconds, "run_seconds": run_seconds,
+            "physics_seconds": physics_seconds, "steps_per_second": steps_per_second,
+            "element_steps_per_second": steps_per_second * simulation.elements if steps_per_second else None,
+            "python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+        })
+    if args.profile:
+        profiler.dump(args.profile)
+
+
+def make_parser():
+    parser = argparse.ArgumentParser(description="Runs the physics simulations without a window.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="list the simulations with their engines, integrators and options")
+
+    run = commands.add_parser("run", help="run one simulation for a number of steps")
+    run.add_argument("name", choices=list(SIMULATIONS))
+    run.add_argument("--steps", type=int, default=1000, help="steps to run (default 1000)")
+    run.add_argument("--engine", help="physics engine (see list)")
+    run.add_argument("--integrator", help="time integrator (see list)")
+    run.add_argument("--count", type=int, help="particles, bodies or members (see list)")
+    run.add_argument("--seed", type=int, default=0, help="seed of the initial conditions (default 0)")
+    run.add_argument("--every", type=int, default=10,
+                     help="steps between recorded snapshots and diagnostic rows (default 10)")
+    run.add_argument("--trajectory", metavar="PATH", help="save the recorded snapshots to a .npz file")
+    run.add_argument("--diagnostics", metavar="PATH", help="write the recorded measurements to a CSV file")
+    run.add_argument("--benchmark", metavar="PATH", help="write timings and the machine description as JSON")
+    run.add_argument("--profile", metavar="PATH",
+                     help="time setup, physics, measurements and output; .json or .csv histograms")
+    run.add_argument("--workers", type=int, default=1, help="worker processes (ensemble and weather only)")
+    return parser
+
+
+def main(argv=None):
+    parser = make_parser()
+    args = parser.parse_args(argv)
+    if args.command == "list":
+        list_simulations()
+    else:
+        run_simulation(parser, args)
+
+
+if __name__ == "__main__":
+    main()
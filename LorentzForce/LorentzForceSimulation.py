@@ -1,20 +1,72 @@
 import tkinter as tk
 from tkinter import ttk
 import random
+import os
+import sys
+
+import numpy as np
+
+# Make the shared SimulationCore package importable when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from SimulationCore.BackgroundPhysics import PhysicsWorker
+from SimulationCore.Checkpoint import load_checkpoint, random_state, restore_random, save_checkpoint
+from SimulationCore.LevelOfDetail import LevelOfDetail
+from SimulationCore.Profiler import ProfileOverlay, Profiler
+from SimulationCore.StateStream import StateStreamServer
+from LorentzEngine import LorentzEngine
+
+TIME_STEP = 0.5 # Kept constant for stability
+
+# --- Physics Worker ---
+# With PHYSICS_WORKER the particles move in a separate process (on a second
+# core) at PHYSICS_RATE steps per second, and the window only draws the
+# newest finished step. The B-field slider and canvas resizes are posted to
+# the worker as commands, so neither side waits for the other.
+PHYSICS_WORKER = False
+PHYSICS_RATE = 1000 / 15 # The pace of the 15 ms animation timer
+
+# --- Level of Detail ---
+# With more than LOD_MAX_SPRITES particles in view one heatmap image replaces
+# the circles; zooming in (mouse wheel) brings them back
+LOD_MAX_SPRITES = 1500
+LOD_MODE = "density"       # "density" or "speed" (mean speed per bin)
+LOD_SPEED_RANGE = (0.0, 3.0)
+
+# --- State Stream ---
+# An address such as "tcp://127.0.0.1:9871" or "unix:///tmp/lorentz.sock"
+# publishes every drawn step to external viewers (see SimulationCore/StateStream.py)
+STREAM_ADDRESS = None
+
+# --- Checkpoints ---
+# Save writes the particles, the field and the random generator to
+# CHECKPOINT_PATH; Load continues from them exactly, on a canvas of the
+# same size. SEED seeds the generator (None: new particles every run).
+CHECKPOINT_PATH = "lorentz.ckpt"
+SEED = None
+
+# --- Profiling ---
+# PROFILE_OVERLAY shows the frame rate, the physics and render times and the
+# particle count on the canvas; PROFILE_PATH (".json" or ".csv") receives
+# histograms of every phase of the frame when the program exits. With the
+# physics worker the window only times fetching the worker's snapshot.
+PROFILE_OVERLAY = False
+PROFILE_PATH = None
 
 # --- Particle Class ---
 # Encapsulates the properties and behavior of a single particle.
 class Particle:
-    def __init__(self, canvas, width, height):
+    RADIUS = 4
+
+    def __init__(self, canvas, width, height, rng):
         self.canvas = canvas
-        self.radius = 4
+        self.radius = self.RADIUS
 
         # --- Physical Properties ---
-        self.x = random.uniform(self.radius, width - self.radius)
-        self.y = random.uniform(self.radius, height - self.radius)
-        self.vx = random.uniform(-2, 2)
-        self.vy = random.uniform(-2, 2)
-        self.charge = random.choice([-1, 1])
+        self.x = rng.uniform(self.radius, width - self.radius)
+        self.y = rng.uniform(self.radius, height - self.radius)
+        self.vx = rng.uniform(-2, 2)
+        self.vy = rng.uniform(-2, 2)
+        self.charge = rng.choice([-1, 1])
 
         # --- Visual Properties ---
         color = "blue" if self.charge < 0 else "red"
@@ -24,7 +76,8 @@ class Particle:
             self.x - self.radius, self.y - self.radius,
             self.x + self.radius, self.y + self.radius,
             fill=color,
-            outline=""
+            outline="",
+            tags="particle"
         )
 
     def update(self, magnetic_field, time_step, width, height):
@@ -41,8 +94,7 @@ class Particle:
         self.vy += ay * time_step
 
         # --- Update Position ---
-        # We move the object on the canvas instead of deleting and redrawing
-        self.canvas.move(self.id, self.vx * time_step, self.vy * time_step)
+        # The canvas item is placed afterwards by the level-of-detail view
         self.x += self.vx * time_step
         self.y += self.vy * time_step
 
@@ -55,15 +107,24 @@ class Particle:
 # --- Simulation Class ---
 # Manages the UI, canvas, and the main animation loop.
 class LorentzSimulation:
-    def __init__(self, root):
+    def __init__(self, root, stream=None, profiler=None, overlay=False):
         self.root = root
         self.root.title("Interactive Lorentz Force Simulation")
         self.root.configure(bg="#2c3e50")
 
         # --- Simulation State ---
         self.particles = []
+        self.items = []
         self.is_running = False
         self.animation_job = None
+        self.worker = None # PhysicsWorker in the background mode
+        self.rng = random.Random(SEED)
+        self.shown = None # Positions and velocities of the last drawn step
+        self.step_count = 0
+        self.worker_start = 0
+        self.stream = stream # Optional StateStreamServer for external viewers
+        # Optional Profiler timing the phases of every frame
+        self.profiler = profiler if profiler is not None else Profiler(enabled=False)
 
         # --- UI Setup ---
         self.setup_controls()
@@ -71,6 +132,12 @@ class LorentzSimulation:
         # --- Canvas Setup ---
         self.canvas = tk.Canvas(root, bg="black", highlightthickness=0)
         self.canvas.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
+        # Draws the particles as circles, or as a heatmap when crowded
+        self.lod = LevelOfDetail(self.canvas, max_sprites=LOD_MAX_SPRITES, mode=LOD_MODE,
+                                 value_range=LOD_SPEED_RANGE)
+        self.lod.bind()
+        self.canvas.bind("<Configure>", self.on_resize)
+        self.overlay = ProfileOverlay(self.canvas, self.profiler) if overlay else None
 
     def setup_controls(self):
         """Creates the control panel with sliders and buttons."""
@@ -84,45 +151,107 @@ class LorentzSimulation:
         self.pause_button.pack(side=tk.LEFT, padx=5)
         self.reset_button = ttk.Button(control_frame, text="Reset", command=self.reset_simulation)
         self.reset_button.pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Save", command=self.save_checkpoint).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Load", command=self.load_checkpoint).pack(side=tk.LEFT, padx=5)
 
         # --- Magnetic Field Slider ---
         ttk.Label(control_frame, text="B-Field:").pack(side=tk.LEFT, padx=(15, 0))
         self.b_field_var = tk.DoubleVar(value=0.1)
-        self.b_field_slider = ttk.Scale(control_frame, from_=-0.5, to=0.5, variable=self.b_field_var, orient=tk.HORIZONTAL)
+        self.b_field_slider = ttk.Scale(control_frame, from_=-0.5, to=0.5, variable=self.b_field_var, orient=tk.HORIZONTAL,
+                                        command=lambda value: self.post("magnetic_field", float(value)))
         self.b_field_slider.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
 
         # --- Particle Count Slider ---
         ttk.Label(control_frame, text="Particles:").pack(side=tk.LEFT, padx=(15, 0))
         self.particle_count_var = tk.IntVar(value=50)
-        self.particle_count_slider = ttk.Scale(control_frame, from_=1, to=200, variable=self.particle_count_var, orient=tk.HORIZONTAL)
+        self.particle_count_slider = ttk.Scale(control_frame, from_=1, to=5000, variable=self.particle_count_var, orient=tk.HORIZONTAL)
         self.particle_count_slider.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
 
     def create_particles(self):
         """Clears the canvas and creates a new set of particles."""
+        self.place_particles(self.particle_count_var.get())
+        self.step_count = 0
+        self.start_worker()
+
+    def place_particles(self, count):
+        """Replaces the particles and their canvas items with `count` random ones."""
+        self.lod.reset()
         self.canvas.delete("all")
         self.particles.clear()
+        self.shown = None
         self.canvas.update_idletasks() # Ensure canvas has its size
         width = self.canvas.winfo_width()
         height = self.canvas.winfo_height()
 
-        for _ in range(self.particle_count_var.get()):
-            self.particles.append(Particle(self.canvas, width, height))
+        for _ in range(count):
+            self.particles.append(Particle(self.canvas, width, height, self.rng))
+        self.items = [p.id for p in self.particles]
+
+    def start_worker(self):
+        """In the background mode, hands the particles to a new physics worker."""
+        if PHYSICS_WORKER:
+            self.close_worker()
+            engine = LorentzEngine([(p.x, p.y) for p in self.particles], [(p.vx, p.vy) for p in self.particles],
+                                   [p.charge for p in self.particles], self.b_field_var.get(),
+                                   self.canvas.winfo_width(), self.canvas.winfo_height(),
+                                   time_step=TIME_STEP, radius=Particle.RADIUS)
+            self.worker = PhysicsWorker(engine, steps_per_second=PHYSICS_RATE, paused=not self.is_running)
+            self.worker_start = self.step_count # The worker counts its steps from here
+
+    def post(self, name, value):
+        """Hands a changed parameter to the physics worker, if there is one."""
+        if self.worker is not None:
+            self.worker.post(name, value)
+
+    def on_resize(self, event):
+        self.post("width", event.width)
+        self.post("height", event.height)
+
+    def close_worker(self):
+        if self.worker is not None:
+            self.worker.close()
+            self.worker = None
 
     def update_loop(self):
         """The core animation loop that updates every particle."""
         if not self.is_running:
             return
 
-        width = self.canvas.winfo_width()
-        height = self.canvas.winfo_height()
-        magnetic_field = self.b_field_var.get()
-        time_step = 0.5 # Kept constant for stability
+        with self.profiler.frame():
+            if self.worker is not None:
+                # Draw the newest step the worker has finished, if any
+                with self.profiler.span("snapshot"):
+                    frame = self.worker.latest()
+                if frame is not None:
+                    self.step_count = self.worker_start + self.worker.step
+                    self.draw_particles(frame["positions"], frame["velocities"])
+            else:
+                width = self.canvas.winfo_width()
+                height = self.canvas.winfo_height()
+                magnetic_field = self.b_field_var.get()
 
-        for p in self.particles:
-            p.update(magnetic_field, time_step, width, height)
+                with self.profiler.span("physics"):
+                    for p in self.particles:
+                        p.update(magnetic_field, TIME_STEP, width, height)
+                self.step_count += 1
+                self.draw_particles(np.array([(p.x, p.y) for p in self.particles]).reshape(-1, 2),
+                                    np.array([(p.vx, p.vy) for p in self.particles]).reshape(-1, 2))
+            if self.overlay is not None:
+                self.overlay.update(len(self.particles))
 
         self.animation_job = self.root.after(15, self.update_loop)
 
+    def draw_particles(self, positions, velocities):
+        """Shows the particles as circles, or as one heatmap when too many are in view."""
+        self.shown = (positions, velocities)
+        with self.profiler.span("render"):
+            speeds = np.hypot(velocities[:, 0], velocities[:, 1])
+            self.lod.draw(self.items, positions[:, 0], positions[:, 1], Particle.RADIUS, speeds)
+        if self.stream is not None:
+            with self.profiler.span("stream"):
+                self.stream.publish(self.step_count, self.step_count * TIME_STEP,
+                                    {"positions": positions, "velocities": velocities})
+
     def start_simulation(self):
         if self.is_running:
             return
@@ -131,6 +260,8 @@ class LorentzSimulation:
         self.pause_button.config(state=tk.NORMAL)
         if not self.particles:
             self.create_particles()
+        if self.worker is not None:
+            self.worker.resume()
         self.update_loop()
 
     def pause_simulation(self):
@@ -139,6 +270,9 @@ class LorentzSimulation:
         self.is_running = False
         if self.animation_job:
             self.root.after_cancel(self.animation_job)
+        self.profiler.interrupt()
+        if self.worker is not None:
+            self.worker.pause()
         self.start_button.config(state=tk.NORMAL)
         self.pause_button.config(state=tk.DISABLED)
 
@@ -147,11 +281,74 @@ class LorentzSimulation:
         self.create_particles()
         self.start_button.config(text="Start")
 
+    # --- Checkpoints ---
+    # The last drawn step is saved: with the physics worker that is the
+    # newest step the window has, without it the particles' own state.
+
+    def checkpoint_state(self):
+        """The particles, field and generator as a checkpoint state (see SimulationCore/Checkpoint.py)."""
+        if self.shown is None:
+            positions = [(p.x, p.y) for p in self.particles]
+            velocities = [(p.vx, p.vy) for p in self.particles]
+        else:
+            positions, velocities = self.shown
+        return {
+            "positions": np.array(positions, dtype=float).reshape(-1, 2),
+            "velocities": np.array(velocities, dtype=float).reshape(-1, 2),
+            "charges": np.array([p.charge for p in self.particles], dtype=float),
+            "magnetic_field": self.b_field_var.get(),
+            "box": [self.canvas.winfo_width(), self.canvas.winfo_height()],
+            "step": self.step_count,
+            "rng": random_state(self.rng),
+        }
+
+    def restore_state(self, state):
+        """Replaces the particles and the field with a checkpoint state."""
+        self.place_particles(len(state["charges"]))
+        for p, (x, y), (vx, vy), charge in zip(self.particles, state["positions"].tolist(),
+                                               state["velocities"].tolist(), state["charges"].tolist()):
+            p.x, p.y, p.vx, p.vy, p.charge = x, y, vx, vy, int(charge)
+            self.canvas.itemconfigure(p.id, fill="blue" if p.charge < 0 else "red")
+        self.particle_count_var.set(len(self.particles))
+        self.b_field_var.set(state["magnetic_field"])
+        self.step_count = state["step"]
+        restore_random(self.rng, state["rng"])
+        self.start_worker()
+        self.draw_particles(np.array(state["positions"]), np.array(state["velocities"]))
+
+    def save_checkpoint(self):
+        save_checkpoint(CHECKPOINT_PATH, "LorentzSimulation", self.checkpoint_state())
+        print(f"Saved step {self.step_count} to {CHECKPOINT_PATH}")
+
+    def load_checkpoint(self):
+        """Pauses and continues from the saved checkpoint; Start resumes it."""
+        if not os.path.exists(CHECKPOINT_PATH):
+            print(f"No checkpoint at {CHECKPOINT_PATH}")
+            return
+        self.pause_simulation()
+        state = load_checkpoint(CHECKPOINT_PATH, "LorentzSimulation")
+        box = [self.canvas.winfo_width(), self.canvas.winfo_height()]
+        if state["box"] != box:
+            print(f"The checkpoint was saved on a {state['box']} canvas, this one is {box}; "
+                  f"the continuation will differ")
+        self.restore_state(state)
+
+    def close(self):
+        """Stops the physics worker (freeing its shared memory) and closes the window."""
+        self.pause_simulation()
+        self.close_worker()
+        if self.stream is not None:
+            self.stream.close()
+        self.root.destroy()
+
 # --- Main Program Execution ---
 if __name__ == "__main__":
     root = tk.Tk()
     style = ttk.Style(root)
     style.theme_use('clam')
 
-    app = LorentzSimulation(root)
+    app = LorentzSimulation(root, stream=StateStreamServer(STREAM_ADDRESS) if STREAM_ADDRESS else None,
+                            profiler=Profiler(enabled=PROFILE_OVERLAY or bool(PROFILE_PATH), dump_path=PROFILE_PATH),
+                            overlay=PROFILE_OVERLAY)
+    root.protocol("WM_DELETE_WINDOW", app.close)
     root.mainloop()
@@ -1,5 +1,11 @@
 import tkinter as tk
 import random
+import os
+import sys
+
+# Make the shared SimulationCore package importable when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from SimulationCore.Profiler import ProfileOverlay, Profiler
 
 # Screen Size
 WIDTH = 800
@@ -15,11 +21,18 @@ TIME_STEP = 0.5
 NEGATIVE_COLOR = "blue"
 POSITIVE_COLOR = "red"
 
+# Profiling: the overlay shows the frame rate and the physics and render
+# times; PROFILE_PATH (".json" or ".csv") receives their histograms on exit
+PROFILE_OVERLAY = False
+PROFILE_PATH = None
+
 # Make the main screen
 root = tk.Tk()
 root.title("Simulasi Gaya Lorentz")
 canvas = tk.Canvas(root, width=WIDTH, height=HEIGHT, bg="black")
 canvas.pack()
+profiler = Profiler(enabled=PROFILE_OVERLAY or bool(PROFILE_PATH), dump_path=PROFILE_PATH)
+overlay = ProfileOverlay(canvas, profiler) if PROFILE_OVERLAY else None
 
 # Particle Initializations
 particle_list = []
@@ -34,35 +47,40 @@ for _ in range(PARTICLE_COUNT):
 
 # Update position and speed
 def update():
-    canvas.delete("particle")
-
-    for p in particle_list:
-        x, y, vx, vy, charge, color = p
-
-        # Lorentz Force (Magnetic Field straight in screen)
-        ax = charge * MAGNETIC_FIELD * vy
-        ay = -charge * MAGNETIC_FIELD * vx
-
-        # Apply Lorentz Force
-        vx += ax * TIME_STEP
-        vy += ay * TIME_STEP
-        x += vx * TIME_STEP
-        y += vy * TIME_STEP
-
-        # Bounce if touch edge screen
-        if x < 0 or x > WIDTH:
-            vx *= -1
-        if y < 0 or y > HEIGHT:
-            vy *= -1
-
-        # Save the updated values back to the list
-        p[0], p[1], p[2], p[3] = x, y, vx, vy
-
-        # Make particle
-        canvas.create_oval(
-            x - RADIUS, y - RADIUS, x + RADIUS, y + RADIUS,
-            fill=color, tags="particle", outline=""
-        )
+    with profiler.frame():
+        with profiler.span("physics"):
+            for p in particle_list:
+                x, y, vx, vy, charge, color = p
+
+                # Lorentz Force (Magnetic Field straight in screen)
+                ax = charge * MAGNETIC_FIELD * vy
+                ay = -charge * MAGNETIC_FIELD * vx
+
+                # Apply Lorentz Force
+                vx += ax * TIME_STEP
+                vy += ay * TIME_STEP
+                x += vx * TIME_STEP
+                y += vy * TIME_STEP
+
+                # Bounce if touch edge screen
+                if x < 0 or x > WIDTH:
+                    vx *= -1
+                if y < 0 or y > HEIGHT:
+                    vy *= -1
+
+                # Save the updated values back to the list
+                p[0], p[1], p[2], p[3] = x, y, vx, vy
+
+        with profiler.span("render"):
+            canvas.delete("particle")
+            for x, y, vx, vy, charge, color in particle_list:
+                # Make particle
+                canvas.create_oval(
+                    x - RADIUS, y - RADIUS, x + RADIUS, y + RADIUS,
+                    fill=color, tags="particle", outline=""
+                )
+        if overlay is not None:
+            overlay.update(len(particle_list))
 
     root.after(20, update)
 
@@ -0,0 +1,157 @@
+import math
+
+import numpy as np
+
+# --- Physical Constants ---
+G = 6.67430e-11          # Gravitational constant (m^3 kg^-1 s^-2)
+SUN_MASS = 1.989e30      # kg
+EARTH_MASS = 5.972e24    # kg
+MOON_MASS = 7.342e22     # kg
+AU = 1.496e11            # Sun-Earth distance (m)
+MOON_DISTANCE = 384.4e6  # Earth-Moon distance (m)
+EARTH_SPEED = 29780      # Earth's orbital speed (m/s)
+MOON_SPEED = 1022        # Moon's orbital speed around the Earth (m/s)
+SIDEREAL_MONTH = 27.32 * 86400 # Seconds per lunar orbit
+
+# --- Kepler Drift ---
+
+def kepler_drift(pos, vel, mu, dt):
+    """
+    Advances a bound two-body orbit by dt using Gauss's f and g functions.
+
+    Kepler's equation is solved for the change in eccentric anomaly, so the
+    result is exact for any step size (up to round-off).
+    """
+    r0 = math.hypot(pos[0], pos[1])
+    v2 = vel[0]**2 + vel[1]**2
+    rv = pos[0] * vel[0] + pos[1] * vel[1]
+    a = 1.0 / (2.0 / r0 - v2 / mu) # Semi-major axis (bound orbits only)
+    n = math.sqrt(mu / a**3)        # Mean motion
+    e_cos = 1.0 - r0 / a            # e * cos(E0)
+    e_sin = rv / math.sqrt(mu * a)  # e * sin(E0)
+
+    # Newton iteration on  dE - e_cos*sin(dE) + e_sin*(1 - cos(dE)) = n*dt
+    mean = n * dt
+    d_e = mean
+    for _ in range(20):
+        sin_d, cos_d = math.sin(d_e), math.cos(d_e)
+        f = d_e - e_cos * sin_d + e_sin * (1.0 - cos_d) - mean
+        fp = 1.0 - e_cos * cos_d + e_sin * sin_d
+        step = f / fp
+        d_e -= step
+        if abs(step) < 1e-15:
+            break
+    sin_d, cos_d = math.sin(d_e), math.cos(d_e)
+
+    r = a * (1.0 - e_cos * cos_d + e_sin * sin_d)
+    f = 1.0 - a / r0 * (1.0 - cos_d)
+    g = dt - (d_e - sin_d) / n
+    f_dot = -math.sqrt(mu * a) * sin_d / (r * r0)
+    g_dot = 1.0 - a / r * (1.0 - cos_d)
+    return f * pos + g * vel, f_dot * pos + g_dot * vel
+
+# --- Earth-Moon-Sun Model in Jacobi Coordinates ---
+# r = Moon relative to Earth, R = Earth-Moon barycentre relative to the Sun.
+# The Hamiltonian splits into two Kepler problems plus a small interaction:
+#   H = Kepler(r; G(mE + mM)) + Kepler(R; G(mS + mE + mM)) + H_int
+# and each step is kick(dt/2) - Kepler drift(dt) - kick(dt/2), as in the
+# Wisdom-Holman map. The Kepler motion at both levels is solved exactly, so
+# steps can be as long as the circular animation's frame step.
+class JacobiMoonModel:
+    def __init__(self, sun_mass=SUN_MASS, earth_mass=EARTH_MASS, moon_mass=MOON_MASS,
+                 earth_pos=(AU, 0.0), earth_vel=(0.0, EARTH_SPEED),
+                 moon_offset=(MOON_DISTANCE, 0.0), moon_velocity=(0.0, MOON_SPEED), dt=3600.0):
+        """Initial conditions are heliocentric Earth and Earth-relative Moon vectors."""
+        self.m_s, self.m_e, self.m_m = sun_mass, earth_mass, moon_mass
+        self.m_em = earth_mass + moon_mass
+        self.mu_inner = G * self.m_em
+        self.mu_outer = G * (sun_mass + self.m_em)
+        self.dt = dt
+
+        earth_pos = np.asarray(earth_pos, dtype=float)
+        earth_vel = np.asarray(earth_vel, dtype=float)
+        self.r = np.asarray(moon_offset, dtype=float).copy()
+        self.vr = np.asarray(moon_velocity, dtype=float).copy()
+        # Barycentre of Earth and Moon, relative to the Sun (at rest initially)
+        self.R = earth_pos + (moon_mass / self.m_em) * self.r
+        self.vR = earth_vel + (moon_mass / self.m_em) * self.vr
+        self.time = 0.0
+        self.initial = self.get_state()
+
+    def get_state(self):
+        return (self.time, self.r.copy(), self.vr.copy(), self.R.copy(), self.vR.copy())
+
+    def set_state(self, state):
+        self.time, r, vr, R, vR = state
+        self.r, self.vr, self.R, self.vR = r.copy(), vr.copy(), R.copy(), vR.copy()
+
+    def _sun_vectors(self, r, R):
+        """Sun-to-Earth and Sun-to-Moon vectors from the Jacobi coordinates."""
+        d_e = R - (self.m_m / self.m_em) * r
+        d_m = R + (self.m_e / self.m_em) * r
+        return d_e, d_m
+
+    def interaction_accelerations(self, r, R):
+        """Accelerations of r and R from the interaction part of the Hamiltonian."""
+        d_e, d_m = self._sun_vectors(r, R)
+        de3 = np.dot(d_e, d_e) ** 1.5
+        dm3 = np.dot(d_m, d_m) ** 1.5
+        R3 = np.dot(R, R) ** 1.5
+        # Solar tide on the Moon's orbit around the Earth
+        acc_r = G * self.m_s * (d_e / de3 - d_m / dm3)
+        # Deviation of the barycentre's force from a point mass at R
+        acc_R = -self.mu_outer / self.m_em * (self.m_e * d_e / de3 + self.m_m * d_m / dm3 - self.m_em * R / R3)
+        return acc_r, acc_R
+
+    def step(self, dt=None):
+        """One kick-drift-kick step in Jacobi coordinates."""
+        dt = self.dt if dt is None else dt
+        acc_r, acc_R = self.interaction_accelerations(self.r, self.R)
+        self.vr += 0.5 * dt * acc_r
+        self.vR += 0.5 * dt * acc_R
+
+        self.r, self.vr = kepler_drift(self.r, self.vr, self.mu_inner, dt)
+        self.R, self.vR = kepler_drift(self.R, self.vR, self.mu_outer, dt)
+
+        acc_r, acc_R = self.interaction_accelerations(self.r, self.R)
+        self.vr += 0.5 * dt * acc_r
+        self.vR += 0.5 * dt * acc_R
+        self.time += dt
+
+    def propagate_to(self, t):
+        """Steps forward to time t, shortening the last step to land exactly on it."""
+        while self.time < t:
+            self.step(min(self.dt, t - self.time))
+
+    def moon_offsets(self, times):
+        """
+        Moon positions relative to the Earth, shape (len(times), 1, 2).
+
+        Suitable as the position function of an EphemerisCache: the model
+        integrates forward through the requested times, and restarts from the
+        initial state when asked for an earlier time.
+        """
+        times = np.asarray(times, dtype=float)
+        result = np.empty((len(times), 1, 2))
+        order = np.argsort(times)
+        if times[order[0]] < self.time:
+            self.set_state(self.initial)
+        for index in order:
+            self.propagate_to(times[index])
+            result[index, 0] = self.r
+        return result
+
+    def heliocentric_positions(self):
+        """Sun-relative Earth and Moon positions (m)."""
+        return self._sun_vectors(self.r, self.R)
+
+    def energy(self):
+        """Total energy in the barycentric frame (for drift checks)."""
+        mu_r = self.m_e * self.m_m / self.m_em
+        mu_R = self.m_s * self.m_em / (self.m_s + self.m_em)
+        d_e, d_m = self._sun_vectors(self.r, self.R)
+        kinetic = 0.5 * mu_r * np.dot(self.vr, self.vr) + 0.5 * mu_R * np.dot(self.vR, self.vR)
+        potential = -G * (self.m_e * self.m_m / np.linalg.norm(self.r)
+                          + self.m_s * self.m_e / np.linalg.norm(d_e)
+                          + self.m_s * self.m_m / np.linalg.norm(d_m))
+        return kinetic + potential
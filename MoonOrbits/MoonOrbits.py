@@ -1,6 +1,18 @@
 import turtle
-import math
-import random
+import os
+import sys
+
+import numpy as np
+
+# Make the shared SimulationCore package importable when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from SimulationCore.Background import BackgroundLayer
+from SimulationCore.CanvasRenderer import CanvasRenderer
+from SimulationCore.EphemerisCache import EphemerisCache
+from SimulationCore.Labels import LabelLayer
+from SimulationCore.Profiler import ProfileOverlay, Profiler
+from SimulationCore.Trails import TrailLayer
+from JacobiOrbit import JacobiMoonModel, MOON_DISTANCE, SIDEREAL_MONTH
 
 # --- Screen Setup ---
 screen = turtle.Screen()
@@ -9,90 +21,108 @@ screen.bgcolor("black")
 screen.title("Earth-Moon Orbit Simulation with Stars")
 screen.tracer(0) # Turn off automatic updates
 
+# Everything is drawn as retained canvas items instead of with turtles
+renderer = CanvasRenderer.for_turtle_screen(screen)
+
+# --- Background Settings ---
+TRAIL_LENGTH = 400 # Points kept in the Moon's trail (about 3/4 of an orbit)
+STAR_SEED = 7 # Same seed, same starfield (None for a new one every run)
+BACKGROUND_CACHE_DIR = None # Set to a folder path to keep the rendered background on disk
+
+# --- Profiling ---
+# PROFILE_OVERLAY shows the frame rate and the orbit ("physics") and render
+# times on the canvas; PROFILE_PATH (".json" or ".csv") receives histograms
+# of every phase of the frame when the program exits
+PROFILE_OVERLAY = False
+PROFILE_PATH = None
+profiler = Profiler(enabled=PROFILE_OVERLAY or bool(PROFILE_PATH), dump_path=PROFILE_PATH)
+overlay = (ProfileOverlay(renderer.canvas, profiler, renderer.bounds[0] + 10, renderer.bounds[1] + 10)
+           if PROFILE_OVERLAY else None)
+
 # --- Function to Draw Stars ---
-def draw_stars():
-    """Draws a field of stars in the background."""
-    star_drawer = turtle.Turtle()
-    star_drawer.hideturtle()
-    star_drawer.penup()
-    star_drawer.speed(0)
-    star_drawer.color("white")
-    for _ in range(150): # Number of stars
-        x = random.randint(-400, 400)
-        y = random.randint(-300, 300)
-        # Avoid drawing stars too close to the center
-        if math.sqrt(x**2 + y**2) > 40:
-            star_drawer.goto(x, y)
-            star_drawer.dot(random.randint(1, 3)) # Star size
+def draw_stars(background):
+    """Adds a field of stars to the background layer."""
+    # Avoid drawing stars too close to the center
+    background.add_stars(150, (-400, 400), (-300, 300), sizes=(1, 3), seed=STAR_SEED, min_distance=40)
 
 # --- Draw the background elements ---
-draw_stars()
-
-# --- Earth Turtle ---
-earth = turtle.Turtle()
-earth.shape("circle")
-earth.color("deepskyblue")
-earth.shapesize(2.5)
-earth.penup()
-# The earth is at the center, so we don't need to move it,
-# but we stamp its shape so other turtles can draw over it.
-earth.stamp()
-earth.hideturtle()
+# Rendered once into a single image underneath the moving bodies
+background = BackgroundLayer(cache_dir=BACKGROUND_CACHE_DIR)
+draw_stars(background)
+background.show(renderer)
+background.follow_resize(renderer) # Covers the window again after it is enlarged
+
+# --- Earth ---
+# The earth is at the center and never moves
+renderer.add_body("earth", 25, "deepskyblue")
 
 # --- Earth Label ---
-earth_label = turtle.Turtle()
-earth_label.hideturtle()
-earth_label.penup()
-earth_label.color("white")
-earth_label.goto(0, -45) # Position the label just below the Earth
-earth_label.write("Earth", align="center", font=("Arial", 12, "normal"))
-
-
-# --- Moon Turtle ---
-moon = turtle.Turtle()
-moon.shape("circle")
-moon.color("lightgray")
-moon.shapesize(0.8)
-moon.penup()
-moon.goto(150, 0) # Initial position
-moon.pendown() # Moon will leave a trail for its orbit
+# Positioned just below the Earth
+earth_labels = LabelLayer(renderer, font=("Arial", 12, "normal"))
+earth_labels.update(["Earth"], [0], [-45])
+
+# --- Moon Trail ---
+# A bounded ring buffer drawn as a few polylines that fade into the sky;
+# created before the Moon so it is drawn underneath it
+trails = TrailLayer(renderer, capacity=TRAIL_LENGTH, fade_steps=6)
+trails.add_trail("moon", color="lightgray")
+
+# --- Moon ---
+renderer.add_body("moon", 8, "lightgray", 150, 0)
 
 # --- Moon Label ---
-moon_label = turtle.Turtle()
-moon_label.hideturtle()
-moon_label.penup()
-moon_label.color("white")
+# Created once, then only moved; positioned slightly above the moon
+moon_labels = LabelLayer(renderer, font=("Arial", 10, "normal"), offset=(0, 15))
 
 # --- Orbit Parameters ---
 orbit_radius = 150
 angle = 0
 speed = 1.0 # Angle increment per frame
+frame = 0 # Simulated time, measured in animation frames
+
+# --- Orbit Model ---
+# "circular": the Moon moves on a fixed circle around the Earth
+# "jacobi":   the Moon is integrated relative to the Earth and the Earth-Moon
+#             barycentre relative to the Sun (see JacobiOrbit.py), so the
+#             solar perturbations of the lunar orbit become visible
+ORBIT_MODEL = "circular"
+SECONDS_PER_FRAME = SIDEREAL_MONTH / 360 * speed # Same angular pace as the circular model
+jacobi_model = JacobiMoonModel(dt=SECONDS_PER_FRAME)
+
+def moon_positions(times):
+    """Moon positions for an array of frame times, shape (frames, 1, 2)."""
+    if ORBIT_MODEL == "jacobi":
+        offsets = jacobi_model.moon_offsets(np.asarray(times) * SECONDS_PER_FRAME)
+        return offsets * (orbit_radius / MOON_DISTANCE)
+    theta = np.radians(angle + speed * np.asarray(times))
+    return np.stack((orbit_radius * np.cos(theta), orbit_radius * np.sin(theta)), axis=-1)[:, None, :]
+
+# Positions are read from cached Chebyshev segments instead of being recomputed
+ephemeris = EphemerisCache(moon_positions, segment_length=90)
 
 # --- Animation Function ---
 def update_simulation():
     """Updates the moon's position and schedules the next update."""
-    global angle
-
-    # Update the angle to move the moon
-    angle += speed
-    if angle >= 360:
-        angle -= 360
-
-    # Calculate the new position using trigonometry
-    theta = math.radians(angle)
-    x = orbit_radius * math.cos(theta)
-    y = orbit_radius * math.sin(theta)
-
-    # Move the moon to its new position
-    moon.goto(x, y)
-
-    # Move and redraw the moon's label
-    moon_label.clear()
-    moon_label.goto(x, y + 15) # Position label slightly above the moon
-    moon_label.write("Moon", align="center", font=("Arial", 10, "normal"))
-
-    # Manually update the screen to show the new frame
-    screen.update()
+    global frame
+
+    with profiler.frame():
+        # Advance the simulated time and look up the moon's position
+        frame += 1
+        with profiler.span("physics"):
+            x, y = ephemeris.positions(frame)[0]
+
+        with profiler.span("render"):
+            # Move the moon to its new position, extending its trail
+            trails.update("moon", x, y)
+            renderer.move_body("moon", x, y)
+
+            # Move the moon's label
+            moon_labels.update(["Moon"], [x], [y])
+
+            # Manually update the screen to show the new frame
+            screen.update()
+        if overlay is not None:
+            overlay.update()
 
     # Schedule this function to run again after 20 milliseconds
     screen.ontimer(update_simulation, 20)
@@ -1,5 +1,14 @@
 import turtle
 import math
+import os
+import sys
+
+# Make the shared SimulationCore package importable when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from SimulationCore.CanvasRenderer import CanvasRenderer
+from SimulationCore.Profiler import ProfileOverlay, Profiler
+from SimulationCore.Trails import TrailLayer
+from JacobiOrbit import JacobiMoonModel, MOON_DISTANCE, SIDEREAL_MONTH
 
 # Screen settings
 screen = turtle.Screen()
@@ -25,23 +34,52 @@ moon.color("lightgray")
 moon.shapesize(0.7)
 moon.penup()
 moon.goto(100, 0)
-moon.pendown()
+
+# Moon trail: the last 300 points, redrawn as one line underneath the turtles
+renderer = CanvasRenderer.for_turtle_screen(screen)
+trails = TrailLayer(renderer, capacity=300)
+trails.add_trail("moon", color="lightgray")
+renderer.lower_item("moon")
 
 # Orbit Parameter
 orbit_radius = 100
 angle = 0
 delta_angle = 0.5  # Angle increment per frame
 
+# Orbit model: "circular" (fixed circle) or "jacobi" (Moon integrated around
+# the Earth with the Sun's pull, see JacobiOrbit.py)
+ORBIT_MODEL = "circular"
+jacobi_model = JacobiMoonModel(dt=SIDEREAL_MONTH / 360 * delta_angle)
+
+# Profiling: the overlay shows the frame rate and the orbit ("physics") and
+# render times; PROFILE_PATH (".json" or ".csv") receives their histograms on exit
+PROFILE_OVERLAY = False
+PROFILE_PATH = None
+profiler = Profiler(enabled=PROFILE_OVERLAY or bool(PROFILE_PATH), dump_path=PROFILE_PATH)
+overlay = (ProfileOverlay(renderer.canvas, profiler, renderer.bounds[0] + 10, renderer.bounds[1] + 10)
+           if PROFILE_OVERLAY else None)
+
 # Function to update moon position
 def update_position():
     global angle
-    angle += delta_angle
-    theta = math.radians(angle)
-    x = orbit_radius * math.cos(theta)
-    y = orbit_radius * math.sin(theta)
-    moon.goto(x, y)
+    with profiler.frame():
+        with profiler.span("physics"):
+            if ORBIT_MODEL == "jacobi":
+                jacobi_model.step()
+                x, y = jacobi_model.r * (orbit_radius / MOON_DISTANCE)
+            else:
+                angle += delta_angle
+                theta = math.radians(angle)
+                x = orbit_radius * math.cos(theta)
+                y = orbit_radius * math.sin(theta)
+
+        with profiler.span("render"):
+            moon.goto(x, y)
+            trails.update("moon", x, y)
 
-    screen.update()
+            screen.update()
+        if overlay is not None:
+            overlay.update()
     screen.ontimer(update_position, 20)  # Repeat the update_position function every 20 milliseconds
 
 # Start Simulation
@@ -0,0 +1,78 @@
+import os
+import sys
+
+import numpy as np
+
+# Make the shared SimulationCore package importable when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from SimulationCore.Contacts import resolve_contacts
+from SimulationCore.Neighbours import NeighbourList
+from SimulationCore.Profiler import Profiler
+
+# --- Elastic Gas ---
+# The "Elastic" interaction of ParticleSimulation.py without a window: the
+# particles live in arrays, and one step resolves the touching pairs found
+# by a NeighbourList, then moves every particle and bounces it off the walls
+# (or wraps it around a periodic box) with the rules of Particle.move, as
+# whole-array operations. Used by the headless runner (Headless.py in the
+# repository root).
+
+COLORS = ["#ff6b6b", "#f0e68c", "#48dbfb", "#1dd1a1", "#feca57", "#ff9ff3", "#54a0ff"]
+
+
+def random_particles(count, width, height, rng):
+    """
+    Radii, masses, positions and velocities of `count` random particles.
+    Draws from rng (a random.Random) in the same order as Particle.__init__,
+    so the same seed places the same particles as the window would.
+    """
+    radii, positions, velocities = [], [], []
+    for _ in range(count):
+        radius = rng.uniform(4, 12)
+        x = rng.uniform(radius, width - radius)
+        y = rng.uniform(radius, height - radius)
+        velocities.append((rng.uniform(-1.5, 1.5), rng.uniform(-1.5, 1.5)))
+        rng.choice(COLORS)
+        radii.append(radius)
+        positions.append((x, y))
+    radii = np.array(radii)
+    return radii, radii ** 2, np.array(positions).reshape(-1, 2), np.array(velocities).reshape(-1, 2)
+
+
+class ElasticGas:
+    def __init__(self, positions, velocities, radii, masses, box, periodic=False, skin=16.0, profiler=None):
+        """box is (width, height); profiler times the "neighbours" and "collisions" phases of every step."""
+        self.positions = np.array(positions, dtype=float).reshape(-1, 2)
+        self.velocities = np.array(velocities, dtype=float).reshape(-1, 2)
+        self.radii = np.asarray(radii, dtype=float)
+        self.masses = np.asarray(masses, dtype=float)
+        self.box = tuple(box)
+        self.periodic = periodic
+        self.neighbours = NeighbourList(skin=skin)
+        self.profiler = profiler if profiler is not None else Profiler(enabled=False)
+        self.wall_impulse = 0.0 # Momentum given to the walls so far
+
+    def step(self):
+        """One frame: collisions, then motion and boundaries."""
+        box = self.box if self.periodic else None
+        with self.profiler.span("neighbours"):
+            first, second = self.neighbours.update(self.positions, self.radii, box)
+        with self.profiler.span("collisions"):
+            resolve_contacts(self.positions, self.velocities, self.radii, self.masses, first, second, box=box)
+
+        self.positions += self.velocities
+        if self.periodic:
+            # Wrap around to the opposite edge
+            self.positions -= self.box * np.floor(self.positions / self.box)
+            return
+
+        # Bounce off the walls, once per hit: only particles still moving outwards turn
+        for axis, size in enumerate(self.box):
+            x, v = self.positions[:, axis], self.velocities[:, axis]
+            hit = ((x - self.radii <= 0) & (v < 0)) | ((x + self.radii >= size) & (v > 0))
+            v[hit] *= -1
+            self.wall_impulse += float(np.sum(2 * self.masses[hit] * np.abs(v[hit])))
+
+    def advance(self, steps):
+        for _ in range(steps):
+            self.step()
@@ -1,5 +1,13 @@
 import turtle
 import random
+import math
+import os
+import sys
+
+# Make the shared SimulationCore package importable when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from SimulationCore.CanvasRenderer import CanvasRenderer
+from SimulationCore.Profiler import ProfileOverlay, Profiler
 
 # --- Screen Setup ---
 screen = turtle.Screen()
@@ -8,37 +16,52 @@ screen.bgcolor("black")
 screen.title("Enhanced Particle Motion Simulation")
 # Turn off automatic screen updates for smoother animation
 screen.tracer(0)
+# Particles are canvas items that are moved directly, without turtles
+renderer = CanvasRenderer.for_turtle_screen(screen)
 
 # --- Simulation Parameters ---
 num_particles = 30
-particles = []
+particles = list(range(num_particles)) # Renderer keys of the particles
+xs = [0.0] * num_particles # Particle positions
+ys = [0.0] * num_particles
 colors = ["white", "cyan", "magenta", "yellow", "lightgreen", "orange", "red"]
 
+# --- Profiling ---
+# PROFILE_OVERLAY shows the frame rate and the physics and render times on
+# the canvas; PROFILE_PATH (".json" or ".csv") receives histograms of every
+# phase of the frame when the program exits
+PROFILE_OVERLAY = False
+PROFILE_PATH = None
+profiler = Profiler(enabled=PROFILE_OVERLAY or bool(PROFILE_PATH), dump_path=PROFILE_PATH)
+overlay = (ProfileOverlay(renderer.canvas, profiler, renderer.bounds[0] + 10, renderer.bounds[1] + 10)
+           if PROFILE_OVERLAY else None)
+
 # --- Create Particles ---
-for _ in range(num_particles):
-    particle = turtle.Turtle()
-    particle.shape("circle")
-    particle.shapesize(0.2) # Make particles smaller
-    particle.color(random.choice(colors))
-    particle.penup()
-    particle.speed(0)
-    particles.append(particle)
+for p in particles:
+    renderer.add_body(p, 2, random.choice(colors)) # Small particles of 2 px radius
 
 # --- Animation Function ---
 def move_particles():
     """
     Moves each particle one random step and schedules the next update.
     """
-    for p in particles:
-        # Determine a random angle and distance for each step
-        angle = random.randint(0, 360)
-        distance = random.randint(1, 5)
+    with profiler.frame():
+        with profiler.span("physics"):
+            for p in particles:
+                # Determine a random angle and distance for each step
+                angle = random.randint(0, 360)
+                distance = random.randint(1, 5)
+
+                xs[p] += distance * math.cos(math.radians(angle))
+                ys[p] += distance * math.sin(math.radians(angle))
 
-        p.setheading(angle)
-        p.forward(distance)
+        with profiler.span("render"):
+            renderer.move_bodies(particles, xs, ys)
 
-    # Update the screen to show all particle movements at once
-    screen.update()
+            # Update the screen to show all particle movements at once
+            screen.update()
+        if overlay is not None:
+            overlay.update(num_particles)
 
     # Schedule this function to run again after a short delay (in milliseconds)
     screen.ontimer(move_particles, 20)
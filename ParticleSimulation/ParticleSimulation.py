@@ -2,52 +2,120 @@ import tkinter as tk
 from tkinter import ttk
 import random
 import math
-import itertools
+import os
+import sys
+
+import numpy as np
+
+# Make the shared SimulationCore package importable when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from SimulationCore.Checkpoint import load_checkpoint, random_state, restore_random, save_checkpoint
+from SimulationCore.Contacts import resolve_contacts
+from SimulationCore.Diagnostics import ConservationMonitor, print_alert
+from SimulationCore.KineticTheory import GasMonitor, print_window
+from SimulationCore.LevelOfDetail import LevelOfDetail
+from SimulationCore.MolecularDynamics import MolecularDynamics, WCA_CUTOFF
+from SimulationCore.Neighbours import NeighbourList, minimum_image
+from SimulationCore.Profiler import ProfileOverlay, Profiler
+from SimulationCore.StateStream import StateStreamServer
+
+# --- Molecular Dynamics Settings ---
+# Lengths are pixels and times animation frames. Each particle keeps its
+# radius and mass; σ is chosen so the Lennard-Jones minimum lies where two
+# particles touch (r₁ + r₂), and WCA is the same potential cut at that point.
+INTERACTIONS = {"Elastic": None, "Lennard-Jones": 2.5, "WCA": WCA_CUTOFF} # Name -> cutoff in σ
+THERMOSTATS = {"None": None, "Berendsen": "berendsen", "Langevin": "langevin"}
+MD_EPSILON = 40.0     # Well depth; the elastic gas starts at a temperature of about 50
+MD_TEMPERATURE = 20.0 # Thermostat target (kinetic energy per particle), cool enough to form droplets
+MD_TAU = 50.0         # Thermostat coupling time in frames
+MD_SUBSTEPS = 10      # Velocity Verlet steps per frame; fewer let hot collisions drift in energy
+
+# Walls reflect particles; periodic boundaries let them leave one edge and
+# re-enter at the opposite one, and pairs interact across the edges
+BOUNDARIES = ("Walls", "Periodic")
+
+# --- Level of Detail ---
+# With more than LOD_MAX_SPRITES particles in view one heatmap image replaces
+# the circles; zooming in (mouse wheel) brings them back
+LOD_MAX_SPRITES = 1500
+LOD_MODE = "speed"         # "density" or "speed" (mean speed per bin)
+LOD_SPEED_RANGE = (0.0, 4.0)
+
+# --- State Stream ---
+# An address such as "tcp://127.0.0.1:9870" or "unix:///tmp/particles.sock"
+# publishes every frame to external viewers (see SimulationCore/StateStream.py)
+STREAM_ADDRESS = None
+
+# --- Checkpoints ---
+# Save writes the whole simulation to CHECKPOINT_PATH and Load continues
+# from it exactly, step for step, as long as the canvas has the same size.
+# All randomness comes from one generator seeded with SEED (None: a new
+# set of particles every run), whose position is saved as well.
+CHECKPOINT_PATH = "particles.ckpt"
+SEED = None
+
+# --- Profiling ---
+# PROFILE_OVERLAY shows the frame rate, the physics and render times and the
+# particle count on the canvas; PROFILE_PATH (".json" or ".csv") receives
+# histograms of every phase of the frame when the program exits. With
+# neither set the timing hooks do nothing.
+PROFILE_OVERLAY = False
+PROFILE_PATH = None
 
 # --- Particle Class ---
 # Represents a single particle with physical properties
 class Particle:
-    def __init__(self, canvas, width, height):
+    def __init__(self, canvas, width, height, rng):
         self.canvas = canvas
-        self.radius = random.uniform(4, 12)
+        self.radius = rng.uniform(4, 12)
         # Mass is proportional to the area of the circle
         self.mass = self.radius ** 2
 
         # Initial position
-        self.x = random.uniform(self.radius, width - self.radius)
-        self.y = random.uniform(self.radius, height - self.radius)
+        self.x = rng.uniform(self.radius, width - self.radius)
+        self.y = rng.uniform(self.radius, height - self.radius)
 
         # Initial velocity
-        self.dx = random.uniform(-1.5, 1.5)
-        self.dy = random.uniform(-1.5, 1.5)
+        self.dx = rng.uniform(-1.5, 1.5)
+        self.dy = rng.uniform(-1.5, 1.5)
 
         # Visual properties
-        self.color = random.choice(["#ff6b6b", "#f0e68c", "#48dbfb", "#1dd1a1", "#feca57", "#ff9ff3", "#54a0ff"])
+        self.color = rng.choice(["#ff6b6b", "#f0e68c", "#48dbfb", "#1dd1a1", "#feca57", "#ff9ff3", "#54a0ff"])
 
         # Create the circle on the canvas
         self.id = canvas.create_oval(
             self.x - self.radius, self.y - self.radius,
             self.x + self.radius, self.y + self.radius,
             fill=self.color,
-            outline=""
+            outline="",
+            tags="particle"
         )
 
-    def move(self, canvas_width, canvas_height):
-        """Updates the particle's position and handles wall collisions."""
-        self.canvas.move(self.id, self.dx, self.dy)
+    def move(self, canvas_width, canvas_height, periodic=False):
+        """Updates the particle's position and handles the boundaries; returns the momentum given to the walls."""
         self.x += self.dx
         self.y += self.dy
 
-        # Bounce off the walls
-        if self.x - self.radius <= 0 or self.x + self.radius >= canvas_width:
+        if periodic:
+            # Wrap around to the opposite edge
+            self.x -= canvas_width * math.floor(self.x / canvas_width)
+            self.y -= canvas_height * math.floor(self.y / canvas_height)
+            return 0.0
+
+        # Bounce off the walls, once per hit: only particles still moving outwards turn
+        impulse = 0.0
+        if (self.x - self.radius <= 0 and self.dx < 0) or (self.x + self.radius >= canvas_width and self.dx > 0):
             self.dx *= -1
-        if self.y - self.radius <= 0 or self.y + self.radius >= canvas_height:
+            impulse += 2 * self.mass * abs(self.dx)
+        if (self.y - self.radius <= 0 and self.dy < 0) or (self.y + self.radius >= canvas_height and self.dy > 0):
             self.dy *= -1
+            impulse += 2 * self.mass * abs(self.dy)
+        return impulse
 
 # --- Simulation Class ---
 # Manages the canvas, UI, and animation loop
 class ParticleSimulation:
-    def __init__(self, root):
+    def __init__(self, root, diagnostics=None, gas=None, stream=None, profiler=None, overlay=False):
         self.root = root
         self.root.title("Advanced Particle Collision Simulation")
         self.root.configure(bg="#2c3e50")
@@ -65,76 +133,245 @@ class ParticleSimulation:
         self.reset_button = ttk.Button(control_frame, text="Reset", command=self.reset_simulation)
         self.reset_button.pack(side=tk.LEFT, padx=5)
 
+        ttk.Button(control_frame, text="Save", command=self.save_checkpoint).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Load", command=self.load_checkpoint).pack(side=tk.LEFT, padx=5)
+
+        ttk.Label(control_frame, text="Particles:").pack(side=tk.LEFT, padx=(20, 5))
+        self.particle_count_var = tk.IntVar(value=70) # Applied on Reset
+        ttk.Spinbox(control_frame, from_=10, to=20000, increment=10, textvariable=self.particle_count_var,
+                    width=7).pack(side=tk.LEFT, padx=5)
+
+        ttk.Label(control_frame, text="Interaction:").pack(side=tk.LEFT, padx=(20, 5))
+        self.interaction = tk.StringVar(value="Elastic")
+        interaction_box = ttk.Combobox(control_frame, textvariable=self.interaction, values=list(INTERACTIONS),
+                                       state="readonly", width=14)
+        interaction_box.pack(side=tk.LEFT, padx=5)
+        interaction_box.bind("<<ComboboxSelected>>", lambda event: self.set_interaction())
+
+        ttk.Label(control_frame, text="Thermostat:").pack(side=tk.LEFT, padx=(20, 5))
+        self.thermostat = tk.StringVar(value="None")
+        thermostat_box = ttk.Combobox(control_frame, textvariable=self.thermostat, values=list(THERMOSTATS),
+                                      state="readonly", width=10)
+        thermostat_box.pack(side=tk.LEFT, padx=5)
+        thermostat_box.bind("<<ComboboxSelected>>", lambda event: self.set_thermostat())
+
+        ttk.Label(control_frame, text="Boundaries:").pack(side=tk.LEFT, padx=(20, 5))
+        self.boundaries = tk.StringVar(value="Walls")
+        boundaries_box = ttk.Combobox(control_frame, textvariable=self.boundaries, values=BOUNDARIES,
+                                      state="readonly", width=10)
+        boundaries_box.pack(side=tk.LEFT, padx=5)
+        boundaries_box.bind("<<ComboboxSelected>>", lambda event: self.set_boundaries())
+
         # --- Canvas Setup ---
         self.canvas = tk.Canvas(root, width=1000, height=700, bg="#1e272e", highlightthickness=0)
         self.canvas.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
+        # Draws the particles as circles, or as a heatmap when crowded
+        self.lod = LevelOfDetail(self.canvas, max_sprites=LOD_MAX_SPRITES, mode=LOD_MODE,
+                                 value_range=LOD_SPEED_RANGE)
+        self.lod.bind()
 
         # --- Simulation State ---
+        self.rng = random.Random(SEED)
         self.particles = []
-        self.num_particles = 70
+        self.items = []
+        self.radii = np.zeros(0)
+        self.masses = np.zeros(0)
         self.is_running = False
         self.animation_job = None
 
+        # Candidate collision pairs, reused until some particle has moved
+        # more than half the skin; at a few pixels per step that is every
+        # few steps
+        self.neighbours = NeighbourList(skin=16.0)
+        self.md = None # MolecularDynamics engine when a soft interaction is selected
+
+        # --- Optional Diagnostics ---
+        # A ConservationMonitor that samples kinetic energy every K steps and
+        # audits each collision. Walls reflect particles, so only energy is global.
+        self.diagnostics = diagnostics
+        self.step_count = 0
+
+        # --- Optional Gas Measurement ---
+        # A GasMonitor that accumulates temperature, pressure and the speed
+        # distribution over windows of frames (one frame is one time unit)
+        self.gas = gas
+
+        # --- Optional State Stream ---
+        # A StateStreamServer that receives the positions, velocities and
+        # radii of every frame; slow viewers miss frames instead of slowing us
+        self.stream = stream
+
+        # --- Optional Profiling ---
+        # A Profiler that times the phases of every frame (physics with its
+        # neighbour search and collisions, render, measurements, stream);
+        # overlay shows the live figures on the canvas
+        self.profiler = profiler if profiler is not None else Profiler(enabled=False)
+        self.overlay = ProfileOverlay(self.canvas, self.profiler) if overlay else None
+
     def create_particles(self):
         """Clears old particles and creates a new set."""
+        self.place_particles(max(self.particle_count_var.get(), 1))
+        self.step_count = 0
+        self.set_interaction()
+
+    def place_particles(self, count):
+        """Replaces the particles and their canvas items with `count` random ones."""
+        self.lod.reset()
         self.canvas.delete("all")
         self.particles.clear()
         self.canvas.update_idletasks()
         width = self.canvas.winfo_width()
         height = self.canvas.winfo_height()
-        for _ in range(self.num_particles):
-            self.particles.append(Particle(self.canvas, width, height))
+        for _ in range(count):
+            self.particles.append(Particle(self.canvas, width, height, self.rng))
+        self.items = [p.id for p in self.particles]
+        self.radii = np.array([p.radius for p in self.particles])
+        self.masses = np.array([p.mass for p in self.particles])
+
+    def set_interaction(self):
+        """Switches between elastic bounces and molecular dynamics, keeping the particles."""
+        cutoff = INTERACTIONS[self.interaction.get()]
+        self.md = None
+        if cutoff is not None and self.particles:
+            self.md = MolecularDynamics(
+                [(p.x, p.y) for p in self.particles], [(p.dx, p.dy) for p in self.particles], self.masses,
+                2.0 * self.radii / WCA_CUTOFF, epsilon=MD_EPSILON, cutoff=cutoff,
+                box=(self.canvas.winfo_width(), self.canvas.winfo_height()), dt=1.0 / MD_SUBSTEPS,
+                thermostat=THERMOSTATS[self.thermostat.get()], temperature=MD_TEMPERATURE, tau=MD_TAU,
+                seed=self.rng.getrandbits(64), periodic=self.periodic())
+            self.md.minimize() # Randomly placed particles may overlap
+            self.sync_particles()
+            self.draw_particles()
+        self.reset_monitors()
+
+    def reset_monitors(self):
+        """Restarts the neighbour list and the measurements after the particles changed."""
+        self.neighbours.invalidate()
+        if self.diagnostics is not None:
+            self.diagnostics.reset()
+        if self.gas is not None:
+            self.gas.periodic = self.periodic()
+            self.gas.reset()
+
+    def periodic(self):
+        return self.boundaries.get() == "Periodic"
+
+    def set_boundaries(self):
+        """Switches between reflecting walls and periodic boundaries, keeping the particles."""
+        if self.md is not None:
+            self.md.periodic = self.periodic()
+        self.reset_monitors()
+
+    def set_thermostat(self):
+        """Changes the thermostat of the running molecular dynamics without restarting it."""
+        if self.md is not None:
+            self.md.thermostat = THERMOSTATS[self.thermostat.get()]
+
+    def sync_particles(self):
+        """Copies the molecular dynamics state to the particles."""
+        for p, (x, y), (dx, dy) in zip(self.particles, self.md.positions.tolist(), self.md.velocities.tolist()):
+            p.x, p.y, p.dx, p.dy = x, y, dx, dy
+
+    def draw_particles(self):
+        """Shows the particles as circles, or as one heatmap when too many are in view."""
+        positions = np.array([(p.x, p.y) for p in self.particles])
+        speeds = np.hypot(*np.array([(p.dx, p.dy) for p in self.particles]).T)
+        self.lod.draw(self.items, positions[:, 0], positions[:, 1], self.radii, speeds)
+
+    def record_diagnostics(self):
+        """Samples the total energy and momentum of all particles."""
+        masses = [p.mass for p in self.particles]
+        positions = [(p.x, p.y) for p in self.particles]
+        velocities = [(p.dx, p.dy) for p in self.particles]
+        # Energy only stays constant in molecular dynamics without a thermostat
+        potential = self.md.potential_energy if self.md is not None else 0.0
+        self.diagnostics.record(self.step_count, self.step_count, masses, positions, velocities, potential)
+
+    def publish_state(self):
+        """Offers the current frame to the stream's viewers."""
+        self.stream.publish(self.step_count, self.step_count, {
+            "positions": [(p.x, p.y) for p in self.particles],
+            "velocities": [(p.dx, p.dy) for p in self.particles],
+            "radii": self.radii,
+        })
 
     def update(self):
         """The main animation loop."""
         if not self.is_running:
             return
 
-        width = self.canvas.winfo_width()
-        height = self.canvas.winfo_height()
-
-        # Move particles and check for collisions
-        for p1, p2 in itertools.combinations(self.particles, 2):
-            self.handle_collision(p1, p2)
-
-        for particle in self.particles:
-            particle.move(width, height)
+        profiler = self.profiler
+        with profiler.frame():
+            width = self.canvas.winfo_width()
+            height = self.canvas.winfo_height()
+
+            periodic = self.periodic()
+            with profiler.span("physics"):
+                if self.md is not None:
+                    # Smooth pair forces: several velocity Verlet steps per frame
+                    self.md.box = (width, height)
+                    wall_impulse, virial_impulse = self.md.wall_impulse, self.md.virial_impulse
+                    self.md.advance(MD_SUBSTEPS)
+                    self.sync_particles()
+                    wall_impulse = self.md.wall_impulse - wall_impulse
+                    if self.gas is not None:
+                        self.gas.add_virial(self.md.virial_impulse - virial_impulse)
+                else:
+                    # Resolve collisions among the nearby pairs, then move the particles
+                    box = (width, height) if periodic else None
+                    with profiler.span("neighbours"):
+                        first, second = self.neighbours.update([(p.x, p.y) for p in self.particles], self.radii, box)
+                    with profiler.span("collisions"):
+                        self.handle_collisions(first, second, box)
+
+                    wall_impulse = 0.0
+                    for particle in self.particles:
+                        wall_impulse += particle.move(width, height, periodic)
+            with profiler.span("render"):
+                self.draw_particles()
+
+            with profiler.span("measurements"):
+                if self.gas is not None:
+                    self.gas.add_wall_impulse(wall_impulse)
+                    self.gas.record(self.masses, [(p.dx, p.dy) for p in self.particles], (width, height),
+                                    radii=self.radii)
+
+                if self.diagnostics is not None and self.diagnostics.due(self.step_count):
+                    self.record_diagnostics()
+            if self.stream is not None:
+                with profiler.span("stream"):
+                    self.publish_state()
+            self.step_count += 1
+            if self.overlay is not None:
+                self.overlay.update(len(self.particles))
 
         self.animation_job = self.root.after(10, self.update)
 
-    def handle_collision(self, p1, p2):
-        """Checks for and resolves collisions between two particles."""
-        dist_x = p1.x - p2.x
-        dist_y = p1.y - p2.y
-        distance = math.sqrt(dist_x**2 + dist_y**2)
-
-        if distance <= p1.radius + p2.radius:
-            # --- Physics of Elastic Collision ---
-            # Normal vector
-            nx = dist_x / distance
-            ny = dist_y / distance
-
-            # Tangent vector
-            tx = -ny
-            ty = nx
-
-            # Dot product tangent
-            dp_tan1 = p1.dx * tx + p1.dy * ty
-            dp_tan2 = p2.dx * tx + p2.dy * ty
-
-            # Dot product normal
-            dp_norm1 = p1.dx * nx + p1.dy * ny
-            dp_norm2 = p2.dx * nx + p2.dy * ny
-
-            # Conservation of momentum in 1D
-            m1 = (dp_norm1 * (p1.mass - p2.mass) + 2 * p2.mass * dp_norm2) / (p1.mass + p2.mass)
-            m2 = (dp_norm2 * (p2.mass - p1.mass) + 2 * p1.mass * dp_norm1) / (p1.mass + p2.mass)
-
-            # Update velocities
-            p1.dx = tx * dp_tan1 + nx * m1
-            p1.dy = ty * dp_tan1 + ny * m1
-            p2.dx = tx * dp_tan2 + nx * m2
-            p2.dy = ty * dp_tan2 + ny * m2
+    def handle_collisions(self, first, second, box=None):
+        """Resolves all touching candidate pairs (index arrays) in one batch; box makes it periodic."""
+        positions = np.array([(p.x, p.y) for p in self.particles])
+        velocities = np.array([(p.dx, p.dy) for p in self.particles])
+
+        def on_round(i, j, before, after):
+            if self.diagnostics is not None:
+                self.audit_round(i, j, before, after)
+            if self.gas is not None:
+                # Collisional virial Σ r⃗_ij·Δp⃗_i for the pressure
+                separation = minimum_image(positions[i] - positions[j], box)
+                impulse = self.masses[i, None] * (after[0] - before[0])
+                self.gas.add_virial(np.einsum("ij,ij->", separation, impulse))
+
+        observed = self.diagnostics is not None or self.gas is not None
+        changed = resolve_contacts(positions, velocities, self.radii, self.masses, first, second,
+                                   on_round=on_round if observed else None, box=box)
+        for k, (dx, dy) in zip(changed.tolist(), velocities[changed].tolist()):
+            self.particles[k].dx = dx
+            self.particles[k].dy = dy
+
+    def audit_round(self, first, second, before, after):
+        """Checks every collision of one round for momentum and energy conservation."""
+        masses = np.column_stack((self.masses[first], self.masses[second]))
+        self.diagnostics.record_exchanges(masses, np.stack(before, axis=1), np.stack(after, axis=1))
 
     def start_simulation(self):
         """Starts or resumes the simulation."""
@@ -158,8 +395,11 @@ class ParticleSimulation:
         if self.animation_job:
             self.root.after_cancel(self.animation_job)
             self.animation_job = None
+        self.profiler.interrupt()
         self.start_button.config(state=tk.NORMAL, text="Resume")
         self.pause_button.config(state=tk.DISABLED)
+        if self.diagnostics is not None:
+            print(self.diagnostics.summary())
 
     def reset_simulation(self):
         """Stops and resets the simulation."""
@@ -167,6 +407,66 @@ class ParticleSimulation:
         self.create_particles()
         self.start_button.config(text="Start")
 
+    # --- Checkpoints ---
+    # The measurements (diagnostics, gas windows) are not saved; they start
+    # over from the restored step.
+
+    def checkpoint_state(self):
+        """Everything the next steps depend on, as a checkpoint state (see SimulationCore/Checkpoint.py)."""
+        particles = {name: np.array([getattr(p, name) for p in self.particles], dtype=float)
+                     for name in ("x", "y", "dx", "dy", "radius", "mass")}
+        particles["color"] = [p.color for p in self.particles]
+        return {
+            "particles": particles,
+            "interaction": self.interaction.get(),
+            "thermostat": self.thermostat.get(),
+            "boundaries": self.boundaries.get(),
+            "box": [self.canvas.winfo_width(), self.canvas.winfo_height()],
+            "step": self.step_count,
+            "rng": random_state(self.rng),
+            "neighbours": self.neighbours.checkpoint_state(),
+            "md": None if self.md is None else self.md.checkpoint_state(),
+        }
+
+    def restore_state(self, state):
+        """Replaces the particles and settings with a checkpoint state."""
+        saved = state["particles"]
+        self.place_particles(len(saved["x"]))
+        for k, p in enumerate(self.particles):
+            p.x, p.y, p.dx, p.dy = (float(saved[name][k]) for name in ("x", "y", "dx", "dy"))
+            p.radius, p.mass, p.color = float(saved["radius"][k]), float(saved["mass"][k]), saved["color"][k]
+            self.canvas.itemconfigure(p.id, fill=p.color)
+        self.radii = np.array(saved["radius"])
+        self.masses = np.array(saved["mass"])
+        self.particle_count_var.set(len(self.particles))
+        self.interaction.set(state["interaction"])
+        self.thermostat.set(state["thermostat"])
+        self.boundaries.set(state["boundaries"])
+        self.md = None if state["md"] is None else MolecularDynamics.from_state(state["md"])
+        self.reset_monitors()
+        self.neighbours.restore_state(state["neighbours"])
+        self.step_count = state["step"]
+        restore_random(self.rng, state["rng"])
+        self.draw_particles()
+
+    def save_checkpoint(self):
+        save_checkpoint(CHECKPOINT_PATH, "ParticleSimulation", self.checkpoint_state())
+        print(f"Saved step {self.step_count} to {CHECKPOINT_PATH}")
+
+    def load_checkpoint(self):
+        """Pauses and continues from the saved checkpoint; Start resumes it."""
+        if not os.path.exists(CHECKPOINT_PATH):
+            print(f"No checkpoint at {CHECKPOINT_PATH}")
+            return
+        self.pause_simulation()
+        state = load_checkpoint(CHECKPOINT_PATH, "ParticleSimulation")
+        box = [self.canvas.winfo_width(), self.canvas.winfo_height()]
+        if state["box"] != box:
+            print(f"The checkpoint was saved on a {state['box']} canvas, this one is {box}; "
+                  f"the continuation will differ")
+        self.restore_state(state)
+        self.start_button.config(text="Resume")
+
 
 # --- Main Program ---
 if __name__ == "__main__":
@@ -175,5 +475,15 @@ if __name__ == "__main__":
     style = ttk.Style(root)
     style.theme_use('clam')
 
-    simulation = ParticleSimulation(root)
+    # Kinetic energy is sampled every 50 steps; walls make momentum non-conserved
+    diagnostics = ConservationMonitor(sample_every=50, energy_tolerance=1e-6, momentum_tolerance=None,
+                                      angular_tolerance=None, on_alert=print_alert)
+    # Temperature, pressure and speed distribution over windows of 500 frames
+    gas = GasMonitor(window=500, on_window=print_window)
+    stream = StateStreamServer(STREAM_ADDRESS) if STREAM_ADDRESS else None
+    profiler = Profiler(enabled=PROFILE_OVERLAY or bool(PROFILE_PATH), dump_path=PROFILE_PATH)
+    simulation = ParticleSimulation(root, diagnostics=diagnostics, gas=gas, stream=stream, profiler=profiler,
+                                    overlay=PROFILE_OVERLAY)
     root.mainloop()
+    if stream is not None:
+        stream.close()
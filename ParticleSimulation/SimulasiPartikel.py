@@ -1,5 +1,20 @@
 import tkinter as tk
 import random
+import os
+import sys
+
+# Make the shared SimulationCore package importable when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from SimulationCore.LevelOfDetail import LevelOfDetail
+from SimulationCore.Profiler import ProfileOverlay, Profiler
+
+# Above this many particles in view a density heatmap replaces the circles
+LOD_MAX_SPRITES = 1500
+
+# The overlay shows the frame rate and the physics and render times;
+# PROFILE_PATH (".json" or ".csv") receives their histograms on exit
+PROFILE_OVERLAY = False
+PROFILE_PATH = None
 
 # Particle Class
 class Particle:
@@ -21,14 +36,12 @@ class Particle:
             self.x - self.radius, self.y - self.radius,
             self.x + self.radius, self.y + self.radius,
             fill=self.color,
-            outline="" # No border for a cleaner look
+            outline="", # No border for a cleaner look
+            tags="particle"
         )
 
     def move(self):
-        # FIX: Actually move the particle on the canvas
-        self.canvas.move(self.id, self.dx, self.dy)
-
-        # Update internal coordinates
+        # Update internal coordinates (the simulation places the circle afterwards)
         self.x += self.dx
         self.y += self.dy
 
@@ -50,19 +63,36 @@ class ParticleSimulation:
         self.canvas = tk.Canvas(root, width=800, height=600, bg="black")
         self.canvas.pack()
 
+        # Circles when few particles are in view, a density heatmap when crowded; the wheel zooms
+        self.lod = LevelOfDetail(self.canvas, max_sprites=LOD_MAX_SPRITES)
+        self.lod.bind()
+
+        self.profiler = Profiler(enabled=PROFILE_OVERLAY or bool(PROFILE_PATH), dump_path=PROFILE_PATH)
+        self.overlay = ProfileOverlay(self.canvas, self.profiler) if PROFILE_OVERLAY else None
+
         self.particles = []
-        self.num_particles = 100
         self.is_running = False
 
-        self.start_button = tk.Button(root, text="Start", command=self.start_simulation)
-        self.start_button.pack(pady=10)
+        controls = tk.Frame(root)
+        controls.pack(pady=10)
+
+        # Number of particles, read when Start creates them; above
+        # LOD_MAX_SPRITES the heatmap replaces the circles
+        tk.Label(controls, text="Particles:").pack(side=tk.LEFT, padx=5)
+        self.num_particles = tk.IntVar(value=100)
+        self.count_box = tk.Spinbox(controls, from_=10, to=20000, increment=10, textvariable=self.num_particles,
+                                    width=7)
+        self.count_box.pack(side=tk.LEFT, padx=5)
+
+        self.start_button = tk.Button(controls, text="Start", command=self.start_simulation)
+        self.start_button.pack(side=tk.LEFT, padx=5)
 
     def create_particles(self):
         # We need to get the canvas size *after* it has been drawn.
         self.canvas.update()
         width = self.canvas.winfo_width()
         height = self.canvas.winfo_height()
-        for _ in range(self.num_particles):
+        for _ in range(max(self.num_particles.get(), 1)):
             particle = Particle(self.canvas, width, height)
             self.particles.append(particle)
 
@@ -71,8 +101,17 @@ class ParticleSimulation:
         if not self.is_running:
             return
 
-        for particle in self.particles:
-            particle.move()
+        with self.profiler.frame():
+            with self.profiler.span("physics"):
+                for particle in self.particles:
+                    particle.move()
+
+            with self.profiler.span("render"):
+                items = [p.id for p in self.particles]
+                self.lod.draw(items, [p.x for p in self.particles], [p.y for p in self.particles],
+                              [p.radius for p in self.particles])
+            if self.overlay is not None:
+                self.overlay.update(len(self.particles))
 
         # FIX: Schedule the next update call AFTER the loop to avoid a crash
         self.root.after(10, self.update)
@@ -81,6 +120,7 @@ class ParticleSimulation:
         if not self.is_running:
             self.is_running = True
             self.start_button.config(state=tk.DISABLED, text="Running...")
+            self.count_box.config(state=tk.DISABLED)
 
             if not self.particles:
                 self.create_particles()
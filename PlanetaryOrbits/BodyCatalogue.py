@@ -0,0 +1,146 @@
+import csv
+import json
+import os
+
+import numpy as np
+
+# --- Body Catalogue ---
+# Orbit parameters of every body are kept in parallel NumPy arrays, so all
+# angles and positions are computed in one vectorized operation. Colours are
+# stored as indices into a small palette.
+#
+# Orbits are circular with closed-form angles:
+#   angle(t) = epoch_angle + speed * (t - epoch_time)   (degrees, t in frames)
+class BodyCatalogue:
+    def __init__(self, names, distance, speed, angle, size, color_index, palette, controls):
+        self.names = list(names)
+        self.distance = np.asarray(distance, dtype=float)
+        self.speed = np.asarray(speed, dtype=float)
+        self.initial_angle = np.asarray(angle, dtype=float)
+        self.size = np.asarray(size, dtype=float)
+        self.color_index = np.asarray(color_index, dtype=np.int32)
+        self.palette = list(palette)
+        self.controls = np.asarray(controls, dtype=bool) # Bodies that get their own widgets
+        self.reset()
+
+    @classmethod
+    def from_records(cls, records):
+        """Builds a catalogue from dicts with name, distance, speed, radius, color, angle, controls."""
+        palette = []
+        color_index = []
+        for record in records:
+            color = record.get("color", "white")
+            if color not in palette:
+                palette.append(color)
+            color_index.append(palette.index(color))
+        return cls(
+            names=[record["name"] for record in records],
+            distance=[float(record["distance"]) for record in records],
+            speed=[float(record["speed"]) for record in records],
+            angle=[float(record.get("angle", 0)) for record in records],
+            size=[float(record.get("radius", 1)) for record in records],
+            color_index=color_index,
+            palette=palette,
+            controls=[_as_bool(record.get("controls", False)) for record in records],
+        )
+
+    def __len__(self):
+        return len(self.names)
+
+    def extend(self, other):
+        """Appends the bodies of another catalogue, merging the colour palettes."""
+        remap = []
+        for color in other.palette:
+            if color not in self.palette:
+                self.palette.append(color)
+            remap.append(self.palette.index(color))
+        self.names += other.names
+        self.distance = np.concatenate((self.distance, other.distance))
+        self.speed = np.concatenate((self.speed, other.speed))
+        self.initial_angle = np.concatenate((self.initial_angle, other.initial_angle))
+        self.size = np.concatenate((self.size, other.size))
+        self.color_index = np.concatenate((self.color_index, np.asarray(remap, dtype=np.int32)[other.color_index]))
+        self.controls = np.concatenate((self.controls, other.controls))
+        self.reset()
+
+    def reset(self):
+        """Puts every body back at its initial angle at time zero."""
+        self.epoch_time = 0.0
+        self.epoch_angle = self.initial_angle.copy()
+
+    def selected(self):
+        """Indices of the bodies that get their own turtle, label and slider."""
+        return np.flatnonzero(self.controls)
+
+    def index(self, name):
+        return self.names.index(name)
+
+    def angles_at(self, t):
+        """Angles (degrees, wrapped to [0, 360)) of all bodies at time t."""
+        return np.mod(self.epoch_angle + self.speed * (t - self.epoch_time), 360.0)
+
+    def positions_at(self, times):
+        """Positions of all bodies for an array of times, shape (len(times), bodies, 2)."""
+        # Wrap before converting, so far-future times keep full precision
+        angles = np.radians(np.mod(self.epoch_angle + np.outer(np.asarray(times) - self.epoch_time, self.speed), 360.0))
+        return np.stack((self.distance * np.cos(angles), self.distance * np.sin(angles)), axis=-1)
+
+    def set_speed(self, index, speed, t):
+        """Changes one body's speed at time t without moving any body."""
+        self.epoch_angle = self.angles_at(t)
+        self.epoch_time = t
+        self.speed[index] = speed
+
+    def parameters(self):
+        """Arrays that fully determine the orbits (for cache keys)."""
+        return (self.distance, self.speed, self.epoch_angle, [self.epoch_time])
+
+# --- Loading ---
+
+def _as_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes")
+    return bool(value)
+
+
+def generate_belt(count, inner, outer, radius=1.0, color="#8c8c8c", seed=0,
+                  reference_distance=110.0, reference_speed=1.0, name="Asteroid"):
+    """
+    Random belt of small bodies between two orbital distances.
+
+    Speeds follow Kepler's third law relative to a reference body
+    (speed ∝ distance^-1.5), scaled so that Earth (110 px) moves at 1.0.
+    """
+    rng = np.random.default_rng(seed)
+    distance = rng.uniform(inner, outer, count)
+    speed = reference_speed * (distance / reference_distance) ** -1.5
+    return BodyCatalogue(
+        names=[f"{name} {i + 1}" for i in range(count)],
+        distance=distance,
+        speed=speed,
+        angle=rng.uniform(0, 360, count),
+        size=np.full(count, radius),
+        color_index=np.zeros(count, dtype=np.int32),
+        palette=[color],
+        controls=np.zeros(count, dtype=bool),
+    )
+
+
+def load_catalogue(path):
+    """
+    Loads a catalogue from JSON or CSV.
+
+    JSON files hold a "bodies" list and an optional "belts" list of
+    generate_belt() arguments. CSV files have one body per row with the
+    columns name, distance, speed, radius, color, angle, controls.
+    """
+    if os.path.splitext(path)[1].lower() == ".csv":
+        with open(path, newline="") as f:
+            return BodyCatalogue.from_records(list(csv.DictReader(f)))
+
+    with open(path) as f:
+        data = json.load(f)
+    catalogue = BodyCatalogue.from_records(data["bodies"])
+    for belt in data.get("belts", []):
+        catalogue.extend(generate_belt(**belt))
+    return catalogue
@@ -2,6 +2,19 @@ import turtle
 import tkinter as tk
 from tkinter import ttk
 import math
+import os
+import sys
+
+# Make the shared SimulationCore package importable when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from SimulationCore.Profiler import ProfileOverlay, Profiler
+
+# --- Profiling ---
+# PROFILE_OVERLAY shows the frame rate, the orbit ("physics") and render
+# times on the canvas; PROFILE_PATH (".json" or ".csv") receives histograms
+# of every phase of the frame when the program exits
+PROFILE_OVERLAY = False
+PROFILE_PATH = None
 
 # --- Main Application Window ---
 root = tk.Tk()
@@ -19,6 +32,10 @@ screen = turtle.TurtleScreen(canvas)
 screen.bgcolor("black")
 screen.tracer(0)  # Turn off automatic screen updates
 
+profiler = Profiler(enabled=PROFILE_OVERLAY or bool(PROFILE_PATH), dump_path=PROFILE_PATH)
+# The turtle screen puts (0, 0) in the middle of the canvas, so the top-left corner is (-400, -300)
+overlay = ProfileOverlay(canvas, profiler, -390, -290, label="planets") if PROFILE_OVERLAY else None
+
 # --- Controls Panel (Right Side) ---
 control_frame = ttk.Frame(root, padding=20)
 control_frame.pack(side=tk.RIGHT, fill=tk.Y)
@@ -48,24 +65,32 @@ def update_speed(planet_name, value):
 
 def update_simulation():
     """The main animation loop for the simulation."""
-    for name, t in planet_turtles.items():
-        planet_data = planets[name]
-
-        # Update the angle based on the current speed
-        planet_data["angle"] += planet_data["speed"]
-        if planet_data["angle"] >= 360:
-            planet_data["angle"] -= 360
-
-        # Calculate new position using trigonometry
-        angle_rad = math.radians(planet_data["angle"])
-        x = planet_data["distance"] * math.cos(angle_rad)
-        y = planet_data["distance"] * math.sin(angle_rad)
-
-        # Move the planet turtle to the new position
-        t.goto(x, y)
-
-    # Update the screen to show the new positions
-    screen.update()
+    with profiler.frame():
+        with profiler.span("physics"):
+            positions = {}
+            for name in planet_turtles:
+                planet_data = planets[name]
+
+                # Update the angle based on the current speed
+                planet_data["angle"] += planet_data["speed"]
+                if planet_data["angle"] >= 360:
+                    planet_data["angle"] -= 360
+
+                # Calculate new position using trigonometry
+                angle_rad = math.radians(planet_data["angle"])
+                x = planet_data["distance"] * math.cos(angle_rad)
+                y = planet_data["distance"] * math.sin(angle_rad)
+                positions[name] = (x, y)
+
+        with profiler.span("render"):
+            # Move the planet turtles to their new positions
+            for name, t in planet_turtles.items():
+                t.goto(positions[name])
+
+            # Update the screen to show the new positions
+            screen.update()
+        if overlay is not None:
+            overlay.update(len(planet_turtles))
 
     # Schedule this function to run again after a short delay (e.g., 15ms)
     # This creates the animation loop within tkinter's main loop
@@ -1,8 +1,19 @@
 import turtle
 import tkinter as tk
 from tkinter import ttk
-import math
-import random
+import os
+import sys
+
+import numpy as np
+
+# Make the shared SimulationCore package importable when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from SimulationCore.Background import BackgroundLayer
+from SimulationCore.CanvasRenderer import CanvasRenderer
+from SimulationCore.EphemerisCache import EphemerisCache, parameter_key
+from SimulationCore.Labels import LabelLayer
+from SimulationCore.Profiler import ProfileOverlay, Profiler
+from BodyCatalogue import load_catalogue
 
 # --- Main Application Window ---
 root = tk.Tk()
@@ -12,6 +23,36 @@ root.configure(bg='#1a1a1a') # Dark background for the main window
 
 # --- Global Simulation State ---
 is_paused = True # Start the simulation in a paused state
+sim_time = 0.0 # Simulated time, measured in animation frames
+time_warp = 1.0 # Simulated frames advanced per animation frame (negative runs backwards)
+
+# --- Catalogue and Ephemeris Settings ---
+# Bodies are loaded from a JSON or CSV catalogue (see BodyCatalogue.py)
+CATALOGUE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "planets.json")
+EPHEMERIS_SEGMENT = 120 # Frames covered by one Chebyshev segment
+# Fitting a segment costs about as much as ten direct evaluations of the
+# orbits, so above this warp (a segment then serves fewer than 12 frames)
+# the orbits are evaluated directly. With 120-frame segments that is 10x,
+# within the warp slider's range.
+DIRECT_WARP = EPHEMERIS_SEGMENT / 12
+EPHEMERIS_CACHE_DIR = None # Set to a folder path to keep fitted segments on disk
+STAR_SEED = 3 # Same seed, same starfield (None for a new one every run)
+BACKGROUND_CACHE_DIR = None # Set to a folder path to keep the rendered stars and orbits on disk
+LABEL_MINOR_BODIES = False # Also label asteroids; crowded labels are culled
+LABEL_SPACING = 24 # At most one label per cell of this many pixels (larger bodies win)
+
+# --- Timeline Settings ---
+FRAMES_PER_YEAR = 360 # Earth moves 1 degree per frame at its initial speed
+JUMP_YEARS = (-100, -10, -1, 1, 10, 100) # Timeline jump buttons
+MAX_WARP = 20 # Range of the warp slider (frames per frame, both directions)
+
+# --- Profiling ---
+# PROFILE_OVERLAY shows the frame rate, the ephemeris ("physics") and render
+# times and the body count on the canvas; PROFILE_PATH (".json" or ".csv")
+# receives histograms of every phase of the frame when the program exits
+PROFILE_OVERLAY = False
+PROFILE_PATH = None
+profiler = Profiler(enabled=PROFILE_OVERLAY or bool(PROFILE_PATH), dump_path=PROFILE_PATH)
 
 # --- Functions ---
 
@@ -22,6 +63,7 @@ def toggle_pause():
     # The button will now toggle between Start, Pause, and Resume
     if is_paused:
         pause_button.config(text="Resume")
+        profiler.interrupt()
     else:
         pause_button.config(text="Pause")
         # If resuming, call update_simulation to restart the loop
@@ -29,81 +71,109 @@ def toggle_pause():
 
 def reset_simulation():
     """Resets all planets to their initial positions and angles."""
-    for name, data in planets.items():
-        data["angle"] = 0 # Reset angle
-        planet_turtle = planet_turtles[name]
-        label_turtle = planet_labels[name]
-
-        # Recalculate initial position
-        x = data["distance"]
-        y = 0
+    global sim_time
+    sim_time = 0.0
+    catalogue.reset()
+    ephemeris.clear(key=ephemeris_key())
 
-        planet_turtle.goto(x, y)
-
-        # Clear and redraw label at initial position
-        label_turtle.clear()
-        label_turtle.goto(x, y + 15)
-        label_turtle.write(name, align="center", font=("Arial", 8, "normal"))
-
-    # A single screen update is needed to show the reset state
-    screen.update()
+    # Draw the initial state, then a single screen update shows it
+    redraw()
 
 
 def update_speed(planet_name, value):
     """Updates the speed of a planet and the corresponding value label."""
     speed_value = float(value)
-    planets[planet_name]["speed"] = speed_value
+
+    # Re-anchor the closed-form orbits at the current time, then refit
+    catalogue.set_speed(catalogue.index(planet_name), speed_value, sim_time)
+    ephemeris.clear(key=ephemeris_key())
+
     # Update the text of the label to show the numeric speed
     speed_labels[planet_name].config(text=f"{speed_value:.2f}")
 
 
 def draw_stars():
-    """Draws a field of stars in the background for a cosmic feel."""
-    star_drawer = turtle.RawTurtle(screen)
-    star_drawer.hideturtle()
-    star_drawer.penup()
-    star_drawer.speed(0)
-    for _ in range(200): # More stars
-        x = random.randint(-400, 400)
-        y = random.randint(-400, 400)
-        # Avoid drawing stars on top of the sun
-        if math.sqrt(x**2 + y**2) > 30:
-            star_drawer.goto(x, y)
-            star_drawer.dot(random.randint(1, 3), "white")
-
-def draw_orbit(t, radius):
-    """Draws a circular orbit path."""
-    t.goto(0, -radius)
-    t.pendown()
-    t.circle(radius)
-    t.penup()
+    """Adds a field of stars to the background for a cosmic feel."""
+    # Avoid drawing stars on top of the sun
+    background.add_stars(200, (-400, 400), (-400, 400), sizes=(1, 3), seed=STAR_SEED, min_distance=30)
+
+def ephemeris_key():
+    """Identifies the current orbit parameters for the on-disk segment cache."""
+    return parameter_key(*catalogue.parameters())
+
+def draw_orbit(radius):
+    """Adds a circular orbit path to the background."""
+    background.add_circle(0, 0, radius, "#333")
+
+def draw_bodies(positions):
+    """Moves the selected planets and labels and redraws the minor bodies."""
+    names = [catalogue.names[i] for i in selected]
+    renderer.move_bodies(names, positions[selected, 0], positions[selected, 1])
+
+    # Labels are retained text items; off-screen and crowded ones are hidden
+    labels.update(label_names, positions[labelled, 0], positions[labelled, 1],
+                  priority=catalogue.size[labelled])
+
+    # Minor bodies (asteroids) are drawn together into a single image
+    renderer.draw_points("minor", positions[minor, 0], positions[minor, 1], minor_colors, minor_sizes)
+
+def body_positions(t):
+    """
+    Positions of all bodies at time t.
+
+    At normal speeds consecutive frames fall in the same cached Chebyshev
+    segment. Above DIRECT_WARP too few frames share a segment to pay for its
+    fit, and the closed form is evaluated directly instead.
+    """
+    if abs(time_warp) > DIRECT_WARP:
+        return catalogue.positions_at([t])[0]
+    return ephemeris.positions(t)
+
+def redraw():
+    """Draws the bodies at the current simulated time and refreshes the timeline."""
+    with profiler.span("physics"):
+        positions = body_positions(sim_time)
+    # Includes screen.update(), where Tk repaints the canvas
+    with profiler.span("render"):
+        draw_bodies(positions)
+        time_label.config(text=f"Year {sim_time / FRAMES_PER_YEAR:,.2f}")
+        screen.update()
+
+def jump_time(years):
+    """Jumps the simulated time; orbits are closed-form, so this costs O(bodies)."""
+    global sim_time
+    sim_time += years * FRAMES_PER_YEAR
+    redraw()
+
+def go_to_year():
+    """Jumps to the year typed into the timeline entry."""
+    global sim_time
+    try:
+        year = float(year_entry.get())
+    except ValueError:
+        return # Ignore text that is not a number
+    sim_time = year * FRAMES_PER_YEAR
+    redraw()
+
+def update_warp(value):
+    """Sets how many simulated frames pass per animation frame."""
+    global time_warp
+    time_warp = round(float(value), 1)
+    warp_label.config(text=f"{time_warp:.1f}x")
 
 def update_simulation():
     """The main animation loop for the simulation."""
+    global sim_time
     if is_paused:
         return # Stop the loop if paused
 
-    for name, data in planets.items():
-        planet_turtle = planet_turtles[name]
-        label_turtle = planet_labels[name]
-
-        data["angle"] += data["speed"]
-        if data["angle"] >= 360:
-            data["angle"] -= 360
-
-        angle_rad = math.radians(data["angle"])
-        x = data["distance"] * math.cos(angle_rad)
-        y = data["distance"] * math.sin(angle_rad)
-
-        # Move the planet body
-        planet_turtle.goto(x, y)
-
-        # Move and redraw the label in every frame
-        label_turtle.clear()
-        label_turtle.goto(x, y + 15)
-        label_turtle.write(name, align="center", font=("Arial", 8, "normal"))
+    with profiler.frame():
+        # Look up every body at once from the cached Chebyshev segments
+        sim_time += time_warp
+        redraw()
+        if overlay is not None:
+            overlay.update(len(catalogue))
 
-    screen.update()
     root.after(15, update_simulation)
 
 # --- Main Frames ---
@@ -131,38 +201,39 @@ screen.setworldcoordinates(-420, -420, 420, 420)
 screen.bgcolor("black")
 screen.tracer(0)
 
-# --- Draw Static Elements ---
-draw_stars()
+# The turtle screen only provides the world coordinates; bodies and labels
+# are retained canvas items that are moved instead of redrawn
+renderer = CanvasRenderer.for_turtle_screen(screen)
+overlay = (ProfileOverlay(canvas, profiler, renderer.bounds[0] + 10, renderer.bounds[1] + 10, label="bodies")
+           if PROFILE_OVERLAY else None)
 
-# Orbit Drawer Turtle
-orbit_drawer = turtle.RawTurtle(screen)
-orbit_drawer.hideturtle()
-orbit_drawer.penup()
-orbit_drawer.color("#333")
-orbit_drawer.speed(0)
+# --- Static Elements ---
+# Stars and orbits are rendered once into a single background image
+background = BackgroundLayer(cache_dir=BACKGROUND_CACHE_DIR)
+draw_stars()
 
-# --- Sun ---
-sun = turtle.RawTurtle(screen)
-sun.shape("circle")
-sun.color("yellow")
-sun.shapesize(stretch_wid=2.5, stretch_len=2.5)
-sun.penup()
-
-# --- Planet Data ---
-planets = {
-    "Mercury": {"distance": 50, "radius": 3.8, "color": "grey", "angle": 0, "speed": 1.6},
-    "Venus":   {"distance": 78, "radius": 9.5, "color": "#E8B468", "angle": 0, "speed": 1.2},
-    "Earth":   {"distance": 110, "radius": 10, "color": "#4A90E2", "angle": 0, "speed": 1.0},
-    "Mars":    {"distance": 152, "radius": 5.3, "color": "#D05F48", "angle": 0, "speed": 0.8},
-    "Jupiter": {"distance": 220, "radius": 20, "color": "#D8CA9D", "angle": 0, "speed": 0.43},
-    "Saturn":  {"distance": 280, "radius": 18, "color": "#F0E68C", "angle": 0, "speed": 0.32},
-    "Uranus":  {"distance": 330, "radius": 14, "color": "#AFDBF5", "angle": 0, "speed": 0.23},
-    "Neptune": {"distance": 380, "radius": 13.8, "color": "#3F54BA", "angle": 0, "speed": 0.18}
-}
-
-# --- Create Turtles, Labels, Orbits, and UI Controls ---
-planet_turtles = {}
-planet_labels = {}
+# --- Body Catalogue ---
+# Distances, speeds, angles, sizes and colour indices live in NumPy arrays.
+# Only the bodies marked "controls" get a canvas body, a label and a slider.
+catalogue = load_catalogue(CATALOGUE_PATH)
+selected = catalogue.selected()
+minor = np.flatnonzero(~catalogue.controls)
+minor_sizes = np.maximum(2 * catalogue.size[minor], 1).astype(int)
+palette_rgb = np.array([renderer.rgb(color) for color in catalogue.palette], dtype=np.uint8)
+minor_colors = palette_rgb[catalogue.color_index[minor]]
+
+# --- Labels ---
+labelled = np.arange(len(catalogue)) if LABEL_MINOR_BODIES else selected
+label_names = [catalogue.names[i] for i in labelled]
+labels = LabelLayer(renderer, offset=(0, 15), spacing=LABEL_SPACING)
+
+# --- Ephemeris ---
+# The renderer samples positions from piecewise Chebyshev fits of the orbits,
+# so each frame is one vectorized evaluation for all bodies.
+ephemeris = EphemerisCache(catalogue.positions_at, EPHEMERIS_SEGMENT, max_segments=8,
+                           cache_dir=EPHEMERIS_CACHE_DIR, key=ephemeris_key())
+
+# --- Create Orbits and UI Controls ---
 sliders = {}
 speed_labels = {} # Dictionary to hold the new speed value labels
 
@@ -179,6 +250,41 @@ reset_button.pack(side=tk.LEFT, expand=True, padx=5)
 
 ttk.Separator(control_panel_frame, orient='horizontal').pack(fill='x', pady=10)
 
+# --- Timeline Controls ---
+timeline_frame = ttk.Frame(control_panel_frame)
+timeline_frame.pack(fill=tk.X)
+ttk.Label(timeline_frame, text="Timeline", font=("Helvetica", 12, "bold")).pack(side=tk.LEFT)
+time_label = ttk.Label(timeline_frame, text="Year 0.00")
+time_label.pack(side=tk.RIGHT)
+
+# Jump buttons (years)
+jump_frame = ttk.Frame(control_panel_frame)
+jump_frame.pack(fill=tk.X, pady=5)
+for years in JUMP_YEARS:
+    ttk.Button(jump_frame, text=f"{years:+d}y", width=5,
+               command=lambda y=years: jump_time(y)).pack(side=tk.LEFT, expand=True, padx=1)
+
+# Jump to a specific year
+goto_frame = ttk.Frame(control_panel_frame)
+goto_frame.pack(fill=tk.X, pady=5)
+year_entry = ttk.Entry(goto_frame, width=10)
+year_entry.pack(side=tk.LEFT, expand=True, fill=tk.X, padx=5)
+year_entry.bind("<Return>", lambda e: go_to_year())
+ttk.Button(goto_frame, text="Go to year", command=go_to_year).pack(side=tk.LEFT, padx=5)
+
+# Time-warp slider, applied to all bodies
+warp_frame = ttk.Frame(control_panel_frame)
+warp_frame.pack(fill=tk.X)
+ttk.Label(warp_frame, text="Time warp").pack(side=tk.LEFT)
+warp_label = ttk.Label(warp_frame, text=f"{time_warp:.1f}x")
+warp_label.pack(side=tk.RIGHT)
+warp_slider = ttk.Scale(control_panel_frame, from_=-MAX_WARP, to=MAX_WARP, orient="horizontal",
+                        command=update_warp)
+warp_slider.set(time_warp)
+warp_slider.pack(pady=2, fill=tk.X)
+
+ttk.Separator(control_panel_frame, orient='horizontal').pack(fill='x', pady=10)
+
 # --- Scrollable Frame for Sliders ---
 slider_canvas = tk.Canvas(control_panel_frame, bg='#1a1a1a', highlightthickness=0)
 scrollbar = ttk.Scrollbar(control_panel_frame, orient="vertical", command=slider_canvas.yview)
@@ -192,24 +298,12 @@ slider_canvas.pack(side="left", fill="both", expand=True)
 scrollbar.pack(side="right", fill="y")
 
 
-for name, data in planets.items():
-    draw_orbit(orbit_drawer, data["distance"])
-
-    t = turtle.RawTurtle(screen)
-    t.shape("circle")
-    t.color(data["color"])
-    t.shapesize(stretch_wid=data["radius"] / 10, stretch_len=data["radius"] / 10)
-    t.penup()
-    t.goto(data["distance"], 0)
-    planet_turtles[name] = t
-
-    # Setup for the label turtle
-    label = turtle.RawTurtle(screen)
-    label.hideturtle()
-    label.penup()
-    label.color("white")
-    label.goto(data["distance"], data["radius"] + 15)
-    planet_labels[name] = label
+for i in selected:
+    name = catalogue.names[i]
+    distance = catalogue.distance[i]
+    radius = catalogue.size[i]
+    draw_orbit(distance)
+    renderer.add_body(name, radius, catalogue.palette[catalogue.color_index[i]], distance, 0)
 
     # --- UI Controls Setup ---
     planet_control_frame = ttk.Frame(scrollable_frame)
@@ -221,7 +315,7 @@ for name, data in planets.items():
     ttk.Label(label_frame, text=f"{name}").pack(side=tk.LEFT)
 
     # Add the speed value label
-    speed_label = ttk.Label(label_frame, text=f"{data['speed']:.2f}")
+    speed_label = ttk.Label(label_frame, text=f"{catalogue.speed[i]:.2f}")
     speed_label.pack(side=tk.RIGHT)
     speed_labels[name] = speed_label
 
@@ -230,10 +324,16 @@ for name, data in planets.items():
         planet_control_frame, from_=0, to=4, orient="horizontal",
         command=lambda val, p_name=name: update_speed(p_name, val)
     )
-    slider.set(data["speed"])
+    slider.set(catalogue.speed[i])
     slider.pack(pady=2, fill=tk.X, expand=True)
     sliders[name] = slider
 
+background.show(renderer)
+background.follow_resize(renderer) # Covers the window again after it is enlarged
+
+# --- Sun ---
+renderer.add_body("sun", 25, "yellow")
+
 # --- Final Setup ---
 # Draw the initial state of the simulation before starting the main loop
 reset_simulation()
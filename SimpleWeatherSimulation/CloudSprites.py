@@ -0,0 +1,64 @@
+import numpy as np
+
+# --- Procedural Clouds ---
+# A cloud is a handful of overlapping circular puffs sitting on a flat base,
+# bigger in the middle than at the ends. Each variant is rendered once into
+# an RGBA image with a soft top-to-bottom shading; clouds on screen are
+# image items that share these images and are only ever moved.
+
+def cloud_puffs(rng, size):
+    """Random puff circles (x, y, radius) of one cloud, base line at y = 0."""
+    n = int(rng.integers(3, 7))
+    swell = 1.0 + 0.4 * np.sin(np.pi * (np.arange(n) + 0.5) / n) # Larger puffs in the middle
+    radii = size * rng.uniform(0.6, 0.9, n) * swell
+    xs = np.arange(n) * size + rng.normal(0.0, 0.1 * size, n)
+    ys = radii * rng.uniform(0.5, 1.0, n) # Puffs partly below the base are cut off flat
+    return np.column_stack((xs, ys, radii))
+
+
+def render_cloud(puffs, color=(255, 255, 255), shade=0.25):
+    """
+    Rasterizes puffs into an RGBA image with the base line at the bottom.
+
+    The underside is darkened by up to `shade`. Returns the image and the
+    x offset of the world origin (the puffs' x = 0) within it.
+    """
+    left = np.floor(np.min(puffs[:, 0] - puffs[:, 2])) - 1
+    right = np.ceil(np.max(puffs[:, 0] + puffs[:, 2])) + 1
+    top = np.ceil(np.max(puffs[:, 1] + puffs[:, 2])) + 1
+    width, height = int(right - left), int(top)
+
+    # Pixel centres in cloud coordinates (rows run downwards from the top)
+    xs = left + np.arange(width) + 0.5
+    ys = top - (np.arange(height) + 0.5)
+    inside = np.zeros((height, width), dtype=bool)
+    for x, y, r in puffs:
+        inside |= (xs[None, :] - x)**2 + (ys[:, None] - y)**2 <= r**2
+
+    brightness = 1.0 - shade * (np.arange(height) / max(height - 1, 1))
+    image = np.zeros((height, width, 4), dtype=np.uint8)
+    image[..., :3] = (np.asarray(color)[None, None, :] * brightness[:, None, None]).astype(np.uint8)
+    image[..., 3] = np.where(inside, 255, 0)
+    return image, -left
+
+
+class CloudSprites:
+    def __init__(self, layers, variants=6, seed=0):
+        """
+        Builds `variants` cloud images for every layer at startup.
+
+        layers is a list of (puff size, (r, g, b)) pairs, far layer first.
+        """
+        rng = np.random.default_rng(seed)
+        self.sprites = [] # Per layer: list of (name, image, origin_x)
+        for layer, (size, color) in enumerate(layers):
+            images = []
+            for variant in range(variants):
+                image, origin = render_cloud(cloud_puffs(rng, size), color)
+                images.append((f"cloud{layer}_{variant}", image, origin))
+            self.sprites.append(images)
+
+    def pick(self, layer, rng):
+        """A random variant of the given layer."""
+        images = self.sprites[layer]
+        return images[int(rng.integers(len(images)))]
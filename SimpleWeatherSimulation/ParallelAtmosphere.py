@@ -0,0 +1,157 @@
+import copy
+import multiprocessing
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# --- Parallel Atmosphere ---
+# Steps an AtmosphereModel with several worker processes. The arrays the
+# model writes to live in shared memory, and the grid is split into tiles:
+# bands of rows for the row phases and bands of spectrum columns for the
+# column pass of the Poisson solve. Every worker runs the model's own phase
+# methods on its tile, so each cell goes through exactly the same arithmetic
+# as in the serial model.step() and the results are bit-identical.
+#
+# Halo rows need no copying: after the barrier that ends a phase, a worker
+# reads its neighbours' boundary rows (of ψ and of the advected fields)
+# straight from shared memory. Reads and writes never overlap within a
+# phase, because every phase reads one array and writes another:
+#   state -> spectrum -> ψ -> wind -> advected -> state
+# Tile 0 also sums the rain of all columns after the last barrier.
+
+def tile_bounds(size, tiles):
+    """(start, stop) of `tiles` nearly equal bands of range(size)."""
+    edges = np.linspace(0, size, tiles + 1).round().astype(int)
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def _run_worker(model, names, rows, columns, tile, command, start, barrier, done):
+    blocks = {name: shared_memory.SharedMemory(name=block) for name, block in names.items()}
+    model = copy.copy(model) # Only this copy points into the shared memory
+    model.attach({name: np.ndarray(getattr(model, name).shape, getattr(model, name).dtype, buffer=block.buf)
+                  for name, block in blocks.items()}, copy=False)
+    try:
+        while True:
+            start.wait()
+            steps = command.value
+            if steps < 0:
+                break
+            for _ in range(steps):
+                for phase, over, sync in model.PHASES:
+                    getattr(model, phase)(*(rows if over == "rows" else columns))
+                    if sync:
+                        barrier.wait()
+                if tile == 0:
+                    model.collect_rain()
+            done.wait()
+    except threading.BrokenBarrierError:
+        return # Another worker failed; the parent reports it
+    except BaseException:
+        # Release everyone waiting on this worker instead of deadlocking
+        for gate in (start, barrier, done):
+            gate.abort()
+        raise
+    del model # Drops the last views of the blocks so they can be closed
+    for block in blocks.values():
+        block.close()
+
+
+class ParallelAtmosphere:
+    def __init__(self, model, workers=4):
+        """
+        Moves the model's arrays into shared memory and starts the workers.
+
+        The model keeps working as usual for reading (drawing, diagnostics);
+        advance() here replaces model.advance(). Call close() when done.
+        """
+        self.model = model
+        workers = max(1, min(workers, model.nz))
+        # Forked workers inherit the model; elsewhere it is pickled to them
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+
+        self.blocks = {}
+        arrays = {}
+        for name in model.SHARED:
+            array = getattr(model, name)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            self.blocks[name] = block
+            arrays[name] = np.ndarray(array.shape, array.dtype, buffer=block.buf)
+        model.attach(arrays)
+
+        self.command = context.Value("i", 0, lock=False)
+        self.start = context.Barrier(workers + 1) # Parent and workers: begin a batch of steps
+        self.done = context.Barrier(workers + 1)  # Parent and workers: the batch is finished
+        self.barrier = context.Barrier(workers)   # Workers only: between phases
+        names = {name: block.name for name, block in self.blocks.items()}
+        row_tiles = tile_bounds(model.nz, workers)
+        column_tiles = tile_bounds(model.spectrum.shape[1], workers)
+        self.workers = []
+        for tile in range(workers):
+            worker = context.Process(target=_run_worker, daemon=True,
+                                     args=(model, names, row_tiles[tile], column_tiles[tile], tile,
+                                           self.command, self.start, self.barrier, self.done))
+            worker.start()
+            self.workers.append(worker)
+
+    def advance(self, steps):
+        """Advances the shared model by `steps` steps, like model.advance()."""
+        self.command.value = steps
+        try:
+            self.start.wait()
+            self.done.wait()
+        except threading.BrokenBarrierError:
+            raise RuntimeError("An atmosphere worker failed; see its traceback above") from None
+        for _ in range(steps):
+            self.model.time += self.model.dt
+
+    def close(self):
+        """Stops the workers and gives the model private copies of its arrays again."""
+        if not self.workers:
+            return
+        self.command.value = -1
+        try:
+            self.start.wait(timeout=5)
+        except threading.BrokenBarrierError:
+            pass
+        for worker in self.workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        self.workers = []
+        model = self.model
+        model.attach({name: np.copy(getattr(model, name)) for name in self.blocks}, copy=False)
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
+
+# --- Demonstration ---
+# Checks that the parallel path matches the serial one bit for bit and
+# compares their speed: python ParallelAtmosphere.py [size] [workers] [steps]
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from AtmosphereModel import AtmosphereModel
+
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else multiprocessing.cpu_count()
+    steps = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    settings = dict(nx=size, nz=size, dt=min(10.0, 0.2 * (10e3 / size)**2 / 20.0))
+
+    serial = AtmosphereModel(**settings)
+    begin = time.perf_counter()
+    serial.advance(steps)
+    serial_time = (time.perf_counter() - begin) / steps
+
+    model = AtmosphereModel(**settings)
+    parallel = ParallelAtmosphere(model, workers)
+    begin = time.perf_counter()
+    parallel.advance(steps)
+    parallel_time = (time.perf_counter() - begin) / steps
+    parallel.close()
+
+    identical = all(np.array_equal(getattr(serial, name), getattr(model, name)) for name in AtmosphereModel.SHARED)
+    print(f"{size}x{size} grid, {steps} steps: serial {serial_time * 1000:.1f} ms/step, "
+          f"{workers} workers {parallel_time * 1000:.1f} ms/step, bit-identical: {identical}")
@@ -0,0 +1,118 @@
+import numpy as np
+
+# --- Precipitation Engine ---
+# Raindrop state lives in flat NumPy arrays sized for the largest storm.
+# Idle slots are kept on a free-list stack, so spawning and retiring drops
+# are O(1) per drop with no scanning of the pool, and both are done for
+# whole batches of drops at once.
+#
+# Drops relax towards terminal velocity (falling) and the wind speed
+# (sideways) with a short time constant:
+#   v += (v_target - v) * (1 - exp(-dt / tau))
+# All positions are in screen units (pixels) and times in seconds.
+class Precipitation:
+    def __init__(self, capacity=20000, ground_level=-250, terminal_velocity=200.0, wind=0.0,
+                 wind_jitter=10.0, relaxation_time=0.1, seed=None):
+        self.capacity = capacity
+        self.ground_level = ground_level
+        self.terminal_velocity = terminal_velocity # Pixels per second, downwards
+        self.wind = wind                           # Mean horizontal drift (pixels per second)
+        self.wind_jitter = wind_jitter             # Spread of the drift between drops
+        self.relaxation_time = relaxation_time
+        self.rng = np.random.default_rng(seed)
+
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.drift = np.zeros(capacity) # Each drop's own wind offset
+        self.active = np.zeros(capacity, dtype=bool)
+        # Free list: free[:free_count] holds the indices of idle slots
+        self.free = np.arange(capacity)[::-1].copy()
+        self.free_count = capacity
+
+    @property
+    def count(self):
+        """Number of falling drops."""
+        return self.capacity - self.free_count
+
+    def spawn(self, xs, ys):
+        """Activates one drop per (x, y) position; drops beyond the capacity are skipped."""
+        n = min(len(xs), self.free_count)
+        if n == 0:
+            return
+        slots = self.free[self.free_count - n:self.free_count]
+        self.free_count -= n
+        self.x[slots] = xs[:n]
+        self.y[slots] = ys[:n]
+        self.drift[slots] = self.rng.normal(0.0, self.wind_jitter, n)
+        self.vx[slots] = self.wind + self.drift[slots]
+        self.vy[slots] = -0.5 * self.terminal_velocity # Leaves the cloud at half speed
+        self.active[slots] = True
+
+    def spawn_from_clouds(self, left, right, bottom, rate, dt):
+        """
+        Spawns drops under clouds spanning [left, right] at height bottom.
+
+        rate is the mean number of drops per cloud per second (one value, or
+        one per cloud); the actual number each frame is Poisson distributed.
+        """
+        left = np.asarray(left, dtype=float)
+        right = np.asarray(right, dtype=float)
+        counts = self.rng.poisson(rate * dt, len(left))
+        total = counts.sum()
+        if total == 0:
+            return
+        cloud = np.repeat(np.arange(len(left)), counts)
+        xs = self.rng.uniform(left[cloud], right[cloud])
+        ys = np.asarray(bottom, dtype=float)[cloud]
+        self.spawn(xs, ys)
+
+    def step(self, dt):
+        """Moves every falling drop and retires those below the ground in bulk."""
+        live = np.flatnonzero(self.active)
+        if len(live) == 0:
+            return
+        blend = 1.0 - np.exp(-dt / self.relaxation_time)
+        self.vx[live] += (self.wind + self.drift[live] - self.vx[live]) * blend
+        self.vy[live] += (-self.terminal_velocity - self.vy[live]) * blend
+        self.x[live] += self.vx[live] * dt
+        self.y[live] += self.vy[live] * dt
+        self.retire(live[self.y[live] < self.ground_level])
+
+    def retire(self, slots):
+        """Returns drops to the free list."""
+        n = len(slots)
+        if n == 0:
+            return
+        self.active[slots] = False
+        self.free[self.free_count:self.free_count + n] = slots
+        self.free_count += n
+
+    def clear(self):
+        """Retires every drop (e.g. when the rain stops)."""
+        self.retire(np.flatnonzero(self.active))
+
+    def positions(self):
+        """x and y of the falling drops."""
+        live = self.active
+        return self.x[live], self.y[live]
+
+    # --- Checkpoints ---
+    # The drop arrays, the free list and the generator's position, so a
+    # restored storm continues with exactly the drops it would have spawned.
+    ARRAYS = ("x", "y", "vx", "vy", "drift", "active", "free")
+
+    def checkpoint_state(self):
+        state = {name: getattr(self, name) for name in self.ARRAYS}
+        state["free_count"] = self.free_count
+        state["rng"] = self.rng.bit_generator.state
+        return state
+
+    def restore_state(self, state):
+        if len(state["x"]) != self.capacity:
+            raise ValueError(f"The checkpoint holds {len(state['x'])} drop slots, not {self.capacity}")
+        for name in self.ARRAYS:
+            getattr(self, name)[...] = state[name]
+        self.free_count = state["free_count"]
+        self.rng.bit_generator.state = state["rng"]
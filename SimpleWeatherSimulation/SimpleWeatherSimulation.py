@@ -1,5 +1,21 @@
+import atexit
 import turtle
 import random
+import os
+import sys
+
+import numpy as np
+
+# Make the shared SimulationCore package importable when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from SimulationCore.Background import BackgroundLayer
+from SimulationCore.CanvasRenderer import CanvasRenderer
+from SimulationCore.Checkpoint import load_checkpoint, random_state, restore_random, save_checkpoint
+from SimulationCore.Profiler import ProfileOverlay, Profiler
+from AtmosphereModel import AtmosphereModel
+from CloudSprites import CloudSprites
+from ParallelAtmosphere import ParallelAtmosphere
+from Precipitation import Precipitation
 
 # --- Screen Setup ---
 screen = turtle.Screen()
@@ -7,141 +23,222 @@ screen.setup(width=800, height=600)
 screen.bgcolor("#87CEEB") # Start with a sky blue background
 screen.title("Dynamic Weather Simulation")
 screen.tracer(0) # Turn off automatic screen updates for manual control
+# Clouds, raindrops, sun and ground are canvas items that are moved, not redrawn
+renderer = CanvasRenderer.for_turtle_screen(screen)
 
 # --- Global Weather State ---
 is_raining = False
 ground_level = -250
+BACKGROUND_CACHE_DIR = None # Set to a folder path to keep the rendered sun and ground on disk
+# "model": clouds and rain emerge from the grid atmosphere model
+# "timer": drifting sprite clouds, with the weather toggled every 10 seconds
+WEATHER_SOURCE = "model"
+
+# --- Cloud Settings ---
+# Layers from far to near: (count, puff size, speed range, height range, colour).
+# Far clouds are smaller, slower, higher and greyer, which gives some depth.
+CLOUD_LAYERS = [
+    (14, 10, (0.2, 0.5), (230, 280), (205, 210, 220)),
+    (10, 16, (0.5, 1.0), (180, 250), (232, 234, 240)),
+    (6, 22, (1.0, 1.8), (140, 210), (255, 255, 255)),
+]
+CLOUD_VARIANTS = 6 # Procedural cloud shapes generated per layer at startup
+CLOUD_SEED = 5
+
+# --- Precipitation Settings ---
+FRAME_TIME = 0.05 # Seconds per animation frame (50 ms timer)
+RAIN_RATE = 40 # Mean drops per cloud per second (a heavy storm is several thousand)
+MAX_DROPS = 20000 # Capacity of the drop arrays
+TERMINAL_VELOCITY = 200 # Falling speed in pixels per second
+WIND = 15 # Sideways drift in pixels per second (negative blows to the left)
+DROP_LENGTH = 4 # Length of a drawn rain streak in pixels
+RAIN_SEED = None # Same seed, same drops (None for new ones every run)
+
+# --- Atmosphere Model Settings ---
+# The model's vertical slice (100 km wide, 10 km high) is stretched over the
+# sky between the ground and MODEL_TOP
+MODEL_GRID = (256, 96) # Cells along x and z
+MODEL_STEPS_PER_FRAME = 2 # Model steps of 10 s each per animation frame
+MODEL_TOP = 300
+MODEL_SEED = 5
+MODEL_WORKERS = 0 # Worker processes stepping the model in tiles (0 steps it in this process)
+DROPS_PER_MM = 40 # Drops per second from a column raining 1 mm/h
+CLOUD_OPAQUE = 1e-3 # Cloud water (kg/kg) at which a cloud is fully opaque
+SKY_CLEAR = (135, 206, 235) # SkyBlue
+SKY_OVERCAST = (105, 105, 105) # DimGray
+
+# --- Checkpoints ---
+# Press "s" to save the weather (atmosphere, clouds, drops and random
+# generators) to CHECKPOINT_PATH and "l" to continue from it exactly. The
+# 10-second weather timer of the "timer" source is not part of it.
+CHECKPOINT_PATH = "weather.ckpt"
+
+# --- Profiling ---
+# PROFILE_OVERLAY shows the frame rate, the physics (model and rain) and
+# render times and the drop count on the canvas; PROFILE_PATH (".json" or
+# ".csv") receives histograms of every phase of the frame when the program exits
+PROFILE_OVERLAY = False
+PROFILE_PATH = None
+profiler = Profiler(enabled=PROFILE_OVERLAY or bool(PROFILE_PATH), dump_path=PROFILE_PATH)
+overlay = (ProfileOverlay(renderer.canvas, profiler, renderer.bounds[0] + 10, renderer.bounds[1] + 10,
+                          label="drops", color="black") if PROFILE_OVERLAY else None)
 
 # --- Object-Oriented Design ---
 
 class Cloud:
-    def __init__(self):
-        self.turtle = turtle.Turtle()
-        self.turtle.hideturtle()
-        self.turtle.penup()
-        self.turtle.speed(0)
-        self.x = random.randint(-450, 450)
-        self.y = random.randint(150, 250)
-        self.speed = random.uniform(0.5, 1.5)
-        self.turtle.goto(self.x, self.y)
-
-    def draw(self):
-        """Draws a multi-part cloud."""
-        self.turtle.color("white")
-        self.turtle.begin_fill()
-        self.turtle.circle(20)
-        self.turtle.end_fill()
-
-        self.turtle.forward(25)
-
-        self.turtle.begin_fill()
-        self.turtle.circle(25)
-        self.turtle.end_fill()
-
-        self.turtle.forward(25)
-
-        self.turtle.begin_fill()
-        self.turtle.circle(20)
-        self.turtle.end_fill()
+    def __init__(self, layer):
+        _, _, speeds, heights, _ = CLOUD_LAYERS[layer]
+        name, image, origin = sprites.pick(layer, sprite_rng)
+        self.width = image.shape[1] - origin # Extent to the right of the cloud's position
+        self.left = origin                   # Extent to the left
+        self.x = cloud_rng.randint(-450, 450)
+        self.y = cloud_rng.randint(*heights)
+        self.speed = cloud_rng.uniform(*speeds)
+        self.draw(name, image, origin)
+
+    def draw(self, name, image, origin):
+        """Places the cached cloud image once; afterwards it is only moved."""
+        renderer.add_sprite(self, name, image, self.x, self.y, anchor="sw", shift=(-origin, 0))
 
     def move(self):
         """Moves the cloud across the screen and wraps around."""
+        dx = self.speed
         self.x += self.speed
-        if self.x > 450:
-            self.x = -450 # Wrap around to the left side
-        self.turtle.clear()
-        self.turtle.goto(self.x, self.y)
-        self.draw()
-
-class Raindrop:
-    def __init__(self):
-        self.turtle = turtle.Turtle()
-        self.turtle.hideturtle()
-        self.turtle.shape("triangle")
-        self.turtle.color("#1E90FF") # DodgerBlue
-        self.turtle.penup()
-        self.turtle.speed(0)
-        self.turtle.setheading(270) # Point downwards
-        self.turtle.shapesize(0.5, 0.2, 1) # Long and thin
-        self.is_active = False
-
-    def fall(self):
-        """Moves the raindrop down and checks for ground collision."""
-        if self.is_active:
-            self.turtle.forward(10)
-            if self.turtle.ycor() < ground_level:
-                self.reset()
-
-    def drop(self, x, y):
-        """Activates a raindrop from a specific location."""
-        if not self.is_active:
-            self.is_active = True
-            self.turtle.goto(x, y)
-            self.turtle.showturtle()
-
-    def reset(self):
-        """Hides the raindrop and marks it as inactive."""
-        self.is_active = False
-        self.turtle.hideturtle()
+        if self.x - self.left > 400:
+            wrapped = -400 - self.width # Wrap around to the left side, just out of view
+            dx += wrapped - self.x
+            self.x = wrapped
+        renderer.move(self, dx, 0)
 
 # --- Setup Simulation Elements ---
-# Sun
-sun = turtle.Turtle()
-sun.hideturtle()
-sun.penup()
-sun.speed(0)
-sun.goto(-300, 200)
-sun.color("yellow")
-sun.begin_fill()
-sun.circle(50)
-sun.end_fill()
-
-# Ground
-ground = turtle.Turtle()
-ground.hideturtle()
-ground.penup()
-ground.speed(0)
-ground.goto(-400, ground_level)
-ground.color("#228B22") # ForestGreen
-ground.begin_fill()
-for _ in range(2):
-    ground.forward(800)
-    ground.right(90)
-    ground.forward(50)
-    ground.right(90)
-ground.end_fill()
-
-# Create a pool of objects
-num_clouds = 5
-num_raindrops = 50
-clouds = [Cloud() for _ in range(num_clouds)]
-raindrops = [Raindrop() for _ in range(num_raindrops)]
+# The sun and ground never move, so they are rendered once into a transparent
+# background image; the sky colour of the canvas shows through around them
+background = BackgroundLayer(cache_dir=BACKGROUND_CACHE_DIR)
+background.add_disc(-300, 250, 50, "yellow") # Sun
+background.add_rect(-400, ground_level - 50, 400, ground_level, "#228B22") # Ground (ForestGreen)
+background.show(renderer)
+background.follow_resize(renderer) # Covers the window again after it is enlarged
+
+# Create the clouds: cloud images are generated once per variant, and the
+# far layers are created first so the near clouds drift in front of them.
+# Only the "timer" source uses these sprites; the model's clouds are its
+# cloud water field, drawn by draw_atmosphere()
+clouds = []
+if WEATHER_SOURCE == "timer":
+    sprites = CloudSprites([(size, color) for _, size, _, _, color in CLOUD_LAYERS],
+                           variants=CLOUD_VARIANTS, seed=CLOUD_SEED)
+    sprite_rng = np.random.default_rng(CLOUD_SEED)
+    cloud_rng = random.Random(CLOUD_SEED)
+    clouds = [Cloud(layer) for layer, (count, *_) in enumerate(CLOUD_LAYERS) for _ in range(count)]
+
+# The atmosphere model and the grid cell behind every block of the view.
+# The clouds are drawn in blocks about the size of a grid cell (whole
+# pixels, as Tk only zooms by integers): the small image is encoded and
+# Tk scales it up, instead of encoding every pixel of the view.
+atmosphere = AtmosphereModel(nx=MODEL_GRID[0], nz=MODEL_GRID[1], seed=MODEL_SEED)
+stepper = ParallelAtmosphere(atmosphere, MODEL_WORKERS) if MODEL_WORKERS else atmosphere
+if MODEL_WORKERS:
+    # Stop the workers and free their shared memory when the window closes;
+    # otherwise they wait on their barrier and the blocks are left to the
+    # resource tracker
+    atexit.register(stepper.close)
+column_width = 800 / atmosphere.nx
+row_height = (MODEL_TOP - ground_level) / atmosphere.nz
+block = (max(1, int(column_width)), max(1, int(row_height))) # Pixels per block along x and y
+x1, y1, x2, y2 = renderer.bounds
+view_x, view_y = renderer.to_world(x1 + (np.arange(-(-(x2 - x1) // block[0])) + 0.5) * block[0],
+                                   y1 + (np.arange(-(-(y2 - y1) // block[1])) + 0.5) * block[1])
+view_cols = np.floor((view_x + 400) / column_width).astype(int) % atmosphere.nx
+view_rows = np.floor((view_y - ground_level) / row_height).astype(int)
+in_sky = (view_rows >= 0) & (view_rows < atmosphere.nz) # Block rows covered by the model
+view_rows = np.clip(view_rows, 0, atmosphere.nz - 1)
+shown_clouds = None # The last cloud image, so an unchanged sky is not encoded again
+sky_color = None
+
+# Raindrops are rows in the precipitation engine's arrays, not turtles
+rain = Precipitation(capacity=MAX_DROPS, ground_level=ground_level,
+                     terminal_velocity=TERMINAL_VELOCITY, wind=WIND, seed=RAIN_SEED)
+rain_drawn = False # Whether the rain image currently shows any drops
+
+def draw_rain():
+    """Draws every falling drop as a short streak into one image."""
+    global rain_drawn
+    if rain.count == 0 and not rain_drawn:
+        return # Nothing on screen and nothing to draw
+    xs, ys = rain.positions()
+    streak = np.arange(DROP_LENGTH)
+    renderer.draw_points("rain", np.repeat(xs, DROP_LENGTH), (ys[:, None] + streak).ravel(),
+                         "#1E90FF", size=2) # DodgerBlue
+    rain_drawn = rain.count > 0
+
+def draw_atmosphere():
+    """Samples the model's cloud water at every block and draws it as one image."""
+    global shown_clouds
+    cloud = atmosphere.cloud[view_rows[:, None], view_cols[None, :]]
+    density = np.clip(cloud / CLOUD_OPAQUE, 0.0, 1.0) * in_sky[:, None]
+    image = np.empty(cloud.shape + (4,), dtype=np.uint8)
+    image[..., :3] = (255 - 110 * density)[..., None] # Thick clouds are grey
+    image[..., 3] = 255 * np.sqrt(density) # Thin clouds stay visible
+    if shown_clouds is not None and np.array_equal(image, shown_clouds):
+        return # E.g. a clear sky: nothing to encode
+    renderer.draw_image("atmosphere", image, zoom=block)
+    shown_clouds = image
+
+def update_sky():
+    """Darkens the sky as the model's cloud cover grows."""
+    global sky_color
+    cover = atmosphere.cloud_cover()
+    color = "#%02x%02x%02x" % tuple(round(a + (b - a) * cover) for a, b in zip(SKY_CLEAR, SKY_OVERCAST))
+    if color != sky_color:
+        screen.bgcolor(color)
+        sky_color = color
+
+def rain_from_model():
+    """Spawns drops under the cloud base of every column that is raining."""
+    global is_raining
+    raining = np.flatnonzero(atmosphere.precipitation > 0)
+    is_raining = len(raining) > 0
+    if not is_raining:
+        return
+    base = ground_level + atmosphere.cloud_base()[raining] * row_height
+    left = -400 + raining * column_width
+    rate = atmosphere.precipitation[raining] * 3600 * DROPS_PER_MM # mm/h -> drops per second
+    rain.spawn_from_clouds(left, left + column_width, base, rate, FRAME_TIME)
 
 # --- Main Animation Loop ---
 def animate():
     global is_raining
 
-    # Move all clouds
-    for cloud in clouds:
-        cloud.move()
+    with profiler.frame():
+        # Move all clouds
+        with profiler.span("clouds"):
+            for cloud in clouds:
+                cloud.move()
 
-    # If it's raining, make raindrops fall
-    if is_raining:
-        # Randomly drop new rain from clouds
-        if random.randint(1, 5) == 1:
-            active_cloud = random.choice(clouds)
-            # Find an inactive raindrop to recycle
-            for drop in raindrops:
-                if not drop.is_active:
-                    drop.drop(active_cloud.x + 25, active_cloud.y)
-                    break # Drop one at a time
-
-        # Move all active raindrops
-        for drop in raindrops:
-            drop.fall()
-
-    # Update the screen
-    screen.update()
+        with profiler.span("physics"):
+            # Advance the atmosphere; its clouds and rain replace the weather timer
+            if WEATHER_SOURCE == "model":
+                stepper.advance(MODEL_STEPS_PER_FRAME)
+                rain_from_model()
+
+            # If it's raining, spawn new drops under the clouds
+            elif is_raining:
+                rain.spawn_from_clouds([cloud.x - cloud.left for cloud in clouds],
+                                       [cloud.x + cloud.width for cloud in clouds],
+                                       [cloud.y for cloud in clouds], RAIN_RATE, FRAME_TIME)
+
+            # Move all falling drops in one step
+            rain.step(FRAME_TIME)
+
+        with profiler.span("render"):
+            if WEATHER_SOURCE == "model":
+                draw_atmosphere()
+                update_sky()
+            # Draw all drops in one batch, then update the screen
+            draw_rain()
+            screen.update()
+        if overlay is not None:
+            overlay.update(rain.count)
 
     # Schedule the next animation frame
     screen.ontimer(animate, 50)
@@ -156,14 +253,57 @@ def change_weather():
     else:
         screen.bgcolor("#87CEEB") # SkyBlue
         # Reset all raindrops when it stops raining
-        for drop in raindrops:
-            drop.reset()
+        rain.clear()
 
     # Schedule the next weather change
     screen.ontimer(change_weather, 10000) # Change weather every 10 seconds
 
 
+# --- Checkpoints ---
+
+def checkpoint_state():
+    """The whole weather as a checkpoint state (see SimulationCore/Checkpoint.py)."""
+    state = {"source": WEATHER_SOURCE, "is_raining": is_raining, "rain": rain.checkpoint_state(),
+             "atmosphere": atmosphere.checkpoint_state()}
+    if clouds:
+        state["clouds"] = {"x": np.array([cloud.x for cloud in clouds], dtype=float),
+                           "y": np.array([cloud.y for cloud in clouds], dtype=float),
+                           "speed": np.array([cloud.speed for cloud in clouds])}
+        state["cloud_rng"] = random_state(cloud_rng)
+    return state
+
+def save_weather():
+    save_checkpoint(CHECKPOINT_PATH, "SimpleWeatherSimulation", checkpoint_state())
+    print(f"Saved the weather at model time {atmosphere.time:.0f} s to {CHECKPOINT_PATH}")
+
+def load_weather():
+    """Continues from the saved checkpoint; the clouds are moved to their saved places."""
+    global is_raining
+    if not os.path.exists(CHECKPOINT_PATH):
+        print(f"No checkpoint at {CHECKPOINT_PATH}")
+        return
+    state = load_checkpoint(CHECKPOINT_PATH, "SimpleWeatherSimulation")
+    if state["source"] != WEATHER_SOURCE:
+        print(f"The checkpoint was saved with WEATHER_SOURCE = {state['source']!r}")
+        return
+    is_raining = state["is_raining"]
+    rain.restore_state(state["rain"])
+    atmosphere.restore_state(state["atmosphere"])
+    if clouds:
+        saved = state["clouds"]
+        for cloud, x, y, speed in zip(clouds, saved["x"].tolist(), saved["y"].tolist(), saved["speed"].tolist()):
+            renderer.move(cloud, x - cloud.x, y - cloud.y)
+            cloud.x, cloud.y, cloud.speed = x, y, speed
+        restore_random(cloud_rng, state["cloud_rng"])
+        screen.bgcolor("#696969" if is_raining else "#87CEEB")
+    draw_rain()
+
+screen.onkey(save_weather, "s")
+screen.onkey(load_weather, "l")
+screen.listen()
+
 # --- Start the Simulation ---
 animate()
-change_weather() # Start the weather cycle
+if WEATHER_SOURCE == "timer":
+    change_weather() # Start the weather cycle
 screen.mainloop()
@@ -0,0 +1,151 @@
+import hashlib
+import os
+
+import numpy as np
+
+from SimulationCore import Raster
+
+# --- Static Background Layer ---
+# Scenery that never moves (starfields, orbit paths, the sun, the ground) is
+# described as a short list of drawing operations, rendered once into an
+# RGBA image with NumPy and shown as a single canvas image underneath all
+# moving items. Areas without scenery stay transparent, so the canvas
+# background colour (e.g. the weather's sky colour) still shows through.
+#
+# The rendered image is cached as a PNG file keyed by the operations, the
+# random seed and the area it covers, so later runs with the same parameters
+# and window size skip rendering entirely. follow_resize() shows the layer
+# again when the window grows past that area, once the resizing stops.
+class BackgroundLayer:
+    def __init__(self, cache_dir=None, key="background"):
+        self.cache_dir = cache_dir
+        self.key = key # Renderer key of the image item
+        self.operations = []
+        self.renders = 0 # Number of images actually rendered (not loaded from disk)
+        self.area = None # Canvas area (x1, y1, x2, y2) covered by the shown image
+
+    # --- Scenery ---
+    # Positions and radii are in world units unless stated otherwise.
+
+    def add_stars(self, count, x_range, y_range, sizes=(1, 3), color="white", seed=0, min_distance=0):
+        """
+        Random star dots with diameters (in pixels) drawn from sizes.
+
+        Stars closer than min_distance to the origin are skipped, as the
+        turtle versions did to keep the centre clear. With seed=None the
+        field changes every run and is never cached on disk.
+        """
+        self.operations.append(("stars", count, tuple(x_range), tuple(y_range), tuple(sizes),
+                                color, seed, min_distance))
+
+    def add_circle(self, x, y, radius, color, width=1):
+        """Circle outline, e.g. an orbit path (width in pixels)."""
+        self.operations.append(("circle", x, y, radius, color, width))
+
+    def add_disc(self, x, y, radius, color):
+        self.operations.append(("disc", x, y, radius, color))
+
+    def add_rect(self, x0, y0, x1, y1, color):
+        self.operations.append(("rect", x0, y0, x1, y1, color))
+
+    def cacheable(self):
+        return all(op[0] != "stars" or op[6] is not None for op in self.operations)
+
+    def cache_key(self, renderer, area=None):
+        """Identifies the rendered image: operations, seeds, area and world-to-canvas mapping."""
+        area = tuple(area if area is not None else renderer.bounds)
+        text = repr((self.operations, area, renderer.scale.tolist(), renderer.offset.tolist()))
+        return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+    # --- Rendering ---
+
+    def render(self, renderer, area=None):
+        """Renders every operation into an RGBA array covering `area` (the renderer's view by default)."""
+        x1, y1, x2, y2 = area if area is not None else renderer.bounds
+        image = Raster.blank_image(int(x2 - x1), int(y2 - y1))
+        pixel_scale = abs(renderer.scale[0]) # World units to pixels for radii
+
+        def to_pixels(x, y):
+            cx, cy = renderer.to_canvas(x, y)
+            return cx - x1, cy - y1
+
+        for op in self.operations:
+            kind = op[0]
+            if kind == "stars":
+                _, count, x_range, y_range, sizes, color, seed, min_distance = op
+                rng = np.random.default_rng(seed)
+                xs = rng.uniform(*x_range, count)
+                ys = rng.uniform(*y_range, count)
+                diameters = rng.integers(sizes[0], sizes[1] + 1, count)
+                keep = np.hypot(xs, ys) > min_distance
+                rgba = renderer.rgb(color) + (255,)
+                for (px, py), diameter in zip(np.column_stack(to_pixels(xs[keep], ys[keep])), diameters[keep]):
+                    Raster.fill_circle(image, px, py, diameter / 2, rgba)
+            elif kind == "circle":
+                _, x, y, radius, color, width = op
+                px, py = to_pixels(x, y)
+                Raster.stroke_circle(image, px, py, radius * pixel_scale, renderer.rgb(color) + (255,), width)
+            elif kind == "disc":
+                _, x, y, radius, color = op
+                px, py = to_pixels(x, y)
+                Raster.fill_circle(image, px, py, radius * pixel_scale, renderer.rgb(color) + (255,))
+            elif kind == "rect":
+                _, x0, y0, x1_, y1_, color = op
+                (px0, px1), (py0, py1) = to_pixels(np.array([x0, x1_]), np.array([y0, y1_]))
+                Raster.fill_rect(image, min(px0, px1), min(py0, py1), max(px0, px1), max(py0, py1),
+                                 renderer.rgb(color) + (255,))
+        self.renders += 1
+        return image
+
+    def png(self, renderer, area=None):
+        """PNG data of the layer, loaded from the disk cache when available."""
+        use_disk = self.cache_dir is not None and self.cacheable()
+        if use_disk:
+            path = os.path.join(self.cache_dir, f"{self.cache_key(renderer, area)}.png")
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    return f.read()
+        data = Raster.encode_png(self.render(renderer, area), compress_level=6)
+        if use_disk:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(data)
+        return data
+
+    def show(self, renderer, area=None):
+        """
+        Draws the layer behind everything else, covering `area` (canvas
+        coordinates x1, y1, x2, y2; the renderer's view by default).
+        """
+        self.area = tuple(int(v) for v in (area if area is not None else renderer.bounds))
+        renderer.draw_png(self.key, self.png(renderer, self.area), corner=self.area[:2])
+        renderer.lower_item(self.key)
+
+    def follow_resize(self, renderer, delay=150):
+        """
+        Shows the layer again whenever the canvas is resized to show more than
+        it covers. Resizing sends a stream of <Configure> events, so this
+        waits until none has come for `delay` ms and then renders once.
+        """
+        pending = None
+
+        def refit(canvas):
+            nonlocal pending
+            pending = None
+            # Never smaller than the renderer's view, which may lie partly
+            # outside a window shrunk below it (scrolled out of sight)
+            visible = (canvas.canvasx(0), canvas.canvasy(0),
+                       canvas.canvasx(canvas.winfo_width()), canvas.canvasy(canvas.winfo_height()))
+            x1, y1, x2, y2 = renderer.bounds
+            area = (min(x1, int(visible[0])), min(y1, int(visible[1])),
+                    max(x2, int(np.ceil(visible[2]))), max(y2, int(np.ceil(visible[3]))))
+            if area != self.area:
+                self.show(renderer, area)
+
+        def resized(event):
+            nonlocal pending
+            if pending is not None:
+                event.widget.after_cancel(pending)
+            pending = event.widget.after(delay, refit, event.widget)
+
+        renderer.canvas.bind("<Configure>", resized, add="+")
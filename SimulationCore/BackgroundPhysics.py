@@ -0,0 +1,261 @@
+import multiprocessing
+import threading
+import time
+import traceback
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# --- Double-Buffered Snapshots ---
+# Two copies of a fixed set of arrays in shared memory. The writer (the
+# physics worker) fills the copy nobody is told about, then publishes it as
+# the latest; readers (the UI) copy the latest one out. Each slot has a lock,
+# held while the slot is written and while it is copied out. Taking and
+# releasing a lock orders memory on every CPU, so a reader sees all of the
+# writer's stores to a slot, also on weakly ordered ones such as ARM. The
+# reader never waits: if the slot is locked, the writer has come round to it
+# again, and the read is dropped while the previous snapshot stays on show.
+# The writer waits at most for one copy. The step of a slot is written under
+# its lock, so a reader that sees an old slot index still gets a whole,
+# older snapshot.
+
+class SnapshotBuffer:
+    HEADER = 3 # latest slot, step of slot 0 and 1
+
+    def __init__(self, fields, name=None, locks=None, context=multiprocessing):
+        """
+        fields maps array names to (shape, dtype). Creates the shared block
+        and its slot locks (from `context`), or attaches to the existing
+        block `name` with the creator's `locks` (e.g. in the worker).
+        """
+        self.fields = {key: (tuple(shape), np.dtype(dtype)) for key, (shape, dtype) in fields.items()}
+        slot_size = sum(int(np.prod(shape)) * dtype.itemsize for shape, dtype in self.fields.values())
+        size = self.HEADER * 8 + 2 * slot_size
+        self.owner = name is None
+        self.block = shared_memory.SharedMemory(name=name, create=self.owner, size=max(size, 1))
+        self.name = self.block.name
+        self.locks = locks if locks is not None else (context.Lock(), context.Lock())
+        self.header = np.ndarray(self.HEADER, np.int64, buffer=self.block.buf)
+        if self.owner:
+            self.header[:] = 0
+        self.slots = []
+        offset = self.HEADER * 8
+        for _ in range(2):
+            slot = {}
+            for key, (shape, dtype) in self.fields.items():
+                slot[key] = np.ndarray(shape, dtype, buffer=self.block.buf, offset=offset)
+                offset += slot[key].nbytes
+            self.slots.append(slot)
+
+    def write(self, arrays, step):
+        """Copies arrays into the unpublished slot and publishes it (writer only)."""
+        slot = 1 - int(self.header[0])
+        with self.locks[slot]:
+            for key, target in self.slots[slot].items():
+                target[...] = arrays[key]
+            self.header[1 + slot] = step
+        self.header[0] = slot
+
+    def read(self, out):
+        """
+        Copies the latest snapshot into the arrays of `out` and returns its
+        step, or None without touching `out` if the writer holds that slot.
+        """
+        slot = int(self.header[0])
+        if not self.locks[slot].acquire(block=False):
+            return None
+        try:
+            for key, source in self.slots[slot].items():
+                out[key][...] = source
+            return int(self.header[1 + slot])
+        finally:
+            self.locks[slot].release()
+
+    def latest_step(self):
+        """Step of the latest slot, without its lock: a hint for skipping reads, which read() confirms."""
+        return int(self.header[1 + int(self.header[0])])
+
+    def close(self):
+        self.slots = []
+        self.header = None
+        self.block.close()
+        if self.owner:
+            self.block.unlink()
+
+# --- Command Queue ---
+# A single-producer, single-consumer ring of (code, value) pairs in shared
+# memory. The producer only advances the tail and the consumer only the
+# head, each under a lock shared by both, so the entries are visible before
+# the new tail on every CPU. Both hold it for a few stores only.
+
+class CommandQueue:
+    def __init__(self, capacity=256, name=None, lock=None, context=multiprocessing):
+        self.capacity = capacity
+        self.owner = name is None
+        self.block = shared_memory.SharedMemory(name=name, create=self.owner, size=16 + 16 * capacity)
+        self.name = self.block.name
+        self.lock = lock if lock is not None else context.Lock()
+        self.ends = np.ndarray(2, np.int64, buffer=self.block.buf) # head, tail
+        self.entries = np.ndarray((capacity, 2), np.float64, buffer=self.block.buf, offset=16)
+        if self.owner:
+            self.ends[:] = 0
+
+    def put(self, code, value=0.0):
+        """Appends a command (producer only); False when the queue is full."""
+        with self.lock:
+            tail = int(self.ends[1])
+            if tail - int(self.ends[0]) >= self.capacity:
+                return False
+            self.entries[tail % self.capacity] = (code, value)
+            self.ends[1] = tail + 1
+        return True
+
+    def drain(self):
+        """Removes and returns all waiting commands as (code, value) pairs (consumer only)."""
+        with self.lock:
+            head, tail = int(self.ends[0]), int(self.ends[1])
+            commands = [(int(self.entries[k % self.capacity, 0]), float(self.entries[k % self.capacity, 1]))
+                        for k in range(head, tail)]
+            self.ends[0] = tail
+        return commands
+
+    def close(self):
+        self.ends = None
+        self.entries = None
+        self.block.close()
+        if self.owner:
+            self.block.unlink()
+
+# --- Physics Worker ---
+# Runs a physics engine outside the Tk event loop. An engine is any
+# picklable object with
+#   PARAMETERS        names of the values the UI may change
+#   step()            advances the physics by one step
+#   set_parameter(name, value)
+#   snapshot()        dict of arrays to publish, with fixed shapes
+# The worker drains the command queue, steps the engine and publishes a
+# snapshot after every step, at most steps_per_second times a second
+# (None: as fast as it can). The UI calls latest() from its timer to get
+# the newest complete snapshot and post() to change parameters; neither
+# ever blocks, so the physics and the drawing run at their own rates.
+#
+# A process uses a second core. thread=True runs the worker as a thread of
+# the UI process instead, which only runs in parallel while the engine is
+# inside NumPy code that releases the GIL.
+
+STOP, PAUSE, RESUME = -1, -2, -3
+
+
+def _run_engine(engine, fields, buffer_name, slot_locks, queue_name, queue_lock, steps_per_second, failed):
+    snapshots = SnapshotBuffer(fields, name=buffer_name, locks=slot_locks)
+    commands = CommandQueue(name=queue_name, lock=queue_lock)
+    try:
+        step = 0
+        paused = False
+        interval = 0.0 if steps_per_second is None else 1.0 / steps_per_second
+        next_time = time.perf_counter()
+        while True:
+            for code, value in commands.drain():
+                if code == STOP:
+                    return
+                if code == PAUSE:
+                    paused = True
+                elif code == RESUME:
+                    paused = False
+                    next_time = time.perf_counter()
+                else:
+                    engine.set_parameter(engine.PARAMETERS[code], value)
+            if paused:
+                time.sleep(0.005)
+                continue
+            engine.step()
+            step += 1
+            snapshots.write(engine.snapshot(), step)
+            # Keep the pace without drifting; never try to catch up more than a step
+            next_time = max(next_time + interval, time.perf_counter() - interval)
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+    except BaseException:
+        traceback.print_exc()
+        failed.value = 1
+    finally:
+        snapshots.close()
+        commands.close()
+
+
+class PhysicsWorker:
+    def __init__(self, engine, steps_per_second=None, thread=False, paused=False, capacity=256):
+        """Publishes the engine's snapshots from a worker process (or thread) until close()."""
+        self.parameters = tuple(engine.PARAMETERS)
+        first = engine.snapshot()
+        fields = {key: (np.shape(array), np.asarray(array).dtype) for key, array in first.items()}
+        if thread:
+            context = multiprocessing
+        else:
+            # Forked workers inherit the engine; elsewhere it is pickled to them
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+        self.snapshots = SnapshotBuffer(fields, context=context)
+        self.snapshots.write(first, 0)
+        self.commands = CommandQueue(capacity, context=context)
+        if paused:
+            self.pause() # Queued before the worker takes its first step
+        # `frame` holds the last whole snapshot; reads go into `spare` and
+        # the two are swapped once a read brings a newer one
+        self.frame = {key: np.empty(shape, dtype) for key, (shape, dtype) in self.snapshots.fields.items()}
+        self.spare = {key: np.empty(shape, dtype) for key, (shape, dtype) in self.snapshots.fields.items()}
+        self.step = 0 # Step of the snapshot in `frame`
+        self.closed = False
+
+        self.failed = context.Value("i", 0, lock=False)
+        args = (engine, fields, self.snapshots.name, self.snapshots.locks, self.commands.name, self.commands.lock,
+                steps_per_second, self.failed)
+        if thread:
+            self.worker = threading.Thread(target=_run_engine, args=args, daemon=True)
+        else:
+            self.worker = context.Process(target=_run_engine, args=args, daemon=True)
+        self.worker.start()
+
+    def post(self, name, value):
+        """Asks the worker to change a parameter; False if the queue is full."""
+        return self.commands.put(self.parameters.index(name), value)
+
+    def pause(self):
+        self.commands.put(PAUSE)
+
+    def resume(self):
+        self.commands.put(RESUME)
+
+    def latest(self):
+        """
+        The newest complete snapshot as a dict of arrays, or None if there is
+        nothing newer than the last call. The returned arrays stay unchanged
+        until the next call that returns a newer snapshot; two buffers take
+        turns, so they are never copied into while shown.
+        """
+        if self.failed.value:
+            raise RuntimeError("The physics worker failed; see its traceback above")
+        if self.snapshots.latest_step() <= self.step:
+            return None
+        step = self.snapshots.read(self.spare)
+        if step is None or step <= self.step:
+            return None # The writer holds the slot; the next call gets a newer one
+        self.frame, self.spare = self.spare, self.frame
+        self.step = step
+        return self.frame
+
+    def close(self):
+        """Stops the worker and frees the shared memory."""
+        if self.closed:
+            return
+        self.closed = True
+        while not self.commands.put(STOP):
+            if not self.worker.is_alive():
+                break
+            time.sleep(0.001)
+        self.worker.join(timeout=5)
+        if self.worker.is_alive() and hasattr(self.worker, "terminate"):
+            self.worker.terminate()
+        self.snapshots.close()
+        self.commands.close()
@@ -0,0 +1,234 @@
+import tkinter as tk
+
+import numpy as np
+
+from SimulationCore import Raster
+
+# --- Canvas Renderer ---
+# A retained-mode replacement for turtle drawing. Every body and shape is
+# created once as a Tk canvas item and afterwards only has its
+# coordinates updated, instead of being redrawn by a turtle each frame.
+# Large groups of small bodies are drawn into one image (draw_points).
+#
+# World coordinates map to canvas coordinates with
+#   canvas_x = offset_x + x * scale_x,  canvas_y = offset_y + y * scale_y
+# For a turtle screen that is (x * xscale, -y * yscale), so scripts can keep
+# their turtle.Screen, world coordinates, timers and key bindings.
+#
+# Items are addressed by any hashable key. Shapes added under the same key
+# form a group that is moved, hidden or removed together.
+class CanvasRenderer:
+    def __init__(self, canvas, scale=(1.0, 1.0), offset=(0.0, 0.0), bounds=None):
+        self.canvas = canvas
+        self.scale = np.asarray(scale, dtype=float)
+        self.offset = np.asarray(offset, dtype=float)
+        self.bounds = bounds # Visible area in canvas coordinates (x1, y1, x2, y2)
+        self.bodies = {}     # key -> (item, radius in pixels)
+        self.tags = {}       # key -> canvas tag of a shape group
+        self.images = {}     # key -> (item, PhotoImage) of raster layers
+        self.sources = {}    # key -> unscaled PhotoImage of a zoomed raster layer
+        self.sprites = {}    # name -> PhotoImage shared by all sprites of that name
+        self.rgb_cache = {}
+
+    @classmethod
+    def for_turtle_screen(cls, screen):
+        """Renderer that draws in the world coordinates of a turtle screen."""
+        canvas = screen.getcanvas()
+        # The window is centred on the scroll region and may be larger than it
+        x1, y1, x2, y2 = (float(v) for v in str(canvas.cget("scrollregion")).split())
+        half_width = max(x2 - x1, screen.window_width()) / 2
+        half_height = max(y2 - y1, screen.window_height()) / 2
+        cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+        bounds = (round(cx - half_width), round(cy - half_height),
+                  round(cx + half_width), round(cy + half_height))
+        return cls(canvas, scale=(screen.xscale, -screen.yscale), bounds=bounds)
+
+    def to_canvas(self, x, y):
+        """Converts world coordinates (scalars or arrays) to canvas coordinates."""
+        return (self.offset[0] + np.asarray(x) * self.scale[0],
+                self.offset[1] + np.asarray(y) * self.scale[1])
+
+    def to_world(self, cx, cy):
+        """Converts canvas coordinates (scalars or arrays) back to world coordinates."""
+        return ((np.asarray(cx) - self.offset[0]) / self.scale[0],
+                (np.asarray(cy) - self.offset[1]) / self.scale[1])
+
+    def tag(self, key):
+        """Canvas tag shared by all items drawn under a key."""
+        if key not in self.tags:
+            self.tags[key] = f"group{len(self.tags)}"
+        return self.tags[key]
+
+    def rgb(self, color):
+        """(r, g, b) of a Tk colour, cached per colour string."""
+        if color not in self.rgb_cache:
+            self.rgb_cache[color] = Raster.color_to_rgb(color, self.canvas)
+        return self.rgb_cache[color]
+
+    # --- Bodies ---
+    # Discs with a fixed size in pixels (like turtle shapes), moved by centre.
+
+    def add_body(self, key, radius, color, x=0.0, y=0.0, outline=""):
+        cx, cy = self.to_canvas(x, y)
+        item = self.canvas.create_oval(cx - radius, cy - radius, cx + radius, cy + radius,
+                                       fill=color, outline=outline)
+        self.bodies[key] = (item, radius)
+        return item
+
+    def move_body(self, key, x, y):
+        item, radius = self.bodies[key]
+        cx, cy = self.to_canvas(x, y)
+        self.canvas.coords(item, cx - radius, cy - radius, cx + radius, cy + radius)
+
+    def move_bodies(self, keys, xs, ys):
+        """Moves many bodies, converting all coordinates in one vectorized step."""
+        cxs, cys = self.to_canvas(xs, ys)
+        coords = self.canvas.coords
+        for key, cx, cy in zip(keys, cxs.tolist(), cys.tolist()):
+            item, radius = self.bodies[key]
+            coords(item, cx - radius, cy - radius, cx + radius, cy + radius)
+
+    def set_color(self, key, color):
+        """Changes the fill colour of a body or shape group."""
+        target = self.bodies[key][0] if key in self.bodies else self.tag(key)
+        self.canvas.itemconfigure(target, fill=color)
+
+    # --- Shapes ---
+    # Filled shapes in world units, grouped by key.
+
+    def fill_circle(self, x, y, radius, color, key=None, outline="", width=1):
+        x0, y0 = self.to_canvas(x - radius, y - radius)
+        x1, y1 = self.to_canvas(x + radius, y + radius)
+        return self.canvas.create_oval(float(x0), float(y0), float(x1), float(y1), fill=color,
+                                       outline=outline, width=width,
+                                       tags=self.tag(key) if key is not None else ())
+
+    def draw_circle(self, x, y, radius, color, width=1, key=None):
+        """Circle outline in world units (e.g. an orbit)."""
+        return self.fill_circle(x, y, radius, "", key=key, outline=color, width=width)
+
+    def fill_polygon(self, points, color, key=None, outline=""):
+        points = np.asarray(points, dtype=float)
+        cx, cy = self.to_canvas(points[:, 0], points[:, 1])
+        flat = np.column_stack((cx, cy)).ravel().tolist()
+        return self.canvas.create_polygon(*flat, fill=color, outline=outline,
+                                          tags=self.tag(key) if key is not None else ())
+
+    def move(self, key, dx, dy):
+        """Moves a shape group by a world-space offset."""
+        self.canvas.move(self.tag(key), dx * self.scale[0], dy * self.scale[1])
+
+    def set_visible(self, key, visible):
+        target = self.bodies[key][0] if key in self.bodies else self.tag(key)
+        self.canvas.itemconfigure(target, state="normal" if visible else "hidden")
+
+    # --- Sprites ---
+
+    def add_sprite(self, key, name, pixels, x, y, anchor="center", shift=(0, 0)):
+        """
+        Places a shared image at a world position, grouped under key.
+
+        The pixels are encoded once per name and the PhotoImage is shared by
+        every sprite of that name. shift moves the image by whole pixels
+        relative to the anchor point. Sprites are moved with move().
+        """
+        if name not in self.sprites:
+            self.sprites[name] = tk.PhotoImage(master=self.canvas, data=Raster.encode_png(pixels), format="png")
+        cx, cy = self.to_canvas(x, y)
+        return self.canvas.create_image(float(cx) + shift[0], float(cy) + shift[1], image=self.sprites[name],
+                                        anchor=anchor, tags=self.tag(key))
+
+    # --- Raster Layers ---
+
+    def draw_points(self, key, xs, ys, colors, size=1):
+        """
+        Draws many small bodies into one transparent image covering the view.
+
+        colors is one colour string, or an (N, 3) uint8 array of RGB values.
+        size is one pixel size or an array with a size per point. The image
+        is re-encoded every call, so this pays off once there are more
+        points than the canvas handles comfortably as separate items.
+        """
+        x1, y1, x2, y2 = self.bounds
+        image = Raster.blank_image(int(x2 - x1), int(y2 - y1))
+        cx, cy = self.to_canvas(xs, ys)
+        px, py = np.floor(cx - x1), np.floor(cy - y1)
+        if isinstance(colors, str):
+            colors = np.tile(self.rgb(colors) + (255,), (len(px), 1))
+        else:
+            colors = np.column_stack((colors, np.full(len(colors), 255, dtype=np.uint8)))
+        sizes = np.broadcast_to(size, px.shape)
+        for value in np.unique(sizes):
+            group = sizes == value
+            Raster.stamp_points(image, px[group], py[group], colors[group], int(value))
+        self.draw_image(key, image)
+
+    def draw_image(self, key, pixels, zoom=(1, 1)):
+        """
+        Shows an RGB(A) pixel array whose top-left corner is the top-left of
+        the view. With zoom=(zx, zy) every pixel covers a zx x zy block of the
+        view: only the small array is PNG-encoded, and Tk scales it up.
+        """
+        zx, zy = zoom
+        if (zx, zy) == (1, 1):
+            self.draw_png(key, Raster.encode_png(pixels))
+            return
+        data = Raster.encode_png(pixels)
+        if key in self.sources:
+            self.sources[key].configure(data=data, format="png")
+            photo = self.images[key][1]
+        else:
+            self.sources[key] = tk.PhotoImage(master=self.canvas, data=data, format="png")
+            photo = tk.PhotoImage(master=self.canvas)
+            item = self.canvas.create_image(self.bounds[0], self.bounds[1], image=photo, anchor="nw")
+            self.images[key] = (item, photo)
+        # Replace (not blend over) the shown pixels with the scaled-up ones
+        rows, columns = pixels.shape[:2]
+        photo.tk.call(str(photo), "copy", str(self.sources[key]), "-from", 0, 0, columns, rows,
+                      "-zoom", zx, zy, "-compositingrule", "set", "-shrink")
+
+    def draw_png(self, key, data, corner=None):
+        """
+        Shows PNG data covering the view, replacing the image under the same
+        key; corner (canvas coordinates) places its top-left elsewhere.
+        """
+        x, y = corner if corner is not None else self.bounds[:2]
+        if key in self.images:
+            item, photo = self.images[key]
+            photo.configure(data=data, format="png")
+            self.canvas.coords(item, x, y)
+            return
+        photo = tk.PhotoImage(master=self.canvas, data=data, format="png")
+        item = self.canvas.create_image(x, y, image=photo, anchor="nw")
+        self.images[key] = (item, photo) # Keep a reference so Tk does not free the image
+
+    # --- Housekeeping ---
+
+    def raise_item(self, key):
+        """Brings an item or group to the front."""
+        for table in (self.bodies, self.images):
+            if key in table:
+                self.canvas.tag_raise(table[key][0])
+                return
+        self.canvas.tag_raise(self.tag(key))
+
+    def lower_item(self, key):
+        """Sends an item or group to the back, e.g. a background layer."""
+        for table in (self.bodies, self.images):
+            if key in table:
+                self.canvas.tag_lower(table[key][0])
+                return
+        self.canvas.tag_lower(self.tag(key))
+
+    def remove(self, key):
+        """Deletes everything drawn under a key."""
+        for table in (self.bodies, self.images):
+            if key in table:
+                self.canvas.delete(table.pop(key)[0])
+        self.sources.pop(key, None)
+        if key in self.tags:
+            self.canvas.delete(self.tags[key])
+
+    def flush(self):
+        """Pushes pending drawing to the screen (turtle's tracer(0) + update())."""
+        self.canvas.update_idletasks()
@@ -0,0 +1,139 @@
+import json
+import mmap
+import os
+import random
+import struct
+import time
+
+import numpy as np
+
+# --- File Format ---
+# One file per checkpoint, little-endian:
+#   "PSCK", format version u16, reserved u16, header size u32
+#   header: UTF-8 JSON {"kind", "created", "values", "arrays"}
+#   array data, every array starting at a multiple of ALIGNMENT bytes
+#
+# A state is a nested dict whose leaves are NumPy arrays or JSON values
+# (numbers, strings, None, lists). The arrays are stored raw, so loading
+# maps the file and hands out read-only views without reading or copying
+# them; the JSON values keep floats exactly (they are written with repr).
+# "arrays" maps the path of every array ("md/positions") to its dtype,
+# shape and offset in the file.
+#
+# A checkpoint is written to a temporary file next to the target and moved
+# over it, so a job killed while saving still has its previous checkpoint.
+
+FORMAT_VERSION = 1
+MAGIC = b"PSCK"
+PREAMBLE = struct.Struct("<4sHHI")
+ALIGNMENT = 64
+
+
+def _split(state, prefix=""):
+    """Separates a nested state into JSON values and a flat path -> array dict."""
+    values, arrays = {}, {}
+    for key, value in state.items():
+        if "/" in key:
+            raise ValueError(f"State keys may not contain '/': {key!r}")
+        if isinstance(value, dict):
+            values[key], nested = _split(value, prefix + key + "/")
+            arrays.update(nested)
+        elif isinstance(value, np.ndarray):
+            arrays[prefix + key] = value
+        else:
+            values[key] = value
+    return values, arrays
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot store {type(value).__name__} in a checkpoint")
+
+
+def save_checkpoint(path, kind, state):
+    """Writes a state (nested dict of arrays and JSON values) to `path`, labelled with `kind`."""
+    values, arrays = _split(state)
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = {"dtype": array.dtype.newbyteorder("<").str, "shape": list(array.shape), "offset": offset}
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+    header = {"kind": kind, "created": time.time(), "values": values, "arrays": layout}
+    encoded = json.dumps(header, default=_json_default).encode()
+    start = -(-(PREAMBLE.size + len(encoded)) // ALIGNMENT) * ALIGNMENT # Data offsets are relative to here
+    encoded = encoded.ljust(start - PREAMBLE.size)
+
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, 0, len(encoded)))
+        f.write(encoded)
+        for name, array in arrays.items():
+            data = np.ascontiguousarray(array, dtype=layout[name]["dtype"]).tobytes()
+            f.write(data)
+            f.write(bytes(-len(data) % ALIGNMENT))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+
+class Checkpoint:
+    def __init__(self, path, kind=None):
+        """
+        Maps the checkpoint at `path`. Raises ValueError if it is not a
+        checkpoint of this format version, or (with `kind`) of another kind.
+        """
+        with open(path, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.buffer) < PREAMBLE.size:
+            raise ValueError(f"{path} is not a checkpoint")
+        magic, version, _, size = PREAMBLE.unpack_from(self.buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a checkpoint")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path} has checkpoint format {version}; this version reads {FORMAT_VERSION}")
+        header = json.loads(bytes(self.buffer[PREAMBLE.size:PREAMBLE.size + size]))
+        self.kind = header["kind"]
+        if kind is not None and self.kind != kind:
+            raise ValueError(f"{path} holds a {self.kind!r} checkpoint, not {kind!r}")
+        self.created = header["created"]
+        start = PREAMBLE.size + size
+        self.arrays = {}
+        for name, entry in header["arrays"].items():
+            dtype = np.dtype(entry["dtype"])
+            count = int(np.prod(entry["shape"], dtype=np.int64))
+            self.arrays[name] = np.frombuffer(self.buffer, dtype, count, start + entry["offset"]).reshape(entry["shape"])
+        self.state = header["values"]
+        for name, array in self.arrays.items():
+            *parents, key = name.split("/")
+            node = self.state
+            for parent in parents:
+                node = node.setdefault(parent, {})
+            node[key] = array
+
+
+def load_checkpoint(path, kind=None):
+    """
+    The state saved at `path`. Arrays are read-only views of the mapped file;
+    the restore_state() methods copy what they keep.
+    """
+    return Checkpoint(path, kind).state
+
+# --- Random Number Generators ---
+# Simulations draw from their own generator instead of the global `random`
+# module, so a checkpoint can carry the generator's exact position.
+
+def random_state(rng):
+    """JSON-ready state of a random.Random or a NumPy Generator."""
+    if isinstance(rng, random.Random):
+        version, internal, gauss_next = rng.getstate()
+        return {"type": "random", "version": version, "internal": list(internal), "gauss_next": gauss_next}
+    return {"type": "numpy", "state": rng.bit_generator.state}
+
+
+def restore_random(rng, state):
+    """Puts a generator back to a state from random_state()."""
+    if state["type"] == "random":
+        rng.setstate((state["version"], tuple(state["internal"]), state["gauss_next"]))
+    else:
+        rng.bit_generator.state = state["state"]
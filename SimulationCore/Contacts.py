@@ -0,0 +1,95 @@
+import numpy as np
+
+from SimulationCore.Neighbours import minimum_image
+
+# --- Batched Elastic Contacts ---
+# The narrow phase for circles: the candidate pairs (e.g. from a
+# NeighbourList) are tested and resolved in NumPy instead of one pair at a
+# time in Python.
+#
+# Ordering rule: a particle touching several others exchanges momentum with
+# them one contact at a time, each contact seeing the velocities left by
+# the previous one, so every contact conserves momentum and energy exactly.
+# The contacts are split into rounds with no particle in common; a round is
+# resolved at once. Each round is a maximal set of such contacts, chosen
+# greedily by a fixed pseudo-random priority of the particle pair (a hash
+# of both indices). The rounds therefore depend only on which particles
+# touch, not on the order of the candidate list, so results are
+# deterministic; a packing needs at most about twice as many rounds as the
+# largest number of contacts of one particle.
+
+def pair_priority(first, second):
+    """Deterministic pseudo-random rank of every pair (a multiplicative hash, ties by position)."""
+    a = first.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+    b = second.astype(np.uint64) * np.uint64(0xC2B2AE3D27D4EB4F)
+    keys = (a ^ (b >> np.uint64(7))) * np.uint64(0x165667B19E3779F9)
+    rank = np.empty(len(first), dtype=np.intp)
+    rank[np.lexsort((np.arange(len(first)), keys))] = np.arange(len(first))
+    return rank
+
+
+def contact_rounds(first, second):
+    """Splits contacts (pairs of particle indices) into rounds of disjoint pairs."""
+    rank = pair_priority(first, second)
+    count = int(max(first.max(), second.max())) + 1 if len(first) else 0
+    remaining = np.arange(len(first))
+    rounds = []
+    while len(remaining):
+        # Maximal matching: repeatedly take every contact that outranks all
+        # undecided contacts of both its particles, and drop their neighbours
+        undecided = remaining
+        used = np.zeros(count, dtype=bool)
+        chosen = []
+        while len(undecided):
+            i, j, r = first[undecided], second[undecided], rank[undecided]
+            best = np.full(count, len(first), dtype=np.intp)
+            np.minimum.at(best, i, r)
+            np.minimum.at(best, j, r)
+            picked = (best[i] == r) & (best[j] == r)
+            chosen.append(undecided[picked])
+            used[i[picked]] = True
+            used[j[picked]] = True
+            undecided = undecided[~(used[i] | used[j])]
+        batch = np.sort(np.concatenate(chosen))
+        rounds.append(batch)
+        remaining = np.setdiff1d(remaining, batch, assume_unique=True)
+    return rounds
+
+
+def resolve_contacts(positions, velocities, radii, masses, first, second, on_round=None, box=None):
+    """
+    Elastic collisions of every touching candidate pair; updates velocities in place.
+
+    Only the velocity components along the line of centres are exchanged,
+    and only while the pair approaches (v₂·n > v₁·n):
+      Δv₁ = 2m₂(v₂·n - v₁·n) / (m₁ + m₂) n,   Δv₂ = -m₁/m₂ Δv₁
+    on_round(i, j, before, after) is called for every round with the
+    particles' velocities (shape (pairs, 2)) before and after it. Returns
+    the indices of the particles whose velocity changed. With a periodic
+    box (width, height) contacts are found through the minimum image.
+    """
+    positions = np.asarray(positions, dtype=float)
+    radii = np.asarray(radii, dtype=float)
+    masses = np.asarray(masses, dtype=float)
+    first = np.asarray(first, dtype=np.intp)
+    second = np.asarray(second, dtype=np.intp)
+
+    delta = minimum_image(positions[first] - positions[second], box)
+    distance = np.hypot(delta[:, 0], delta[:, 1])
+    touching = (distance <= radii[first] + radii[second]) & (distance > 0.0) # Coincident centres have no normal
+    first, second = first[touching], second[touching]
+    normals = delta[touching] / distance[touching, None]
+
+    for batch in contact_rounds(first, second):
+        i, j, n = first[batch], second[batch], normals[batch]
+        m1, m2 = masses[i], masses[j]
+        before_i, before_j = velocities[i], velocities[j]
+        # v₂·n - v₁·n; pairs already separating (e.g. still overlapping after
+        # the last bounce) are left alone instead of being pulled back together
+        closing = np.maximum(np.einsum("ij,ij->i", before_j - before_i, n), 0.0)
+        change = (2.0 * closing / (m1 + m2))[:, None] * n
+        # One scatter for both sides of every contact
+        np.add.at(velocities, np.concatenate((i, j)), np.concatenate((m2[:, None] * change, -m1[:, None] * change)))
+        if on_round is not None:
+            on_round(i, j, (before_i, before_j), (velocities[i], velocities[j]))
+    return np.unique(np.concatenate((first, second)))
@@ -0,0 +1,201 @@
+import csv
+
+import numpy as np
+
+G = 6.67430e-11  # Gravitational constant (m^3 kg^-1 s^-2)
+
+# --- Conserved Quantities ---
+
+def gravitational_potential(masses, positions, g=G):
+    """
+    Total Newtonian potential energy of a set of point masses.
+
+    This is the only pairwise (O(N^2)) quantity; engines that already know
+    their potential energy should pass it to record() directly.
+    """
+    masses = np.asarray(masses, dtype=float)
+    positions = np.asarray(positions, dtype=float)
+    i, j = np.triu_indices(len(masses), k=1)
+    distances = np.linalg.norm(positions[i] - positions[j], axis=1)
+    return -g * np.sum(masses[i] * masses[j] / distances)
+
+
+def conserved_totals(masses, positions, velocities):
+    """Returns kinetic energy, linear momentum (px, py) and angular momentum in O(N)."""
+    masses = np.asarray(masses, dtype=float)
+    positions = np.asarray(positions, dtype=float)
+    velocities = np.asarray(velocities, dtype=float)
+    kinetic = 0.5 * np.sum(masses * np.sum(velocities**2, axis=1))
+    momentum = masses @ velocities
+    # L_z = sum of m * (x * vy - y * vx) about the origin
+    angular = np.sum(masses * (positions[:, 0] * velocities[:, 1] - positions[:, 1] * velocities[:, 0]))
+    return kinetic, momentum[0], momentum[1], angular
+
+# --- Conservation Monitor ---
+# Samples the conserved quantities every `sample_every` steps into a fixed
+# size ring buffer and flags relative drift against the first sample.
+class ConservationMonitor:
+    FIELDS = ("step", "time", "kinetic", "potential", "energy", "px", "py", "angular")
+
+    def __init__(self, sample_every=10, capacity=4096, energy_tolerance=1e-3,
+                 momentum_tolerance=1e-6, angular_tolerance=1e-6, on_alert=None):
+        """Tolerances are relative drifts; pass None to skip a quantity (e.g. momentum with walls)."""
+        self.sample_every = max(1, int(sample_every))
+        self.capacity = capacity
+        self.tolerances = {
+            "energy": energy_tolerance,
+            "momentum": momentum_tolerance,
+            "angular": angular_tolerance,
+        }
+        self.on_alert = on_alert
+        self.reset()
+
+    def reset(self):
+        """Forgets all samples, alerts and the reference state."""
+        self.buffer = np.zeros((self.capacity, len(self.FIELDS)))
+        self.count = 0
+        self.reference = None
+        self.scales = None
+        self.alerts = []
+        self.flagged = set()
+        # Per-exchange audit, e.g. for every resolved collision
+        self.exchanges = 0
+        self.max_exchange_momentum_error = 0.0
+        self.max_exchange_energy_error = 0.0
+
+    def due(self, step):
+        """True when `step` should be sampled."""
+        return step % self.sample_every == 0
+
+    def record(self, step, time, masses, positions, velocities, potential=0.0):
+        """Samples the system if `step` is due. Returns the sample row or None."""
+        if not self.due(step):
+            return None
+
+        kinetic, px, py, angular = conserved_totals(masses, positions, velocities)
+        row = (step, time, kinetic, potential, kinetic + potential, px, py, angular)
+        self.buffer[self.count % self.capacity] = row
+        self.count += 1
+
+        if self.reference is None:
+            self._set_reference(row, masses, positions, velocities)
+        else:
+            self._check_drift(row)
+        return row
+
+    def _set_reference(self, row, masses, positions, velocities):
+        """Stores the first sample and the scales used to normalise drift."""
+        masses = np.asarray(masses, dtype=float)
+        speeds = np.linalg.norm(np.asarray(velocities, dtype=float), axis=1)
+        radii = np.linalg.norm(np.asarray(positions, dtype=float), axis=1)
+        self.reference = row
+        # Scale momentum drift by the total |m v| so a system at rest does not divide by zero
+        self.scales = {
+            "energy": max(abs(row[4]), abs(row[2]), 1e-300),
+            "momentum": max(np.sum(masses * speeds), 1e-300),
+            "angular": max(np.sum(masses * radii * speeds), 1e-300),
+        }
+
+    def drift(self, row=None):
+        """Relative drift of energy, momentum and angular momentum for a sample."""
+        if self.reference is None:
+            return {"energy": 0.0, "momentum": 0.0, "angular": 0.0}
+        if row is None:
+            row = self.buffer[(self.count - 1) % self.capacity]
+        ref = self.reference
+        return {
+            "energy": abs(row[4] - ref[4]) / self.scales["energy"],
+            "momentum": np.hypot(row[5] - ref[5], row[6] - ref[6]) / self.scales["momentum"],
+            "angular": abs(row[7] - ref[7]) / self.scales["angular"],
+        }
+
+    def _check_drift(self, row):
+        """Raises an alert the first time a quantity drifts past its tolerance."""
+        for quantity, value in self.drift(row).items():
+            tolerance = self.tolerances[quantity]
+            if tolerance is None or value <= tolerance or quantity in self.flagged:
+                continue
+            self.flagged.add(quantity)
+            alert = {"step": int(row[0]), "time": row[1], "quantity": quantity,
+                     "drift": value, "tolerance": tolerance}
+            self.alerts.append(alert)
+            if self.on_alert is not None:
+                self.on_alert(alert)
+
+    def record_exchange(self, masses, before, after):
+        """
+        Audits one momentum exchange (e.g. a collision) in O(1).
+
+        before and after are (n, 2) velocity arrays of the bodies involved.
+        """
+        masses = np.asarray(masses, dtype=float)
+        before = np.asarray(before, dtype=float)
+        after = np.asarray(after, dtype=float)
+        p_before = masses @ before
+        p_after = masses @ after
+        e_before = 0.5 * np.sum(masses * np.sum(before**2, axis=1))
+        e_after = 0.5 * np.sum(masses * np.sum(after**2, axis=1))
+        p_scale = max(np.sum(masses * np.linalg.norm(before, axis=1)), 1e-300)
+        self.exchanges += 1
+        self.max_exchange_momentum_error = max(self.max_exchange_momentum_error,
+                                               np.hypot(*(p_after - p_before)) / p_scale)
+        self.max_exchange_energy_error = max(self.max_exchange_energy_error,
+                                             abs(e_after - e_before) / max(e_before, 1e-300))
+
+    def record_exchanges(self, masses, before, after):
+        """
+        Audits many two-body exchanges at once, like record_exchange per pair.
+
+        masses has shape (pairs, 2); before and after have shape (pairs, 2, 2):
+        both bodies' velocities of every pair.
+        """
+        masses = np.asarray(masses, dtype=float)
+        before = np.asarray(before, dtype=float)
+        after = np.asarray(after, dtype=float)
+        if len(masses) == 0:
+            return
+        p_before = np.einsum("pb,pbd->pd", masses, before)
+        p_after = np.einsum("pb,pbd->pd", masses, after)
+        e_before = 0.5 * np.sum(masses * np.sum(before**2, axis=2), axis=1)
+        e_after = 0.5 * np.sum(masses * np.sum(after**2, axis=2), axis=1)
+        p_scale = np.maximum(np.sum(masses * np.linalg.norm(before, axis=2), axis=1), 1e-300)
+        self.exchanges += len(masses)
+        self.max_exchange_momentum_error = max(self.max_exchange_momentum_error,
+                                               np.max(np.linalg.norm(p_after - p_before, axis=1) / p_scale))
+        self.max_exchange_energy_error = max(self.max_exchange_energy_error,
+                                             np.max(np.abs(e_after - e_before) / np.maximum(e_before, 1e-300)))
+
+    def samples(self):
+        """Returns the buffered samples, oldest first."""
+        if self.count <= self.capacity:
+            return self.buffer[:self.count].copy()
+        start = self.count % self.capacity
+        return np.concatenate((self.buffer[start:], self.buffer[:start]))
+
+    def export_csv(self, path):
+        """Writes the buffered samples to a CSV file."""
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(self.FIELDS)
+            writer.writerows(self.samples().tolist())
+
+    def export_npz(self, path):
+        """Writes the buffered samples and alerts to a compressed NumPy archive."""
+        alerts = np.array([(a["step"], a["drift"], a["tolerance"]) for a in self.alerts]).reshape(-1, 3)
+        np.savez_compressed(path, fields=np.array(self.FIELDS), samples=self.samples(), alerts=alerts)
+
+    def summary(self):
+        """One-line report of the latest drift values."""
+        drift = self.drift()
+        text = (f"samples={self.count} energy drift={drift['energy']:.3e} "
+                f"momentum drift={drift['momentum']:.3e} angular drift={drift['angular']:.3e}")
+        if self.exchanges:
+            text += (f" | exchanges={self.exchanges} max dp={self.max_exchange_momentum_error:.3e}"
+                     f" max dE={self.max_exchange_energy_error:.3e}")
+        return text
+
+
+def print_alert(alert):
+    """Default alert handler used by the simulation scripts."""
+    print(f"[diagnostics] step {alert['step']}: {alert['quantity']} drift "
+          f"{alert['drift']:.3e} exceeds {alert['tolerance']:.1e}")
@@ -0,0 +1,131 @@
+import os
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+# --- Chebyshev Helpers ---
+
+def chebyshev_nodes(degree):
+    """Returns the degree + 1 Chebyshev nodes on the interval [-1, 1]."""
+    k = np.arange(degree + 1)
+    return np.cos(np.pi * (k + 0.5) / (degree + 1))
+
+
+def fit_chebyshev(samples, degree):
+    """
+    Fits Chebyshev coefficients to samples taken at chebyshev_nodes(degree).
+
+    samples has shape (degree + 1, ...) and the returned coefficients have the
+    same shape, so every body and coordinate is fitted in one operation.
+    """
+    n = degree + 1
+    k = np.arange(n)
+    # T_j(x_k) = cos(j * pi * (k + 0.5) / n) at the Chebyshev nodes
+    basis = np.cos(np.pi * np.outer(np.arange(n), k + 0.5) / n)
+    coeffs = (2.0 / n) * np.tensordot(basis, samples, axes=(1, 0))
+    coeffs[0] *= 0.5
+    return coeffs
+
+
+def evaluate_chebyshev(coeffs, x):
+    """
+    Evaluates a Chebyshev series with Clenshaw's recurrence.
+
+    coeffs has shape (degree + 1, ...) and x is a scalar or an array that
+    broadcasts against coeffs[0].
+    """
+    b1 = np.zeros_like(coeffs[0])
+    b2 = np.zeros_like(coeffs[0])
+    for c in coeffs[:0:-1]:
+        b1, b2 = 2.0 * x * b1 - b2 + c, b1
+    return x * b1 - b2 + coeffs[0]
+
+
+def parameter_key(*values):
+    """Builds a short, stable cache key from model parameters."""
+    digest = hashlib.sha1()
+    for value in values:
+        digest.update(np.ascontiguousarray(value, dtype=np.float64).tobytes())
+    return digest.hexdigest()[:16]
+
+# --- Ephemeris Cache ---
+# Positions are stored as piecewise Chebyshev polynomials over fixed time
+# segments, in the spirit of a JPL SPK kernel. Each segment holds the
+# coefficients for every body, so a lookup evaluates all bodies at once.
+class EphemerisCache:
+    def __init__(self, position_func, segment_length, degree=12, max_segments=64,
+                 cache_dir=None, key=None):
+        """
+        position_func(times) must return an array of shape (len(times), bodies, dim).
+        Segments cover [index * segment_length, (index + 1) * segment_length).
+        """
+        self.position_func = position_func
+        self.segment_length = float(segment_length)
+        self.degree = degree
+        self.max_segments = max_segments
+        self.cache_dir = cache_dir
+        self.key = key
+        self.segments = OrderedDict() # LRU order: oldest first
+        self.nodes = chebyshev_nodes(degree)
+        self.fits = 0 # Number of segments fitted (useful for profiling)
+
+    def clear(self, key=None):
+        """Drops every in-memory segment, e.g. after the model parameters change."""
+        self.segments.clear()
+        if key is not None:
+            self.key = key
+
+    def _segment_path(self, index):
+        return os.path.join(self.cache_dir, f"{self.key}_{index}.npy")
+
+    def _fit_segment(self, index):
+        """Samples the model at the Chebyshev nodes of a segment and fits it."""
+        start = index * self.segment_length
+        times = start + 0.5 * self.segment_length * (self.nodes + 1.0)
+        samples = np.asarray(self.position_func(times), dtype=np.float64)
+        self.fits += 1
+        return fit_chebyshev(samples, self.degree)
+
+    def segment(self, index):
+        """Returns the coefficients of a segment, loading or fitting it on a miss."""
+        coeffs = self.segments.get(index)
+        if coeffs is not None:
+            self.segments.move_to_end(index)
+            return coeffs
+
+        use_disk = self.cache_dir is not None and self.key is not None
+        if use_disk and os.path.exists(self._segment_path(index)):
+            coeffs = np.load(self._segment_path(index))
+        else:
+            coeffs = self._fit_segment(index)
+            if use_disk:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                np.save(self._segment_path(index), coeffs)
+
+        self.segments[index] = coeffs
+        while len(self.segments) > self.max_segments:
+            self.segments.popitem(last=False) # Evict the least recently used segment
+        return coeffs
+
+    def positions(self, t):
+        """Returns the positions of all bodies at time t, shape (bodies, dim)."""
+        index = int(np.floor(t / self.segment_length))
+        start = index * self.segment_length
+        x = 2.0 * (t - start) / self.segment_length - 1.0
+        return evaluate_chebyshev(self.segment(index), x)
+
+    def positions_many(self, times):
+        """Returns positions for an array of times, shape (len(times), bodies, dim)."""
+        times = np.asarray(times, dtype=np.float64)
+        indices = np.floor(times / self.segment_length).astype(np.int64)
+        result = None
+        for index in np.unique(indices):
+            mask = indices == index
+            x = 2.0 * (times[mask] - index * self.segment_length) / self.segment_length - 1.0
+            coeffs = self.segment(int(index))
+            values = evaluate_chebyshev(coeffs[:, None], x[:, None, None])
+            if result is None:
+                result = np.empty((len(times),) + values.shape[1:])
+            result[mask] = values
+        return result
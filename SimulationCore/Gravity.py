@@ -0,0 +1,87 @@
+import numpy as np
+
+G = 6.67430e-11  # Gravitational constant (m^3 kg^-1 s^-2)
+
+PAIR_LOOP_BODIES = 16  # Up to this many bodies, accelerations() loops over pairs
+
+# --- Batched Newtonian Gravity ---
+# All functions accept positions of shape (..., bodies, dim), so a single
+# system, an ensemble of systems or a subset of bodies share the same code.
+
+def accelerations(positions, masses, g=G, softening=0.0):
+    """Returns the gravitational acceleration on every body, same shape as positions."""
+    positions = np.asarray(positions, dtype=float)
+    masses = np.asarray(masses, dtype=float)
+    if positions.shape[-2] <= PAIR_LOOP_BODIES:
+        return _pair_accelerations(positions, masses, g, softening)
+
+    # diff[..., i, j, :] = r_j - r_i
+    diff = positions[..., None, :, :] - positions[..., :, None, :]
+    dist2 = np.sum(diff**2, axis=-1) + softening**2
+    with np.errstate(divide="ignore"):
+        inv_r3 = np.where(dist2 > 0, dist2 ** -1.5, 0.0)
+    return g * np.sum((inv_r3 * masses[..., None, :])[..., None] * diff, axis=-2)
+
+
+def _pair_accelerations(positions, masses, g, softening):
+    """
+    Loops over the B(B-1)/2 pairs while vectorizing over leading axes.
+
+    For a few bodies and many systems (ensembles) this visits each pair once
+    and avoids building the (B, B) matrix.
+    """
+    acc = np.zeros_like(positions)
+    bodies = positions.shape[-2]
+    for i in range(bodies - 1):
+        for j in range(i + 1, bodies):
+            diff = positions[..., j, :] - positions[..., i, :]
+            inv_r3 = (np.sum(diff**2, axis=-1, keepdims=True) + softening**2) ** -1.5
+            acc[..., i, :] += (g * masses[..., j, None]) * inv_r3 * diff
+            acc[..., j, :] -= (g * masses[..., i, None]) * inv_r3 * diff
+    return acc
+
+
+def accelerations_on(targets, positions, masses, g=G, softening=0.0):
+    """
+    Acceleration on a subset of bodies (index array `targets`) from all bodies.
+
+    Costs O(len(targets) * N) instead of O(N^2).
+    """
+    positions = np.asarray(positions, dtype=float)
+    masses = np.asarray(masses, dtype=float)
+    diff = positions[None, :, :] - positions[targets, None, :]
+    dist2 = np.sum(diff**2, axis=-1) + softening**2
+    with np.errstate(divide="ignore"):
+        inv_r3 = np.where(dist2 > 0, dist2 ** -1.5, 0.0)
+    return g * np.sum((inv_r3 * masses)[..., None] * diff, axis=-2)
+
+
+def potential_energy(positions, masses, g=G, softening=0.0):
+    """Total potential energy, shape positions.shape[:-2] (one value per system)."""
+    positions = np.asarray(positions, dtype=float)
+    masses = np.asarray(masses, dtype=float)
+    i, j = np.triu_indices(positions.shape[-2], k=1)
+    dist = np.sqrt(np.sum((positions[..., i, :] - positions[..., j, :])**2, axis=-1) + softening**2)
+    return -g * np.sum(masses[i] * masses[j] / dist, axis=-1)
+
+
+def rk4_step(positions, velocities, masses, dt, g=G, softening=0.0):
+    """One classical Runge-Kutta step for positions and velocities of shape (..., bodies, dim)."""
+    def acc(p):
+        return accelerations(p, masses, g, softening)
+
+    a1 = acc(positions)
+    v1 = velocities
+
+    a2 = acc(positions + 0.5 * dt * v1)
+    v2 = velocities + 0.5 * dt * a1
+
+    a3 = acc(positions + 0.5 * dt * v2)
+    v3 = velocities + 0.5 * dt * a2
+
+    a4 = acc(positions + dt * v3)
+    v4 = velocities + dt * a3
+
+    new_positions = positions + (dt / 6.0) * (v1 + 2 * v2 + 2 * v3 + v4)
+    new_velocities = velocities + (dt / 6.0) * (a1 + 2 * a2 + 2 * a3 + a4)
+    return new_positions, new_velocities
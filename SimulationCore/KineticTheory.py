@@ -0,0 +1,153 @@
+import csv
+import math
+from collections import deque
+
+import numpy as np
+
+# --- Reference Distributions (2D, k_B = 1) ---
+
+def maxwell_boltzmann_fractions(edges, masses, temperature):
+    """
+    Expected fraction of particle speeds in every bin of `edges`, for a
+    mixture of masses in equilibrium at `temperature`. The last edge may be
+    np.inf to catch the tail.
+
+    In two dimensions the speed distribution of a particle of mass m is
+      f(v) = (m v / T) exp(-m v² / 2T),   F(v) = 1 - exp(-m v² / 2T)
+    """
+    edges = np.asarray(edges, dtype=float)
+    masses = np.asarray(masses, dtype=float)
+    if temperature <= 0.0:
+        fractions = np.zeros(len(edges) - 1)
+        fractions[0] = 1.0
+        return fractions
+    cdf = 1.0 - np.exp(-np.outer(masses, edges**2) / (2.0 * temperature))
+    return np.mean(np.diff(cdf, axis=1), axis=0)
+
+
+def hard_disk_compressibility(packing):
+    """Henderson's equation of state for hard disks: Z = PA / NT = (1 + η²/8) / (1 - η)²."""
+    return (1.0 + packing**2 / 8.0) / (1.0 - packing)**2
+
+# --- Gas Monitor ---
+# Measures a 2D gas over windows of `window` steps without keeping per-step
+# state: every step only adds to a few running sums, which are turned into
+# one summary row when the window closes.
+#
+# - temperature: time average of the kinetic energy per particle (k_B = 1)
+# - wall pressure: momentum given to the walls per unit time and wall length
+# - virial pressure: (N T + Σ r⃗_ij·Δp⃗_i / 2t) / A, from the momentum the
+#   particles exchange with each other; it works with periodic boundaries
+# - speed histogram, compared with the Maxwell-Boltzmann distribution at the
+#   measured temperature (distance = half the summed absolute difference)
+class GasMonitor:
+    FIELDS = ("step", "time", "particles", "temperature", "density", "packing",
+              "wall_pressure", "virial_pressure", "compressibility", "hard_disk_compressibility",
+              "speed_distance")
+
+    def __init__(self, window=500, speed_bins=25, max_speed=5.0, capacity=256, periodic=False, on_window=None):
+        """Speeds above max_speed go to an extra overflow bin; `capacity` windows are kept."""
+        self.window = max(1, int(window))
+        self.edges = np.append(np.linspace(0.0, max_speed, speed_bins + 1), np.inf)
+        self.bin_width = max_speed / speed_bins
+        self.capacity = capacity
+        self.periodic = periodic # No walls, so no wall pressure
+        self.on_window = on_window
+        self.reset()
+
+    def reset(self):
+        """Forgets the finished windows and starts a new one."""
+        self.windows = deque(maxlen=self.capacity)
+        self.histograms = deque(maxlen=self.capacity)
+        self.step = 0
+        self.start_window()
+
+    def start_window(self):
+        self.steps = 0
+        self.time = 0.0
+        self.kinetic = 0.0 # ∫ KE dt
+        self.wall_impulse = 0.0
+        self.virial = 0.0 # Σ r⃗_ij·Δp⃗_i
+        self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64)
+        self.masses = None
+        self.radii = None
+        self.box = None
+
+    def add_wall_impulse(self, impulse):
+        """Momentum transferred to the walls since the last call."""
+        self.wall_impulse += impulse
+
+    def add_virial(self, virial):
+        """Σ r⃗_ij·Δp⃗_i over pair exchanges since the last call (impulses times separations)."""
+        self.virial += virial
+
+    def record(self, masses, velocities, box, dt=1.0, radii=None):
+        """Adds one step of length dt; closes the window after `window` steps and returns its row."""
+        masses = np.asarray(masses, dtype=float)
+        velocities = np.asarray(velocities, dtype=float)
+        speeds = np.hypot(velocities[:, 0], velocities[:, 1])
+        self.kinetic += 0.5 * np.sum(masses * speeds**2) * dt
+        bins = np.minimum((speeds / self.bin_width).astype(np.int64), len(self.counts) - 1)
+        self.counts += np.bincount(bins, minlength=len(self.counts))
+        self.masses, self.radii, self.box = masses, radii, box
+        self.time += dt
+        self.steps += 1
+        self.step += 1
+        if self.steps < self.window:
+            return None
+        return self.close_window()
+
+    def close_window(self):
+        """Turns the running sums into a summary row and starts the next window."""
+        n = len(self.masses)
+        width, height = self.box
+        area = width * height
+        temperature = self.kinetic / (self.time * n)
+        ideal = n * temperature / area
+        virial_pressure = ideal + self.virial / (2.0 * self.time * area)
+        wall_pressure = math.nan if self.periodic else self.wall_impulse / (self.time * 2.0 * (width + height))
+        packing = math.nan if self.radii is None else float(np.sum(np.pi * np.asarray(self.radii)**2) / area)
+
+        measured = self.counts / max(self.counts.sum(), 1)
+        expected = maxwell_boltzmann_fractions(self.edges, self.masses, temperature)
+        row = {
+            "step": self.step,
+            "time": self.time,
+            "particles": n,
+            "temperature": temperature,
+            "density": n / area,
+            "packing": packing,
+            "wall_pressure": wall_pressure,
+            "virial_pressure": virial_pressure,
+            "compressibility": virial_pressure / ideal if ideal > 0 else math.nan,
+            "hard_disk_compressibility": hard_disk_compressibility(packing),
+            "speed_distance": 0.5 * float(np.sum(np.abs(measured - expected))),
+        }
+        self.windows.append(row)
+        self.histograms.append((measured, expected))
+        self.start_window()
+        if self.on_window is not None:
+            self.on_window(row)
+        return row
+
+    def latest_histogram(self):
+        """Bin edges and the measured and Maxwell-Boltzmann fractions of the last window."""
+        if not self.histograms:
+            return None
+        measured, expected = self.histograms[-1]
+        return self.edges, measured, expected
+
+    def export_csv(self, path):
+        """Writes one row per finished window to a CSV file."""
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=self.FIELDS)
+            writer.writeheader()
+            writer.writerows(self.windows)
+
+
+def print_window(row):
+    """Default window handler used by the simulation scripts."""
+    pressure = "" if math.isnan(row["wall_pressure"]) else f" wall P={row['wall_pressure']:.4g}"
+    print(f"[gas] step {row['step']}: T={row['temperature']:.4g}{pressure} virial P={row['virial_pressure']:.4g} "
+          f"Z={row['compressibility']:.3f} (hard disks {row['hard_disk_compressibility']:.3f}) "
+          f"speed distance to Maxwell-Boltzmann {row['speed_distance']:.3f}")
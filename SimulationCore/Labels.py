@@ -0,0 +1,97 @@
+import numpy as np
+
+# --- Label Layer ---
+# One canvas text item per label, created on first use. Each frame the
+# layer only moves the visible labels; the text is re-set only when the
+# string changes and the item state only when visibility flips, so Tk does
+# not have to destroy, re-create and re-measure text items every frame.
+#
+# Level-of-detail culling hides labels that would clutter the view:
+# - labels whose anchor is outside the view (plus a margin) are hidden
+# - the view is split into cells of `spacing` pixels and only the label with
+#   the highest priority in each cell is shown, so labels of bodies that
+#   overlap on screen do not pile up on top of each other
+class LabelLayer:
+    def __init__(self, renderer, font=("Arial", 8, "normal"), color="white", anchor="s",
+                 offset=(0.0, 0.0), spacing=None, margin=20):
+        self.renderer = renderer
+        self.canvas = renderer.canvas
+        self.font = font
+        self.color = color
+        self.anchor = anchor
+        self.offset = offset   # World-space offset from the body to the label anchor
+        self.spacing = spacing # Culling cell size in pixels (None shows overlapping labels)
+        self.margin = margin   # Pixels beyond the view that still count as on screen
+        self.items = {}        # key -> canvas text item
+        self.texts = {}        # key -> text currently shown
+        self.visible = {}      # key -> whether the item is currently shown
+
+    def visible_mask(self, cx, cy, priority=None):
+        """Which labels survive off-screen and overlap culling (canvas coordinates)."""
+        x1, y1, x2, y2 = self.renderer.bounds
+        mask = ((cx >= x1 - self.margin) & (cx <= x2 + self.margin)
+                & (cy >= y1 - self.margin) & (cy <= y2 + self.margin))
+        if self.spacing is None or not mask.any():
+            return mask
+
+        candidates = np.flatnonzero(mask)
+        priority = np.zeros(len(cx)) if priority is None else np.asarray(priority, dtype=float)
+        cells = np.floor(np.column_stack((cx[candidates], cy[candidates])) / self.spacing).astype(np.int64)
+        # Sort by cell, then by descending priority (ties keep the lower index),
+        # and keep the first label of each cell
+        order = np.lexsort((candidates, -priority[candidates], cells[:, 1], cells[:, 0]))
+        sorted_cells = cells[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = np.any(sorted_cells[1:] != sorted_cells[:-1], axis=1)
+        mask[:] = False
+        mask[candidates[order[first]]] = True
+        return mask
+
+    def update(self, keys, xs, ys, texts=None, priority=None):
+        """
+        Positions the labels of the given keys at world coordinates (xs, ys).
+
+        texts defaults to str(key). priority decides which label wins a
+        culling cell (e.g. body size). Labels of keys missing from this call
+        keep their previous state.
+        """
+        cx, cy = self.renderer.to_canvas(np.asarray(xs, dtype=float) + self.offset[0],
+                                         np.asarray(ys, dtype=float) + self.offset[1])
+        shown = self.visible_mask(cx, cy, priority)
+        canvas = self.canvas
+        for i, key in enumerate(keys):
+            text = str(key) if texts is None else texts[i]
+            if not shown[i]:
+                if self.visible.get(key):
+                    canvas.itemconfigure(self.items[key], state="hidden")
+                    self.visible[key] = False
+                continue
+            if key not in self.items:
+                self.items[key] = canvas.create_text(float(cx[i]), float(cy[i]), text=text, fill=self.color,
+                                                     font=self.font, anchor=self.anchor)
+                self.texts[key] = text
+                self.visible[key] = True
+                continue
+            canvas.coords(self.items[key], float(cx[i]), float(cy[i]))
+            if self.texts[key] != text:
+                canvas.itemconfigure(self.items[key], text=text)
+                self.texts[key] = text
+            if not self.visible[key]:
+                canvas.itemconfigure(self.items[key], state="normal")
+                self.visible[key] = True
+
+    def set_text(self, key, text):
+        """Changes one label's text without moving it."""
+        if key in self.items and self.texts[key] != text:
+            self.canvas.itemconfigure(self.items[key], text=text)
+            self.texts[key] = text
+
+    def remove(self, key):
+        if key in self.items:
+            self.canvas.delete(self.items.pop(key))
+            self.texts.pop(key)
+            self.visible.pop(key)
+
+    def clear(self):
+        for key in list(self.items):
+            self.remove(key)
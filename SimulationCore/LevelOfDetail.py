@@ -0,0 +1,217 @@
+import tkinter as tk
+
+import numpy as np
+
+from SimulationCore import Raster
+
+# --- Colour Maps ---
+
+def colormap(anchors, size=256):
+    """(size, 3) uint8 lookup table interpolated between evenly spaced '#rrggbb' anchor colours."""
+    anchors = np.array([Raster.hex_to_rgb(color) for color in anchors], dtype=float)
+    t = np.linspace(0.0, len(anchors) - 1, size)
+    steps = np.arange(len(anchors))
+    lut = np.column_stack([np.interp(t, steps, anchors[:, channel]) for channel in range(3)])
+    return lut.round().astype(np.uint8)
+
+
+DENSITY_COLORS = colormap(["#1b0c41", "#781c6d", "#ed6925", "#fbb61a", "#fcffa4"]) # Dark to bright
+SPEED_COLORS = colormap(["#313695", "#4575b4", "#abd9e9", "#fee090", "#f46d43", "#a50026"]) # Slow blue, fast red
+
+# --- Binning ---
+
+def bin_particles(px, py, shape, weights=None):
+    """
+    Particle counts on a (rows, columns) grid from coordinates in bin units.
+
+    Points outside the grid are dropped. With weights, the sum of the
+    weights in every bin is returned as well (else None).
+    """
+    rows, columns = shape
+    column = np.floor(px).astype(np.int64)
+    row = np.floor(py).astype(np.int64)
+    inside = (column >= 0) & (column < columns) & (row >= 0) & (row < rows)
+    index = row[inside] * columns + column[inside]
+    counts = np.bincount(index, minlength=rows * columns).reshape(shape)
+    if weights is None:
+        return counts, None
+    weights = np.broadcast_to(np.asarray(weights, dtype=float), inside.shape)[inside]
+    return counts, np.bincount(index, weights, minlength=rows * columns).reshape(shape)
+
+
+def heatmap(counts, sums=None, value_range=None):
+    """
+    Colour-maps binned particles into an RGBA image with one pixel per bin.
+
+    Without sums the colour is the density on a log scale, relative to the
+    fullest bin. With sums it is the mean value per bin over value_range
+    (default: 0 to the largest mean) and the opacity follows the density.
+    Empty bins are transparent.
+    """
+    image = np.zeros(counts.shape + (4,), dtype=np.uint8)
+    occupied = counts > 0
+    if not occupied.any():
+        return image
+    density = np.log1p(counts[occupied]) / np.log1p(counts.max())
+    if sums is None:
+        image[occupied, :3] = DENSITY_COLORS[(density * 255).astype(np.int64)]
+        image[occupied, 3] = 255
+        return image
+    mean = sums[occupied] / counts[occupied]
+    low, high = value_range if value_range is not None else (0.0, max(mean.max(), 1e-300))
+    level = np.clip((mean - low) / (high - low), 0.0, 1.0)
+    image[occupied, :3] = SPEED_COLORS[(level * 255).astype(np.int64)]
+    image[occupied, 3] = (96 + 159 * density).astype(np.uint8)
+    return image
+
+# --- Level of Detail ---
+# Crowded scenes are drawn as one heatmap image instead of one canvas item
+# per particle. Particles are binned into squares of bin_size screen pixels
+# and colour-mapped, so a frame costs in proportion to the screen pixels
+# rather than the particle count, and no canvas item is touched. Only one
+# pixel per bin is encoded; Tk scales it up to the screen in C. The
+# scripts' own particle items (tagged with sprite_tag) are hidden meanwhile
+# and shown again once at most max_sprites particles are in view, e.g.
+# after zooming in.
+#
+# The mouse wheel zooms about the pointer and dragging pans. World
+# coordinates are the canvas pixels at zoom 1, which is what the particle
+# simulations use, and the view always stays inside that area.
+class LevelOfDetail:
+    MODES = ("density", "speed")
+
+    def __init__(self, canvas, sprite_tag="particle", max_sprites=1500, min_sprite_zoom=1.0, bin_size=4,
+                 mode="density", value_range=None, max_zoom=16.0):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown mode {mode!r}; expected one of {self.MODES}")
+        self.canvas = canvas
+        self.sprite_tag = sprite_tag
+        self.max_sprites = max_sprites         # More particles in view switch to the heatmap
+        self.min_sprite_zoom = min_sprite_zoom # Zoomed out further switches to the heatmap
+        self.bin_size = bin_size
+        self.mode = mode
+        self.value_range = value_range # Colour range of the "speed" mode
+        self.max_zoom = max_zoom
+        self.source = None # Heatmap photo with one pixel per bin
+        self.photo = None  # The source scaled up to screen pixels, shown by heatmap_item
+        self.heatmap_item = None
+        self.zoom = 1.0
+        self.origin = np.zeros(2) # World position of the canvas's top-left corner
+        self.sprites = True       # Whether the last frame showed the sprites
+        self.placed = None        # Particles in view in the last sprite frame; None places them all
+        self.view_size = None
+        self.drag = None
+
+    def bind(self):
+        """Mouse wheel zooms about the pointer, dragging with the left button pans."""
+        self.canvas.bind("<MouseWheel>",
+                         lambda event: self.zoom_at(event.x, event.y, 1.25 if event.delta > 0 else 0.8))
+        self.canvas.bind("<Button-4>", lambda event: self.zoom_at(event.x, event.y, 1.25)) # X11 wheel
+        self.canvas.bind("<Button-5>", lambda event: self.zoom_at(event.x, event.y, 0.8))
+        self.canvas.bind("<ButtonPress-1>", self.start_drag)
+        self.canvas.bind("<B1-Motion>", self.pan)
+
+    def reset(self):
+        """Forgets the drawn state, e.g. before the particles' canvas items are recreated."""
+        if self.heatmap_item is not None:
+            self.canvas.delete(self.heatmap_item)
+            self.heatmap_item = None
+        self.sprites = True
+        self.placed = None
+
+    # --- View ---
+
+    def size(self):
+        return max(self.canvas.winfo_width(), 1), max(self.canvas.winfo_height(), 1)
+
+    def zoom_at(self, cx, cy, factor):
+        """Zooms by factor, keeping the world point under canvas position (cx, cy) in place."""
+        zoom = min(max(self.zoom * factor, 1.0), self.max_zoom)
+        pointer = np.array([cx, cy], dtype=float)
+        self.origin = self.origin + pointer / self.zoom - pointer / zoom
+        self.zoom = zoom
+        self.clamp()
+
+    def start_drag(self, event):
+        self.drag = np.array([event.x, event.y], dtype=float)
+
+    def pan(self, event):
+        pointer = np.array([event.x, event.y], dtype=float)
+        if self.drag is not None:
+            self.origin -= (pointer - self.drag) / self.zoom
+            self.clamp()
+        self.drag = pointer
+
+    def clamp(self):
+        """Keeps the view inside the world area; every sprite is placed again."""
+        size = np.array(self.size(), dtype=float)
+        self.origin = np.clip(self.origin, 0.0, size - size / self.zoom)
+        self.placed = None
+
+    def to_canvas(self, xs, ys):
+        return (np.asarray(xs) - self.origin[0]) * self.zoom, (np.asarray(ys) - self.origin[1]) * self.zoom
+
+    # --- Drawing ---
+
+    def draw(self, items, xs, ys, radii, values=None):
+        """
+        Shows one frame of particles, either as their canvas items or as a heatmap.
+
+        items are the particles' canvas ovals, radii one radius or one per
+        particle (world units) and values one number per particle (e.g.
+        the speed) for the "speed" mode. Returns True when sprites are shown.
+        """
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        width, height = self.size()
+        if (width, height) != self.view_size:
+            self.view_size = (width, height)
+            self.clamp()
+        cx, cy = self.to_canvas(xs, ys)
+        reach = np.broadcast_to(np.asarray(radii, dtype=float) * self.zoom, cx.shape)
+        in_view = (cx + reach >= 0) & (cx - reach <= width) & (cy + reach >= 0) & (cy - reach <= height)
+        if np.count_nonzero(in_view) <= self.max_sprites and self.zoom >= self.min_sprite_zoom:
+            self.show_sprites(items, cx, cy, reach, in_view)
+            return True
+        self.show_heatmap(cx, cy, values, width, height)
+        return False
+
+    def show_sprites(self, items, cx, cy, reach, in_view):
+        if not self.sprites:
+            self.canvas.itemconfigure(self.heatmap_item, state="hidden")
+            self.canvas.itemconfigure(self.sprite_tag, state="normal")
+            self.sprites = True
+            self.placed = None
+        # Particles in view, and those that just left it, are placed; the
+        # others were left outside the view when they last left it
+        if self.placed is None or len(self.placed) != len(in_view):
+            update = np.arange(len(in_view))
+        else:
+            update = np.flatnonzero(in_view | self.placed)
+        self.placed = in_view
+        x0, y0 = (cx[update] - reach[update]).tolist(), (cy[update] - reach[update]).tolist()
+        x1, y1 = (cx[update] + reach[update]).tolist(), (cy[update] + reach[update]).tolist()
+        coords = self.canvas.coords
+        for k, a, b, c, d in zip(update.tolist(), x0, y0, x1, y1):
+            coords(items[k], a, b, c, d)
+
+    def show_heatmap(self, cx, cy, values, width, height):
+        size = self.bin_size
+        rows, columns = -(-height // size), -(-width // size)
+        weights = values if self.mode == "speed" else None
+        counts, sums = bin_particles(cx / size, cy / size, (rows, columns), weights)
+        data = Raster.encode_png(heatmap(counts, sums, self.value_range))
+
+        if self.heatmap_item is None:
+            self.source = tk.PhotoImage(master=self.canvas, data=data, format="png")
+            self.photo = tk.PhotoImage(master=self.canvas)
+            self.heatmap_item = self.canvas.create_image(0, 0, image=self.photo, anchor="nw")
+        else:
+            self.source.configure(data=data, format="png")
+        # Replace (not blend over) the shown pixels with the bins scaled up
+        self.photo.tk.call(str(self.photo), "copy", str(self.source), "-from", 0, 0, columns, rows,
+                           "-zoom", size, size, "-compositingrule", "set", "-shrink")
+        if self.sprites:
+            self.canvas.itemconfigure(self.sprite_tag, state="hidden")
+            self.canvas.itemconfigure(self.heatmap_item, state="normal")
+            self.sprites = False
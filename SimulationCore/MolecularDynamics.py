@@ -0,0 +1,190 @@
+import numpy as np
+
+from SimulationCore.Checkpoint import random_state, restore_random
+from SimulationCore.Neighbours import NeighbourList, minimum_image
+
+WCA_CUTOFF = 2.0 ** (1.0 / 6.0) # Cutting Lennard-Jones at its minimum leaves only the repulsion (WCA)
+THERMOSTATS = (None, "berendsen", "langevin")
+
+# --- Pair Potentials ---
+# Lennard-Jones between particles i and j, with σ_ij = (σ_i + σ_j) / 2:
+#   U(r) = 4ε[(σ/r)¹² - (σ/r)⁶] - U(r_c),   r < r_c = cutoff·σ_ij
+#   F(r) = 24ε[2(σ/r)¹² - (σ/r)⁶] / r²  r⃗
+# The potential is shifted to zero at the cutoff so the energy is
+# continuous. With cutoff = WCA_CUTOFF this is the purely repulsive
+# Weeks-Chandler-Andersen potential.
+
+def pair_forces(positions, sigma, epsilon, cutoff, first, second, box=None):
+    """Forces (N, 2), total potential energy and virial Σ r⃗_ij·F⃗_ij of the listed pairs."""
+    delta = minimum_image(positions[first] - positions[second], box)
+    r2 = np.einsum("ij,ij->i", delta, delta)
+    s2 = (0.5 * (sigma[first] + sigma[second]))**2
+    inside = r2 < cutoff**2 * s2
+    delta, r2, s2 = delta[inside], r2[inside], s2[inside]
+    first, second = first[inside], second[inside]
+
+    sr6 = (s2 / r2)**3
+    shift = 4.0 * epsilon * (cutoff**-12 - cutoff**-6)
+    energy = np.sum(4.0 * epsilon * (sr6 * sr6 - sr6) - shift)
+    pair = (24.0 * epsilon * (2.0 * sr6 * sr6 - sr6) / r2)[:, None] * delta # Force on `first`
+
+    n = len(positions)
+    forces = np.empty((n, 2))
+    for axis in range(2):
+        forces[:, axis] = (np.bincount(first, pair[:, axis], minlength=n)
+                           - np.bincount(second, pair[:, axis], minlength=n))
+    virial = np.einsum("ij,ij->", pair, delta)
+    return forces, energy, virial
+
+# --- Molecular Dynamics ---
+# Velocity Verlet with optional thermostats, in reduced units (k_B = 1):
+#   v += F/m dt/2;  x += v dt;  F = F(x);  v += F/m dt/2
+# Forces come from a Verlet neighbour list with the potential's cutoff as
+# the reach, so building and evaluating them is O(N).
+#
+# Thermostats, applied after each step with coupling time tau:
+# - berendsen: velocities are scaled by sqrt(1 + dt/tau (T0/T - 1))
+# - langevin:  v = c v + sqrt((1 - c²) T0/m) ξ,  c = exp(-dt/tau)
+#              (friction 1/tau plus matching random kicks)
+# Without a thermostat the total energy is conserved.
+#
+# Particles are kept inside the box (0, 0)-(width, height) by reflecting
+# walls at a distance of σ/2, or wrap around it when periodic. For pressure
+# measurements the momentum given to the walls and the time integral of
+# the virial are accumulated in wall_impulse and virial_impulse.
+class MolecularDynamics:
+    def __init__(self, positions, velocities, masses, sigma, epsilon=1.0, cutoff=2.5, box=(10.0, 10.0),
+                 dt=0.005, thermostat=None, temperature=1.0, tau=1.0, skin=None, seed=None, periodic=False):
+        if thermostat not in THERMOSTATS:
+            raise ValueError(f"Unknown thermostat {thermostat!r}; expected one of {THERMOSTATS}")
+        self.positions = np.array(positions, dtype=float)
+        self.velocities = np.array(velocities, dtype=float)
+        self.masses = np.asarray(masses, dtype=float)
+        self.sigma = np.broadcast_to(np.asarray(sigma, dtype=float), len(self.masses)).copy()
+        self.epsilon = epsilon
+        self.cutoff = cutoff # In units of σ_ij
+        self.box = box
+        self.periodic = periodic
+        self.dt = dt
+        self.thermostat = thermostat
+        self.temperature_target = temperature
+        self.tau = tau
+        self.rng = np.random.default_rng(seed)
+        self.time = 0.0
+
+        # Each particle reaches half the cutoff distance of a pair
+        self.reach = 0.5 * cutoff * self.sigma
+        self.neighbours = NeighbourList(skin=0.3 * self.sigma.max() if skin is None else skin)
+        self.potential_energy = 0.0
+        self.virial = 0.0
+        self.wall_impulse = 0.0
+        self.virial_impulse = 0.0
+        self.forces = self.compute_forces()
+
+    def compute_forces(self):
+        box = self.box if self.periodic else None
+        first, second = self.neighbours.update(self.positions, self.reach, box)
+        forces, self.potential_energy, self.virial = pair_forces(self.positions, self.sigma, self.epsilon,
+                                                                 self.cutoff, first, second, box)
+        return forces
+
+    def apply_boundaries(self):
+        """Wraps particles into a periodic box, or reflects them off its walls."""
+        if self.periodic:
+            self.positions %= self.box
+            return
+        half = 0.5 * self.sigma
+        for axis, size in enumerate(self.box):
+            x, v = self.positions[:, axis], self.velocities[:, axis]
+            low = (x < half) & (v <= 0.0) # Moving outwards, or at rest while minimizing
+            high = (x > size - half) & (v >= 0.0)
+            hit = low | high
+            self.wall_impulse += 2.0 * np.sum(self.masses[hit] * np.abs(v[hit]))
+            x[low] = 2.0 * half[low] - x[low]
+            v[low] = -v[low]
+            x[high] = 2.0 * (size - half[high]) - x[high]
+            v[high] = -v[high]
+
+    def step(self):
+        dt = self.dt
+        inverse_mass = 1.0 / self.masses[:, None]
+        self.velocities += 0.5 * dt * self.forces * inverse_mass
+        self.positions += dt * self.velocities
+        self.apply_boundaries()
+        self.forces = self.compute_forces()
+        self.velocities += 0.5 * dt * self.forces * inverse_mass
+        self.virial_impulse += self.virial * dt
+        self.apply_thermostat()
+        self.time += dt
+
+    def advance(self, steps):
+        for _ in range(steps):
+            self.step()
+
+    def apply_thermostat(self):
+        if self.thermostat == "berendsen":
+            current = self.temperature()
+            if current > 0:
+                self.velocities *= np.sqrt(1.0 + self.dt / self.tau * (self.temperature_target / current - 1.0))
+        elif self.thermostat == "langevin":
+            c = np.exp(-self.dt / self.tau)
+            kick = np.sqrt((1.0 - c * c) * self.temperature_target / self.masses)[:, None]
+            self.velocities = c * self.velocities + kick * self.rng.standard_normal(self.velocities.shape)
+
+    def minimize(self, steps=200, max_move=0.05, force_tolerance=100.0):
+        """
+        Steepest descent in which the particle with the largest force moves
+        max_move·σ per step, e.g. to remove overlaps of randomly placed
+        particles before the dynamics start. Stops once every force is below
+        force_tolerance·ε/σ (the default only pushes apart overlapping pairs).
+        """
+        for _ in range(steps):
+            size = np.linalg.norm(self.forces, axis=1)
+            if np.max(size * self.sigma) <= force_tolerance * self.epsilon:
+                break
+            self.positions += self.forces * (max_move / np.max(size / self.sigma))
+            self.apply_boundaries()
+            self.forces = self.compute_forces()
+
+    # --- Checkpoints ---
+
+    def checkpoint_state(self):
+        """Everything step() reads, including the thermostat's random state (see SimulationCore/Checkpoint.py)."""
+        return {
+            "positions": self.positions, "velocities": self.velocities, "forces": self.forces,
+            "masses": self.masses, "sigma": self.sigma, "epsilon": self.epsilon, "cutoff": self.cutoff,
+            "box": list(self.box), "periodic": self.periodic, "dt": self.dt, "thermostat": self.thermostat,
+            "temperature_target": self.temperature_target, "tau": self.tau, "time": self.time,
+            "potential_energy": self.potential_energy, "virial": self.virial,
+            "wall_impulse": self.wall_impulse, "virial_impulse": self.virial_impulse,
+            "rng": random_state(self.rng), "neighbours": self.neighbours.checkpoint_state(),
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """An engine that continues exactly where checkpoint_state() was taken."""
+        md = cls.__new__(cls)
+        for name in ("positions", "velocities", "forces", "masses", "sigma"):
+            setattr(md, name, np.array(state[name], dtype=float))
+        for name in ("epsilon", "cutoff", "periodic", "dt", "thermostat", "temperature_target", "tau", "time",
+                     "potential_energy", "virial", "wall_impulse", "virial_impulse"):
+            setattr(md, name, state[name])
+        md.box = tuple(state["box"])
+        md.reach = 0.5 * md.cutoff * md.sigma
+        md.rng = np.random.default_rng()
+        restore_random(md.rng, state["rng"])
+        md.neighbours = NeighbourList()
+        md.neighbours.restore_state(state["neighbours"])
+        return md
+
+    # --- Observables ---
+
+    def kinetic_energy(self):
+        return 0.5 * np.sum(self.masses * np.sum(self.velocities**2, axis=1))
+
+    def temperature(self):
+        """Kinetic temperature with two degrees of freedom per particle (k_B = 1)."""
+        return self.kinetic_energy() / len(self.masses)
+
+    def total_energy(self):
+        return self.kinetic_energy() + self.potential_energy
@@ -0,0 +1,135 @@
+import numpy as np
+
+# --- Cell-Binned Pair Search ---
+
+def minimum_image(delta, box=None):
+    """Wraps separation vectors into the nearest periodic image; unchanged without a box."""
+    if box is None:
+        return delta
+    box = np.asarray(box, dtype=float)
+    return delta - box * np.round(delta / box)
+
+
+def close_pairs(positions, cutoff, box=None):
+    """
+    All pairs (i, j), i < j, closer than `cutoff`, sorted by i then j.
+
+    cutoff is one distance for all pairs, or an array of per-particle
+    reaches; the cutoff of a pair is then reach[i] + reach[j].
+    Particles are binned into square cells as large as the longest pair
+    cutoff, so only the 3 x 3 block of cells around each particle is
+    searched: O(N) for roughly uniform densities instead of O(N^2).
+    With a periodic box (width, height) the cells wrap around and
+    distances use the minimum image; cutoffs must stay below half the box.
+    """
+    positions = np.asarray(positions, dtype=float)
+    n = len(positions)
+    if n < 2:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+    reach = np.asarray(cutoff, dtype=float)
+    cell_size = 2.0 * reach.max() if reach.ndim else float(reach)
+
+    if box is None:
+        cells = np.floor((positions - positions.min(axis=0)) / cell_size).astype(np.int64)
+        # Padded cell keys, so stepping to a neighbouring cell never wraps into another column
+        rows = cells[:, 1].max() + 3
+        cell_key = lambda cx, cy: (cx + 1) * rows + cy + 1
+    else:
+        # Whole cells per box side, so the last cell borders the first
+        box = np.asarray(box, dtype=float)
+        divisions = np.maximum(np.floor(box / cell_size).astype(np.int64), 1)
+        cells = np.floor(positions % box / box * divisions).astype(np.int64) % divisions
+        rows = divisions[1]
+        cell_key = lambda cx, cy: cx % divisions[0] * rows + cy % rows
+    keys = cell_key(cells[:, 0], cells[:, 1])
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+
+    first, second = [], []
+    for dx, dy in ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1)): # Half the neighbouring cells: each pair once
+        target = keys if (dx, dy) == (0, 0) else cell_key(cells[:, 0] + dx, cells[:, 1] + dy)
+        lo = np.searchsorted(sorted_keys, target, side="left")
+        counts = np.searchsorted(sorted_keys, target, side="right") - lo
+        i = np.repeat(np.arange(n), counts)
+        # Index of every member of every target cell in the sorted order
+        starts = np.repeat(lo - np.cumsum(counts) + counts, counts)
+        j = order[starts + np.arange(len(i))]
+        keep = i < j if (dx, dy) == (0, 0) else i != j # Same cell: both orders are found
+        first.append(np.minimum(i[keep], j[keep]))
+        second.append(np.maximum(i[keep], j[keep]))
+    i = np.concatenate(first)
+    j = np.concatenate(second)
+    if box is not None and len(i):
+        # Fewer than three cells across a side: wrapped neighbour cells coincide
+        unique = np.unique(i * n + j)
+        i, j = unique // n, unique % n
+
+    limit = reach[i] + reach[j] if reach.ndim else reach
+    delta = minimum_image(positions[i] - positions[j], box)
+    close = np.einsum("ij,ij->i", delta, delta) < limit**2
+    i, j = i[close], j[close]
+    order = np.lexsort((j, i))
+    return i[order], j[order]
+
+# --- Verlet Neighbour List ---
+# Candidate collision pairs are found with an extra `skin` distance and
+# reused across frames. A pair that is not in the list was more than
+# r_i + r_j + skin apart at the last build; it can only come into contact
+# once one of the particles has moved more than skin / 2. So the list is
+# rebuilt only when the largest displacement since the build exceeds half
+# the skin, which is checked every frame in O(N). In a periodic box the
+# displacements use the minimum image, so wrapping around does not count.
+class NeighbourList:
+    def __init__(self, skin=10.0):
+        self.skin = skin
+        self.reference = None # Positions at the last build
+        self.radii = None
+        self.box = None # Periodic box of the last build
+        self.pairs = (np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp))
+        self.builds = 0
+
+    def build(self, positions, radii, box=None):
+        """Rebuilds the candidate pairs: particles within r_i + r_j + skin."""
+        self.reference = np.array(positions, dtype=float)
+        self.radii = np.array(radii, dtype=float)
+        self.box = None if box is None else tuple(box)
+        self.pairs = close_pairs(self.reference, self.radii + 0.5 * self.skin, self.box)
+        self.builds += 1
+
+    def needs_rebuild(self, positions, box=None):
+        if self.reference is None or len(positions) != len(self.reference):
+            return True
+        if (None if box is None else tuple(box)) != self.box:
+            return True
+        displacement = minimum_image(np.asarray(positions, dtype=float) - self.reference, self.box)
+        return np.max(np.einsum("ij,ij->i", displacement, displacement)) > (0.5 * self.skin)**2
+
+    def update(self, positions, radii, box=None):
+        """
+        Candidate pairs (i, j) for the current positions, rebuilt only when needed.
+
+        Pairs are sorted by i then j, the order of itertools.combinations.
+        Pass box=(width, height) for periodic boundaries.
+        """
+        if self.needs_rebuild(positions, box):
+            self.build(positions, radii, box)
+        return self.pairs
+
+    def invalidate(self):
+        """Forces a rebuild on the next update (e.g. after particles were added or radii changed)."""
+        self.reference = None
+
+    def checkpoint_state(self):
+        """The list as a checkpoint state (see SimulationCore/Checkpoint.py)."""
+        return {"skin": self.skin, "reference": self.reference, "radii": self.radii,
+                "box": None if self.box is None else list(self.box),
+                "first": self.pairs[0], "second": self.pairs[1], "builds": self.builds}
+
+    def restore_state(self, state):
+        """Continues from checkpoint_state(), rebuilding exactly when the saved list would have."""
+        self.skin = state["skin"]
+        self.reference = None if state["reference"] is None else np.array(state["reference"])
+        self.radii = None if state["radii"] is None else np.array(state["radii"])
+        self.box = None if state["box"] is None else tuple(state["box"])
+        self.pairs = (np.array(state["first"], dtype=np.intp), np.array(state["second"], dtype=np.intp))
+        self.builds = state["builds"]
@@ -0,0 +1,229 @@
+import atexit
+import csv
+import json
+import time
+
+import numpy as np
+
+# --- Profiler ---
+# Times the phases of an animation frame ("physics", "collisions", "render",
+# ...) with time.perf_counter_ns. Every phase keeps
+# - its last `capacity` durations in a ring buffer, for live figures (the
+#   overlay's mean times) and the percentiles of the summary
+# - a histogram of all its durations in power-of-two bins: bin k counts the
+#   durations d with 2^(k-1) <= d < 2^k ns, so adding one costs an integer
+#   bit_length() instead of a search through bin edges
+#
+# frame() wraps a whole animation callback. Besides the "frame" phase it
+# records "idle", the time from the end of one frame to the start of the
+# next: the timer delay plus whatever Tk did in between, which includes
+# redrawing the canvas and handling events.
+#
+# A disabled profiler hands out one shared do-nothing span, so the hooks
+# stay in the loops and cost one method call per phase when profiling is off.
+
+HISTOGRAM_BINS = 40 # The last bin collects everything from 2^38 ns (about 4.6 minutes)
+
+
+class Phase:
+    def __init__(self, capacity):
+        self.recent = [0] * capacity # Ring buffer of the last durations (ns)
+        self.count = 0
+        self.total = 0
+        self.longest = 0
+        self.histogram = [0] * HISTOGRAM_BINS
+
+    def add(self, duration):
+        self.recent[self.count % len(self.recent)] = duration
+        self.count += 1
+        self.total += duration
+        if duration > self.longest:
+            self.longest = duration
+        self.histogram[min(duration.bit_length(), HISTOGRAM_BINS - 1)] += 1
+
+    def latest(self, n=None):
+        """The last n durations (all kept ones by default), oldest first, in ns."""
+        kept = min(self.count, len(self.recent))
+        n = kept if n is None else min(n, kept)
+        end = self.count % len(self.recent)
+        return np.roll(np.array(self.recent, dtype=np.int64), -end)[len(self.recent) - n:]
+
+    def mean_ms(self, n=None):
+        """Mean of the last n durations in milliseconds, or None before the first one."""
+        latest = self.latest(n)
+        return latest.mean() / 1e6 if len(latest) else None
+
+    def summary(self):
+        """Totals over the whole run, percentiles over the ring buffer, and the non-empty histogram bins."""
+        p50, p90, p99 = (float(p) / 1e6 for p in np.percentile(self.latest(), [50, 90, 99])) if self.count else (None,) * 3
+        return {
+            "count": self.count,
+            "total_ms": self.total / 1e6,
+            "mean_ms": self.total / self.count / 1e6 if self.count else None,
+            "max_ms": self.longest / 1e6,
+            "p50_ms": p50,
+            "p90_ms": p90,
+            "p99_ms": p99,
+            "histogram": [{"lower_ms": lower / 1e6, "upper_ms": None if upper is None else upper / 1e6, "count": n}
+                          for (lower, upper), n in zip(map(bin_edges, range(HISTOGRAM_BINS)), self.histogram) if n],
+        }
+
+
+def bin_edges(k):
+    """Lower and upper duration (ns) of histogram bin k; the last bin has no upper bound (None)."""
+    return (0 if k == 0 else 1 << (k - 1)), (None if k == HISTOGRAM_BINS - 1 else 1 << k)
+
+
+class _Span:
+    """Context manager that adds its duration to one phase; reused by every frame."""
+    __slots__ = ("phase", "start")
+
+    def __init__(self, phase):
+        self.phase = phase
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.phase.add(time.perf_counter_ns() - self.start)
+
+
+class _FrameSpan(_Span):
+    __slots__ = ("profiler",)
+
+    def __init__(self, profiler):
+        super().__init__(profiler.phase("frame"))
+        self.profiler = profiler
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        if self.profiler.last_end is not None:
+            self.profiler.phase("idle").add(self.start - self.profiler.last_end)
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.last_end = time.perf_counter_ns()
+        self.phase.add(self.profiler.last_end - self.start)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Profiler:
+    def __init__(self, enabled=True, capacity=1024, dump_path=None):
+        """
+        enabled=False makes every span a no-op. With dump_path (".json" or
+        ".csv") the summary is written there when the program exits.
+        """
+        self.enabled = enabled
+        self.capacity = capacity
+        self.phases = {} # name -> Phase, in order of first use
+        self.spans = {}  # name -> reusable _Span
+        self.last_end = None # perf_counter_ns at the end of the last frame
+        self.frame_span = _FrameSpan(self) if enabled else NULL_SPAN
+        if enabled and dump_path:
+            atexit.register(self.dump, dump_path)
+
+    def phase(self, name):
+        if name not in self.phases:
+            self.phases[name] = Phase(self.capacity)
+        return self.phases[name]
+
+    def span(self, name):
+        """`with profiler.span("physics"):` times the block as one sample of that phase."""
+        if not self.enabled:
+            return NULL_SPAN
+        span = self.spans.get(name)
+        if span is None:
+            span = self.spans[name] = _Span(self.phase(name))
+        return span
+
+    def frame(self):
+        """`with profiler.frame():` around a whole animation callback."""
+        return self.frame_span
+
+    def interrupt(self):
+        """Call when the loop stops (e.g. on pause), so the pause is not counted as idle time."""
+        self.last_end = None
+
+    def fps(self, n=60):
+        """Frames per second over the last n frames, or None before the second frame."""
+        frame, idle = self.phases.get("frame"), self.phases.get("idle")
+        if frame is None or idle is None or not idle.count:
+            return None
+        return 1e3 / (frame.mean_ms(n) + idle.mean_ms(n))
+
+    def mean_ms(self, name, n=60):
+        """Mean duration of a phase over its last n samples, or None if it has none."""
+        phase = self.phases.get(name)
+        return None if phase is None else phase.mean_ms(n)
+
+    def summary(self):
+        """Summaries of the phases that ran (a loop without frame() has no "frame" phase)."""
+        return {name: phase.summary() for name, phase in self.phases.items() if phase.count}
+
+    def dump(self, path):
+        """Writes the summary as JSON, or the histograms as CSV rows if path ends in ".csv"."""
+        summary = self.summary()
+        with open(path, "w", newline="") as f:
+            if path.lower().endswith(".csv"):
+                writer = csv.writer(f)
+                writer.writerow(["phase", "lower_ms", "upper_ms", "count"])
+                for name, phase in summary.items():
+                    for entry in phase["histogram"]:
+                        writer.writerow([name, entry["lower_ms"], entry["upper_ms"], entry["count"]])
+            else:
+                json.dump(summary, f, indent=2)
+        print(f"Wrote the profile of {len(summary)} phases to {path}")
+
+# --- Overlay ---
+# A text item in a corner of the canvas with the frame rate, the mean
+# physics and render times over the last frames and an item count. The
+# text is only re-set every `every` frames, and the item is re-created if
+# the canvas was cleared (canvas.delete("all")).
+class ProfileOverlay:
+    def __init__(self, canvas, profiler, x=10, y=10, label="particles", every=10, window=60,
+                 font=("Courier", 10, "normal"), color="#7bed9f"):
+        self.canvas = canvas
+        self.profiler = profiler
+        self.x, self.y = x, y # Canvas coordinates of the top-left corner
+        self.label = label    # What update()'s count counts
+        self.every = every
+        self.window = window  # Frames averaged
+        self.font = font
+        self.color = color
+        self.item = None
+        self.frames = 0
+
+    def text(self, count=None):
+        def figure(value, digits):
+            return "-" if value is None else f"{value:.{digits}f}"
+        parts = [f"{figure(self.profiler.fps(self.window), 0)} fps",
+                 f"physics {figure(self.profiler.mean_ms('physics', self.window), 1)} ms",
+                 f"render {figure(self.profiler.mean_ms('render', self.window), 1)} ms"]
+        if count is not None:
+            parts.append(f"{count} {self.label}")
+        return " | ".join(parts)
+
+    def update(self, count=None):
+        """Call once per frame; refreshes the text every `every` frames."""
+        refresh = self.frames % self.every == 0
+        self.frames += 1
+        if not refresh:
+            return
+        if self.item is None or not self.canvas.type(self.item):
+            self.item = self.canvas.create_text(self.x, self.y, anchor="nw", font=self.font, fill=self.color)
+        self.canvas.itemconfigure(self.item, text=self.text(count))
+        self.canvas.tag_raise(self.item)
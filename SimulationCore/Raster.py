@@ -0,0 +1,119 @@
+import struct
+import zlib
+
+import numpy as np
+
+# --- Image Encoding ---
+# Tk 8.6 photo images load PNG data natively, so NumPy pixel arrays are
+# encoded as PNG in memory and handed to tk.PhotoImage in one call instead
+# of drawing thousands of individual canvas items.
+
+def _png_chunk(kind, data):
+    chunk = kind + data
+    return struct.pack(">I", len(data)) + chunk + struct.pack(">I", zlib.crc32(chunk) & 0xFFFFFFFF)
+
+
+def encode_png(pixels, compress_level=1):
+    """Encodes a (height, width, 3 or 4) uint8 array as PNG bytes (RGB or RGBA)."""
+    pixels = np.ascontiguousarray(pixels, dtype=np.uint8)
+    height, width, channels = pixels.shape
+    color_type = {3: 2, 4: 6}[channels]
+    # Every scanline starts with filter type 0 (None)
+    raw = np.zeros((height, width * channels + 1), dtype=np.uint8)
+    raw[:, 1:] = pixels.reshape(height, width * channels)
+    header = struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n"
+            + _png_chunk(b"IHDR", header)
+            + _png_chunk(b"IDAT", zlib.compress(raw.tobytes(), compress_level))
+            + _png_chunk(b"IEND", b""))
+
+# --- Colours ---
+
+def hex_to_rgb(color):
+    """Converts '#rrggbb' to an (r, g, b) tuple."""
+    color = color.lstrip("#")
+    return tuple(int(color[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def color_to_rgb(color, widget=None):
+    """Converts any Tk colour name or '#rrggbb' string to an (r, g, b) tuple."""
+    if color.startswith("#") and len(color) == 7:
+        return hex_to_rgb(color)
+    if widget is None:
+        return NAMED_COLORS[color]
+    r, g, b = widget.winfo_rgb(color) # 16-bit channels
+    return (r // 256, g // 256, b // 256)
+
+
+# A few named colours used by the simulations, for code that runs without Tk
+NAMED_COLORS = {
+    "white": (255, 255, 255), "black": (0, 0, 0), "yellow": (255, 255, 0),
+    "grey": (190, 190, 190), "gray": (190, 190, 190), "lightgray": (211, 211, 211),
+    "blue": (0, 0, 255), "red": (255, 0, 0), "green": (0, 255, 0), "cyan": (0, 255, 255),
+    "magenta": (255, 0, 255), "orange": (255, 165, 0), "lightgreen": (144, 238, 144),
+    "deepskyblue": (0, 191, 255),
+}
+
+# --- Rasterization ---
+
+def blank_image(width, height, color=(0, 0, 0, 0)):
+    """Returns a (height, width, len(color)) uint8 image filled with one colour."""
+    image = np.empty((height, width, len(color)), dtype=np.uint8)
+    image[:] = color
+    return image
+
+
+def stamp_points(image, px, py, colors, size=1):
+    """
+    Sets size x size pixel squares centred on integer pixel coordinates.
+
+    colors is one colour tuple or an (N, channels) array. Points outside the
+    image are skipped. Later points overwrite earlier ones.
+    """
+    height, width = image.shape[:2]
+    px = np.asarray(px, dtype=np.int64)
+    py = np.asarray(py, dtype=np.int64)
+    colors = np.asarray(colors, dtype=np.uint8)
+    half = (size - 1) // 2
+    for dy in range(-half, size - half):
+        for dx in range(-half, size - half):
+            x = px + dx
+            y = py + dy
+            inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+            image[y[inside], x[inside]] = colors if colors.ndim == 1 else colors[inside]
+    return image
+
+
+def fill_circle(image, cx, cy, radius, color):
+    """Fills a disc of the given pixel radius (antialiasing is not attempted)."""
+    height, width = image.shape[:2]
+    x0, x1 = max(int(cx - radius), 0), min(int(cx + radius) + 2, width)
+    y0, y1 = max(int(cy - radius), 0), min(int(cy + radius) + 2, height)
+    if x0 >= x1 or y0 >= y1:
+        return image
+    ys, xs = np.ogrid[y0:y1, x0:x1]
+    mask = (xs - cx)**2 + (ys - cy)**2 <= radius**2
+    image[y0:y1, x0:x1][mask] = color
+    return image
+
+
+def stroke_circle(image, cx, cy, radius, color, width=1.0):
+    """Draws a circle outline of the given pixel radius and line width."""
+    height, w = image.shape[:2]
+    reach = radius + width
+    x0, x1 = max(int(cx - reach), 0), min(int(cx + reach) + 2, w)
+    y0, y1 = max(int(cy - reach), 0), min(int(cy + reach) + 2, height)
+    if x0 >= x1 or y0 >= y1:
+        return image
+    ys, xs = np.ogrid[y0:y1, x0:x1]
+    distance = np.sqrt((xs - cx)**2 + (ys - cy)**2)
+    mask = np.abs(distance - radius) <= 0.5 * width
+    image[y0:y1, x0:x1][mask] = color
+    return image
+
+
+def fill_rect(image, x0, y0, x1, y1, color):
+    """Fills the pixel rectangle [x0, x1) x [y0, y1), clipped to the image."""
+    height, width = image.shape[:2]
+    image[max(int(y0), 0):min(int(y1), height), max(int(x0), 0):min(int(x1), width)] = color
+    return image
@@ -0,0 +1,402 @@
+import os
+import socket
+import struct
+import threading
+import time
+
+import numpy as np
+
+# --- Wire Format ---
+# Everything is little-endian. A client opens a TCP or Unix socket and sends
+# one subscription, then receives frames until it disconnects.
+#
+# Subscription (12 bytes):
+#   "PSUB", version u8, encoding u8, keyframe interval u16, max rate f32
+#   (frames per second, 0 = every frame)
+#
+# Frame:
+#   "PSFR", version u8, flags u8 (1 = keyframe), field count u16,
+#   step i64, time f64, payload size u32
+#   then per field: name length u8, name (UTF-8), encoding u8,
+#   rows u32, columns u32 (0 for a 1-D array), and the data:
+#   RAW        rows x columns float32
+#   QUANTIZED  columns x (low f32, step f32), then rows x columns uint16:
+#              value = low + q * step
+#   DELTA      columns x step f32, then rows x columns int16:
+#              value = previous value + d * step, in float32
+#   DELTA8     as DELTA with int8 differences, when they all fit
+#
+# DELTA is relative to the previous frame this client received, so frames
+# that were dropped for it do not matter. Values are exact to half a step
+# of the last QUANTIZED frame (a keyframe), which is sent first, every
+# `keyframe interval` frames and whenever a change is too large for int16.
+
+VERSION = 1
+RAW, QUANTIZED, DELTA, DELTA8 = 0, 1, 2, 3
+ENCODINGS = {"raw": RAW, "quantized": QUANTIZED, "delta": DELTA}
+KEYFRAME = 1
+
+SUBSCRIPTION = struct.Struct("<4sBBHf")
+FRAME_HEADER = struct.Struct("<4sBBHqdI")
+FIELD_HEADER = struct.Struct("<BII")
+
+
+def parse_address(address):
+    """Socket family and address of 'tcp://host:port' or 'unix:///path/to/socket'."""
+    if address.startswith("tcp://"):
+        host, _, port = address[len("tcp://"):].rpartition(":")
+        return socket.AF_INET, (host or "127.0.0.1", int(port))
+    if address.startswith("unix://"):
+        return socket.AF_UNIX, address[len("unix://"):]
+    raise ValueError(f"Unknown stream address {address!r}; expected tcp://host:port or unix:///path")
+
+
+def quantize(values):
+    """Per-column (low, step) and uint16 codes of a 2-D float32 array."""
+    low = values.min(axis=0) if len(values) else np.zeros(values.shape[1], np.float32)
+    high = values.max(axis=0) if len(values) else low
+    step = np.maximum((high - low) / np.float32(65535), np.float32(1e-30)).astype(np.float32)
+    codes = np.rint((values - low) / step).clip(0, 65535).astype(np.uint16)
+    return low.astype(np.float32), step, codes
+
+# --- Encoding ---
+
+class FrameEncoder:
+    """Encodes frames for one client and remembers what that client has decoded."""
+
+    def __init__(self, encoding=QUANTIZED, keyframe_interval=100):
+        self.encoding = encoding
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.frames = 0
+        self.previous = {} # name -> values as the client decoded them
+        self.steps = {}    # name -> per-column step of the last keyframe
+
+    def encode(self, step, time, arrays):
+        keyframe = self.frames % self.keyframe_interval == 0
+        self.frames += 1
+        parts = []
+        all_key = True
+        for name, values in arrays.items():
+            columns = values.shape[1] if values.ndim == 2 else 0
+            table = values.reshape(len(values), -1)
+            data, encoding = self.encode_field(name, table, keyframe)
+            all_key &= encoding in (RAW, QUANTIZED)
+            encoded = name.encode()
+            parts += [struct.pack("<B", len(encoded)), encoded,
+                      FIELD_HEADER.pack(encoding, len(values), columns), data]
+        payload = b"".join(parts)
+        header = FRAME_HEADER.pack(b"PSFR", VERSION, KEYFRAME if all_key else 0, len(arrays),
+                                   step, time, len(payload))
+        return header + payload
+
+    def encode_field(self, name, values, keyframe):
+        if self.encoding == RAW:
+            return values.astype("<f4").tobytes(), RAW
+        previous = self.previous.get(name)
+        if self.encoding == DELTA and not keyframe and previous is not None and previous.shape == values.shape:
+            step = self.steps[name]
+            delta = np.rint((values - previous) / step)
+            largest = np.abs(delta).max() if len(delta) else 0
+            if largest <= 32767:
+                delta = delta.astype(np.int16)
+                self.previous[name] = (previous + delta.astype(np.float32) * step).astype(np.float32)
+                if largest <= 127:
+                    return step.astype("<f4").tobytes() + delta.astype(np.int8).tobytes(), DELTA8
+                return step.astype("<f4").tobytes() + delta.astype("<i2").tobytes(), DELTA
+        low, step, codes = quantize(values)
+        if self.encoding == DELTA:
+            self.previous[name] = (low + codes.astype(np.float32) * step).astype(np.float32)
+            self.steps[name] = step
+        pairs = np.column_stack((low, step)).astype("<f4")
+        return pairs.tobytes() + codes.astype("<u2").tobytes(), QUANTIZED
+
+
+def decode_frame(data, previous=None):
+    """
+    Decodes one frame (bytes after the header size is known) into
+    (step, time, arrays, keyframe). `previous` holds the last decoded
+    arrays of this stream, for DELTA fields; it is updated in place.
+    """
+    previous = {} if previous is None else previous
+    magic, version, flags, count, step, time_, size = FRAME_HEADER.unpack_from(data, 0)
+    if magic != b"PSFR" or version != VERSION:
+        raise ValueError("Not a state stream frame")
+    offset = FRAME_HEADER.size
+    arrays = {}
+    for _ in range(count):
+        length = data[offset]
+        name = bytes(data[offset + 1:offset + 1 + length]).decode()
+        offset += 1 + length
+        encoding, rows, columns = FIELD_HEADER.unpack_from(data, offset)
+        offset += FIELD_HEADER.size
+        width = max(columns, 1)
+        if encoding == RAW:
+            values = np.frombuffer(data, "<f4", rows * width, offset).reshape(rows, width)
+            offset += 4 * rows * width
+        elif encoding == QUANTIZED:
+            pairs = np.frombuffer(data, "<f4", 2 * width, offset).reshape(width, 2)
+            offset += 8 * width
+            codes = np.frombuffer(data, "<u2", rows * width, offset).reshape(rows, width)
+            offset += 2 * rows * width
+            values = (pairs[:, 0] + codes.astype(np.float32) * pairs[:, 1]).astype(np.float32)
+        else:
+            scale = np.frombuffer(data, "<f4", width, offset)
+            offset += 4 * width
+            kind, size = ("<i2", 2) if encoding == DELTA else ("i1", 1)
+            delta = np.frombuffer(data, kind, rows * width, offset).reshape(rows, width)
+            offset += size * rows * width
+            values = (previous[name].reshape(rows, width) + delta.astype(np.float32) * scale).astype(np.float32)
+        previous[name] = values
+        arrays[name] = values if columns else values.reshape(rows)
+    return step, time_, arrays, bool(flags & KEYFRAME)
+
+# --- Server ---
+# publish() is called from the simulation loop and never waits for the
+# network: it converts the arrays to float32 once and leaves the frame in
+# every client's one-frame mailbox, replacing a frame that client has not
+# taken yet (counted in `dropped`). Each client has its own sender thread
+# that encodes and sends at the client's rate, so a slow viewer only loses
+# frames and never slows the simulation or the other viewers.
+
+class _Subscriber(threading.Thread):
+    def __init__(self, server, connection):
+        super().__init__(daemon=True)
+        self.server = server
+        self.connection = connection
+        self.condition = threading.Condition()
+        self.frame = None
+        self.dropped = 0
+        self.sent = 0
+        self.bytes_sent = 0
+        self.ready = False
+        self.closed = False
+
+    def offer(self, frame):
+        with self.condition:
+            if self.frame is not None:
+                self.dropped += 1
+            self.frame = frame
+            self.condition.notify()
+
+    def run(self):
+        try:
+            request = self.receive_exactly(SUBSCRIPTION.size)
+            magic, version, encoding, keyframe_interval, max_rate = SUBSCRIPTION.unpack(request)
+            if magic != b"PSUB" or version != VERSION or encoding not in ENCODINGS.values():
+                return
+            encoder = FrameEncoder(encoding, keyframe_interval)
+            interval = 1.0 / max_rate if max_rate > 0 else 0.0
+            next_time = 0.0
+            self.ready = True
+            while not self.closed:
+                with self.condition:
+                    while self.frame is None and not self.closed:
+                        self.condition.wait(0.5)
+                    wait = next_time - time.monotonic()
+                if self.closed:
+                    break
+                if wait > 0:
+                    time.sleep(wait) # Frames arriving meanwhile replace each other
+                with self.condition:
+                    frame, self.frame = self.frame, None
+                next_time = time.monotonic() + interval
+                data = encoder.encode(*frame)
+                self.connection.sendall(data)
+                self.sent += 1
+                self.bytes_sent += len(data)
+        except OSError:
+            pass # The client went away
+        finally:
+            self.closed = True
+            self.connection.close()
+            self.server.remove(self)
+
+    def receive_exactly(self, size):
+        data = b""
+        while len(data) < size:
+            chunk = self.connection.recv(size - len(data))
+            if not chunk:
+                raise OSError("Connection closed during subscription")
+            data += chunk
+        return data
+
+    def stop(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        try:
+            self.connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+class StateStreamServer:
+    def __init__(self, address, max_clients=8):
+        """Listens on 'tcp://host:port' (port 0 picks a free one) or 'unix:///path'."""
+        family, target = parse_address(address)
+        self.family = family
+        self.listener = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_UNIX:
+            if os.path.exists(target):
+                os.unlink(target) # A socket file left by an earlier run
+        else:
+            self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind(target)
+        self.listener.listen(max_clients)
+        bound = self.listener.getsockname()
+        self.address = (f"unix://{bound}" if family == socket.AF_UNIX else f"tcp://{bound[0]}:{bound[1]}")
+        self.max_clients = max_clients
+        self.clients = []
+        self.lock = threading.Lock()
+        self.published = 0
+        self.closed = False
+        self.acceptor = threading.Thread(target=self.accept_clients, daemon=True)
+        self.acceptor.start()
+
+    def accept_clients(self):
+        while not self.closed:
+            try:
+                connection, _ = self.listener.accept()
+            except OSError:
+                break # Listener closed
+            if self.family != socket.AF_UNIX:
+                connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self.lock:
+                if len(self.clients) >= self.max_clients:
+                    connection.close()
+                    continue
+                client = _Subscriber(self, connection)
+                self.clients.append(client)
+            client.start()
+
+    def remove(self, client):
+        with self.lock:
+            if client in self.clients:
+                self.clients.remove(client)
+
+    def publish(self, step, time, arrays):
+        """
+        Offers a frame of named arrays (e.g. positions (N, 2), speeds (N,))
+        to every subscribed client. Returns immediately; does nothing
+        without clients.
+        """
+        with self.lock:
+            clients = [client for client in self.clients if client.ready]
+        if not clients:
+            return
+        frame = (int(step), float(time), {name: np.array(values, dtype=np.float32) for name, values in arrays.items()})
+        for client in clients:
+            client.offer(frame)
+        self.published += 1
+
+    def stats(self):
+        """(sent, dropped, bytes) per connected client."""
+        with self.lock:
+            return [(client.sent, client.dropped, client.bytes_sent) for client in self.clients]
+
+    def close(self):
+        self.closed = True
+        try:
+            self.listener.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.listener.close()
+        with self.lock:
+            clients = list(self.clients)
+        for client in clients:
+            client.stop()
+        if self.family == socket.AF_UNIX and os.path.exists(self.address[len("unix://"):]):
+            os.unlink(self.address[len("unix://"):])
+
+# --- Client ---
+
+class StreamClient:
+    def __init__(self, address, encoding="quantized", max_rate=0.0, keyframe_interval=100):
+        """Connects to a StateStreamServer and subscribes; max_rate in frames per second (0: all)."""
+        family, target = parse_address(address)
+        self.connection = socket.socket(family, socket.SOCK_STREAM)
+        self.connection.connect(target)
+        self.connection.sendall(SUBSCRIPTION.pack(b"PSUB", VERSION, ENCODINGS[encoding],
+                                                  keyframe_interval, max_rate))
+        self.previous = {}
+        self.buffer = bytearray()
+        self.bytes_received = 0
+
+    def receive_exactly(self, size):
+        while len(self.buffer) < size:
+            chunk = self.connection.recv(max(65536, size - len(self.buffer)))
+            if not chunk:
+                raise ConnectionError("The stream server closed the connection")
+            self.buffer += chunk
+            self.bytes_received += len(chunk)
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return data
+
+    def receive(self):
+        """Waits for the next frame; returns (step, time, arrays, keyframe)."""
+        header = self.receive_exactly(FRAME_HEADER.size)
+        payload = self.receive_exactly(FRAME_HEADER.unpack(header)[-1])
+        return decode_frame(header + payload, self.previous)
+
+    def close(self):
+        self.connection.close()
+
+# --- Demonstration ---
+# python StateStream.py                       streams 100,000 moving particles to
+#                                             three local clients and compares encodings
+# python StateStream.py ADDRESS [ENCODING] [RATE]
+#                                             prints the frames of a running simulation
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1:
+        client = StreamClient(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else "quantized",
+                              float(sys.argv[3]) if len(sys.argv) > 3 else 0.0)
+        while True:
+            step, t, arrays, keyframe = client.receive()
+            shapes = ", ".join(f"{name} {values.shape}" for name, values in arrays.items())
+            print(f"step {step} time {t:.6g}{' keyframe' if keyframe else ''}: {shapes}")
+
+    count, seconds = 100_000, 3.0
+    rng = np.random.default_rng(0)
+    positions = rng.uniform(0, 1000, (count, 2))
+    velocities = rng.normal(0, 1, (count, 2))
+    server = StateStreamServer("tcp://127.0.0.1:0")
+    results = {}
+
+    def watch(encoding, rate):
+        client = StreamClient(server.address, encoding, rate)
+        frames, error = 0, 0.0
+        start = time.monotonic()
+        while time.monotonic() - start < seconds:
+            step, t, arrays, _ = client.receive()
+            frames += 1
+            error = max(error, float(np.abs(arrays["positions"] - latest[step]).max()))
+        client.close()
+        results[encoding, rate] = (frames / seconds, client.bytes_received / frames, error)
+
+    latest = {}
+    watchers = [threading.Thread(target=watch, args=args) for args in
+                (("raw", 0), ("quantized", 0), ("delta", 0), ("delta", 10))]
+    for watcher in watchers:
+        watcher.start()
+    time.sleep(0.5)
+    step, publish_time, start = 0, 0.0, time.monotonic()
+    while any(watcher.is_alive() for watcher in watchers):
+        positions += velocities * 0.1
+        step += 1
+        latest[step] = positions.astype(np.float32)
+        latest.pop(step - 200, None)
+        begin = time.perf_counter()
+        server.publish(step, step * 0.1, {"positions": positions})
+        publish_time += time.perf_counter() - begin
+        time.sleep(0.01)
+    for watcher in watchers:
+        watcher.join()
+    server.close()
+    print(f"{count} particles, {step} frames published in {time.monotonic() - start:.1f} s, "
+          f"publish() {publish_time / step * 1000:.2f} ms per frame")
+    for (encoding, rate), (fps, size, error) in results.items():
+        print(f"  {encoding:9s} at {rate or 'every'} frames/s: received {fps:.0f} frames/s, "
+              f"{size / 1e3:.0f} kB per frame, max position error {error:.3g}")
@@ -0,0 +1,130 @@
+import numpy as np
+
+from SimulationCore import Raster
+
+# --- Trail Buffer ---
+# A fixed-capacity ring buffer of world-space points. Once full, the oldest
+# point is overwritten, so memory stays constant however long the run is.
+# A new point is only stored when it is at least min_distance away from the
+# last stored one (distance-based decimation); slow or stationary bodies
+# therefore do not fill the buffer with near-duplicates.
+class TrailBuffer:
+    def __init__(self, capacity=500, min_distance=2.0):
+        self.capacity = capacity
+        self.min_distance = min_distance
+        self.points = np.zeros((capacity, 2))
+        self.head = 0 # Index of the next write
+        self.count = 0
+        self.tip = None # Latest position, drawn even when it was decimated away
+
+    def __len__(self):
+        return self.count
+
+    def add(self, x, y):
+        """Records a position; returns True when it was stored in the buffer."""
+        self.tip = (x, y)
+        if self.count:
+            last = self.points[self.head - 1]
+            if (x - last[0])**2 + (y - last[1])**2 < self.min_distance**2:
+                return False
+        self.points[self.head] = (x, y)
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        return True
+
+    def ordered(self):
+        """Stored points from oldest to newest, followed by the latest position."""
+        if self.count < self.capacity:
+            stored = self.points[:self.count]
+        else:
+            stored = np.concatenate((self.points[self.head:], self.points[:self.head]))
+        if self.tip is None or (self.count and tuple(stored[-1]) == tuple(self.tip)):
+            return stored
+        return np.concatenate((stored, [self.tip]))
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+        self.tip = None
+
+# --- Trail Layer ---
+# Draws each trail as a single canvas polyline whose coordinates are
+# replaced every frame, instead of one new line item per frame as a turtle
+# pen does. With fading, a trail is split into `fade_steps` polylines whose
+# colours run from the background colour (oldest) to the trail colour
+# (newest), so the item count is still fixed per trail.
+class TrailLayer:
+    def __init__(self, renderer, capacity=500, min_distance=2.0, fade_steps=1, fade_to="black", width=1):
+        self.renderer = renderer
+        self.canvas = renderer.canvas
+        self.capacity = capacity
+        self.min_distance = min_distance # In world units
+        self.fade_steps = fade_steps
+        self.fade_to = fade_to
+        self.width = width
+        self.buffers = {} # key -> TrailBuffer
+        self.items = {}   # key -> list of canvas line items, oldest part first
+
+    def add_trail(self, key, color="white", capacity=None, min_distance=None):
+        """
+        Creates the (empty) trail of one body.
+
+        The line items exist from here on, so a trail added before its body
+        is drawn underneath it.
+        """
+        self.buffers[key] = TrailBuffer(capacity or self.capacity,
+                                        self.min_distance if min_distance is None else min_distance)
+        start = Raster.color_to_rgb(self.fade_to, self.canvas) if self.fade_steps > 1 else None
+        end = Raster.color_to_rgb(color, self.canvas)
+        items = []
+        for step in range(self.fade_steps):
+            if start is None:
+                shade = color
+            else:
+                fraction = (step + 1) / self.fade_steps
+                shade = "#%02x%02x%02x" % tuple(round(a + (b - a) * fraction) for a, b in zip(start, end))
+            items.append(self.canvas.create_line(0, 0, 0, 0, fill=shade, width=self.width,
+                                                 state="hidden", tags=self.renderer.tag(key)))
+        self.items[key] = items
+
+    def extend(self, key, x, y):
+        """Adds the body's current position to its trail; True when it was stored."""
+        return self.buffers[key].add(x, y)
+
+    def draw(self, key):
+        """Replaces the coordinates of the trail's polyline(s) with the buffer contents."""
+        points = self.buffers[key].ordered()
+        items = self.items[key]
+        if len(points) < 2:
+            for item in items:
+                self.canvas.itemconfigure(item, state="hidden")
+            return
+        cx, cy = self.renderer.to_canvas(points[:, 0], points[:, 1])
+        flat = np.column_stack((cx, cy)).ravel()
+        # Contiguous chunks that share their end points, oldest first
+        bounds = np.linspace(0, len(points) - 1, len(items) + 1).round().astype(int)
+        for item, start, end in zip(items, bounds[:-1], bounds[1:]):
+            if end > start:
+                self.canvas.coords(item, *flat[2 * start:2 * end + 2].tolist())
+                self.canvas.itemconfigure(item, state="normal")
+            else:
+                self.canvas.itemconfigure(item, state="hidden")
+
+    def update(self, key, x, y):
+        """
+        extend() followed by draw() when a point was stored.
+
+        Positions closer than min_distance to the last stored point do not
+        redraw, so the visible tip lags the body by at most min_distance.
+        """
+        if self.buffers[key].add(x, y):
+            self.draw(key)
+
+    def clear(self, key):
+        self.buffers[key].clear()
+        self.draw(key)
+
+    def remove(self, key):
+        self.buffers.pop(key)
+        for item in self.items.pop(key):
+            self.canvas.delete(item)
@@ -0,0 +1,7 @@
+"""
+Shared, UI-free building blocks for the physics simulations.
+
+The scripts in the other folders add the repository root to sys.path and
+import the modules they need, e.g. ``from SimulationCore.EphemerisCache
+import EphemerisCache``.
+"""